@@ -2,11 +2,62 @@
 분석가 AI - 실행자들의 결과를 분석
 """
 from typing import Dict, Any, List
+from dataclasses import dataclass, field, asdict
 from .base_agent import BaseAgent
 from loguru import logger
+import hashlib
 import json
 
 
+@dataclass
+class IncrementalAnalysisState:
+    """스트리밍 분석 상태 - 지금까지 받은 실행 결과와 부분 분석"""
+    scan_id: str
+    target_url: str = ""
+    expected_results: int = 6
+    received: List[str] = field(default_factory=list)  # 수신한 실행자 (예: static:claude)
+    finding_keys: List[str] = field(default_factory=list)  # 이미 분석한 발견 사항 지문
+    partial_analyses: List[Dict[str, Any]] = field(default_factory=list)
+    execution_results: List[Dict[str, Any]] = field(default_factory=list)
+    
+    @property
+    def is_complete(self) -> bool:
+        return len(self.received) >= self.expected_results
+    
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), ensure_ascii=False)
+    
+    @classmethod
+    def from_json(cls, raw) -> "IncrementalAnalysisState":
+        return cls(**json.loads(raw))
+
+
+def extract_findings(execution_result: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """실행 결과에서 취약점 목록 추출 (중첩된 vulnerabilities 항목을 모두 수집)"""
+    
+    findings = []
+    
+    def walk(node, test_type):
+        if isinstance(node, dict):
+            test_type = node.get("test_type", test_type)
+            for item in node.get("vulnerabilities", []) or []:
+                if isinstance(item, dict):
+                    findings.append({"test_type": test_type, **item})
+            for value in node.values():
+                walk(value, test_type)
+        elif isinstance(node, list):
+            for value in node:
+                walk(value, test_type)
+    
+    walk(execution_result, "unknown")
+    return findings
+
+
+def finding_key(finding: Dict[str, Any]) -> str:
+    """같은 취약점을 여러 실행자가 보고해도 한 번만 분석하기 위한 지문"""
+    return hashlib.sha1(json.dumps(finding, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+
 class AnalyzerAgent(BaseAgent):
     """분석가 AI - 실행 결과를 분석하고 인사이트 제공"""
     
@@ -88,6 +139,117 @@ JSON 형태로 구조화된 분석 결과를 제공해주세요.
                 "error": str(e)
             }
     
+    async def process_incremental(self, state: IncrementalAnalysisState, execution_result: Dict[str, Any], source: str) -> Dict[str, Any]:
+        """실행 결과 하나를 받을 때마다 새로 발견된 항목만 분석 (실행 단계와 분석 단계를 겹침)"""
+        
+        if source in state.received:
+            return {"status": "duplicate", "source": source}
+        
+        state.received.append(source)
+        state.execution_results.append(execution_result)
+        
+        new_findings = []
+        for finding in extract_findings(execution_result):
+            key = finding_key(finding)
+            if key not in state.finding_keys:
+                state.finding_keys.append(key)
+                new_findings.append(finding)
+        
+        # 새 발견 사항이 없으면 LLM을 호출하지 않음
+        if not new_findings:
+            return {"status": "no_new_findings", "source": source}
+        
+        user_prompt = f"""
+대상 시스템: {state.target_url}
+실행자: {source}
+
+새로 보고된 보안 테스트 발견 사항 (이전에 분석한 항목은 제외됨):
+{json.dumps(new_findings, indent=2, ensure_ascii=False)}
+
+각 발견 사항의 위험도, 비즈니스 영향, 수정 방안을 간결하게 JSON으로 정리해주세요.
+"""
+        
+        messages = [
+            {"role": "system", "content": self.create_system_prompt()},
+            {"role": "user", "content": user_prompt}
+        ]
+        
+        try:
+            partial = await self.call_llm(messages, max_tokens=600)
+        except Exception as e:
+            logger.error(f"{self.name}: 부분 분석 실패 - {e}")
+            # 지문을 되돌려 최종 정리 단계에서 다시 다루도록 함
+            for finding in new_findings:
+                state.finding_keys.remove(finding_key(finding))
+            return {"status": "error", "source": source, "error": str(e)}
+        
+        state.partial_analyses.append({
+            "source": source,
+            "findings": len(new_findings),
+            "analysis": partial
+        })
+        
+        logger.info(f"{self.name}: {source} 부분 분석 완료 (새 발견 {len(new_findings)}건)")
+        
+        return {"status": "success", "source": source, "new_findings": len(new_findings)}
+    
+    async def reconcile(self, state: IncrementalAnalysisState) -> Dict[str, Any]:
+        """마지막 실행 결과 수신 후 부분 분석들을 짧게 종합"""
+        
+        # 부분 분석이 실패한 발견 사항은 여기서 함께 다룸
+        unanalyzed = [
+            finding
+            for result in state.execution_results
+            for finding in extract_findings(result)
+            if finding_key(finding) not in state.finding_keys
+        ]
+        
+        user_prompt = f"""
+대상 시스템: {state.target_url}
+
+실행자별 부분 분석 결과:
+{json.dumps(state.partial_analyses, indent=2, ensure_ascii=False)}
+
+부분 분석에 포함되지 않은 발견 사항:
+{json.dumps(unanalyzed, indent=2, ensure_ascii=False)}
+
+전체 테스트 요약:
+{json.dumps(self._summarize_execution_results(state.execution_results), indent=2, ensure_ascii=False)}
+
+부분 분석을 종합하여 중복을 제거하고 다음을 JSON으로 제공해주세요:
+1. 공격 체인, 2. 수정 우선순위 (즉시/단기/장기), 3. 100점 만점 보안 점수
+"""
+        
+        messages = [
+            {"role": "system", "content": self.create_system_prompt()},
+            {"role": "user", "content": user_prompt}
+        ]
+        
+        try:
+            analysis_result = await self.call_llm(messages, max_tokens=800)
+            
+            logger.info(f"{self.name}: 최종 종합 분석 완료")
+            
+            return {
+                "status": "success",
+                "agent": self.name,
+                "provider": self.primary_provider,
+                "analysis_type": "streaming",
+                "analysis_result": analysis_result,
+                "partial_analyses": state.partial_analyses,
+                "processed_results": len(state.execution_results),
+                "analysis_perspective": f"{self.primary_provider} 관점의 전문 분석"
+            }
+            
+        except Exception as e:
+            logger.error(f"{self.name}: 최종 종합 분석 실패 - {e}")
+            return {
+                "status": "error",
+                "agent": self.name,
+                "provider": self.primary_provider,
+                "error": str(e)
+            }
+    
     def _summarize_execution_results(self, execution_results: List[Dict[str, Any]]) -> Dict[str, Any]:
         """실행 결과들을 요약"""
         
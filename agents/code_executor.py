@@ -2,19 +2,27 @@
 코드 실행자 - 관리자 AI가 생성한 코드를 실행만 함
 """
 import asyncio
-import subprocess
 import json
 import tempfile
 import os
-from typing import Dict, Any
+import time
+from typing import Dict, Any, Optional
 from loguru import logger
 
+from core.deadline import Deadline
+from .command_policy import CommandPolicy, default_policy
+
+PYTHON_TIMEOUT = 600  # 10분
+SHELL_TIMEOUT = 300   # 5분
+
 
 class CodeExecutor:
     """관리자 AI가 생성한 코드를 실행하는 클래스"""
     
-    def __init__(self, executor_id: str):
+    def __init__(self, executor_id: str, policy: Optional[CommandPolicy] = None, deadline: Optional[Deadline] = None):
         self.executor_id = executor_id
+        self.policy = policy or default_policy
+        self.deadline = deadline or Deadline()
         
     async def execute_code(self, execution_package: Dict[str, Any]) -> Dict[str, Any]:
         """관리자 AI가 생성한 실행 패키지를 실행"""
@@ -23,7 +31,17 @@ class CodeExecutor:
         execution_code = execution_package.get("execution_code", "")
         shell_commands = execution_package.get("shell_commands", [])
         
-        logger.info(f"실행자 {self.executor_id}: {test_type} 테스트 시작")
+        logger.info(f"실행자 {self.executor_id}: {test_type} 테스트 시작 ({self.deadline})")
+        
+        if self.deadline.expired:
+            return {
+                "status": "skipped",
+                "executor_id": self.executor_id,
+                "test_type": test_type,
+                "reason": "스캔 마감 시각 초과"
+            }
+        
+        started_at = time.monotonic()
         
         try:
             # 1. Python 코드 실행
@@ -32,20 +50,28 @@ class CodeExecutor:
             else:
                 python_result = {}
             
-            # 2. 쉘 명령어 실행
+            # 2. 쉘 명령어 실행 (마감 시각이 지나면 남은 명령어는 건너뜀)
             shell_results = []
+            skipped_commands = []
             for cmd in shell_commands:
+                if self.deadline.expired:
+                    skipped_commands.append(cmd)
+                    continue
                 shell_result = await self._execute_shell_command(cmd)
                 shell_results.append(shell_result)
             
+            if skipped_commands:
+                logger.warning(f"실행자 {self.executor_id}: 시간 예산 부족으로 명령어 {len(skipped_commands)}개 건너뜀")
+            
             # 3. 결과 수집
             return {
-                "status": "completed",
+                "status": "partial" if skipped_commands else "completed",
                 "executor_id": self.executor_id,
                 "test_type": test_type,
                 "python_result": python_result,
                 "shell_results": shell_results,
-                "execution_time": "실제 측정 필요"
+                "skipped_commands": skipped_commands,
+                "execution_time": round(time.monotonic() - started_at, 1)
             }
             
         except Exception as e:
@@ -73,7 +99,17 @@ class CodeExecutor:
                 stderr=asyncio.subprocess.PIPE
             )
             
-            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=600)  # 10분 제한
+            timeout = self.deadline.timeout(PYTHON_TIMEOUT)
+            try:
+                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                os.unlink(temp_file)
+                return {
+                    "status": "timeout",
+                    "error": f"코드 실행 시간 초과 ({timeout:.0f}초)"
+                }
             
             # 임시 파일 삭제
             os.unlink(temp_file)
@@ -92,11 +128,6 @@ class CodeExecutor:
                     "error": stderr.decode('utf-8')
                 }
                 
-        except asyncio.TimeoutError:
-            return {
-                "status": "timeout",
-                "error": "코드 실행 시간 초과 (10분)"
-            }
         except Exception as e:
             return {
                 "status": "error", 
@@ -104,24 +135,36 @@ class CodeExecutor:
             }
     
     async def _execute_shell_command(self, command: str) -> Dict[str, Any]:
-        """쉘 명령어 실행"""
+        """쉘 명령어 실행 (쉘을 거치지 않고 argv로 직접 실행)"""
         
         try:
             # 안전한 명령어인지 확인
-            if not self._is_safe_command(command):
+            decision = self.policy.evaluate(command)
+            if not decision.allowed:
                 return {
                     "status": "blocked",
-                    "error": f"안전하지 않은 명령어: {command}"
+                    "command": command,
+                    "error": f"안전하지 않은 명령어: {decision.reason}"
                 }
             
             # 명령어 실행
-            process = await asyncio.create_subprocess_shell(
-                command,
+            process = await asyncio.create_subprocess_exec(
+                *decision.argv,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE
             )
             
-            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=300)  # 5분 제한
+            timeout = self.deadline.timeout(SHELL_TIMEOUT)
+            try:
+                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                return {
+                    "status": "timeout",
+                    "command": command,
+                    "error": f"명령어 실행 시간 초과 ({timeout:.0f}초)"
+                }
             
             if process.returncode == 0:
                 return {
@@ -136,58 +179,21 @@ class CodeExecutor:
                     "error": stderr.decode('utf-8')
                 }
                 
-        except asyncio.TimeoutError:
-            return {
-                "status": "timeout",
-                "command": command,
-                "error": "명령어 실행 시간 초과 (5분)"
-            }
         except Exception as e:
             return {
                 "status": "error",
                 "command": command,
                 "error": str(e)
             }
-    
-    def _is_safe_command(self, command: str) -> bool:
-        """안전한 명령어인지 확인"""
-        
-        # 허용된 보안 도구들
-        allowed_tools = [
-            'nmap', 'sqlmap', 'nikto', 'dirb', 'gobuster',
-            'curl', 'wget', 'openssl', 'dig', 'nslookup',
-            'python', 'python3', 'pip', 'pip3'
-        ]
-        
-        # 금지된 명령어들
-        forbidden_commands = [
-            'rm', 'del', 'format', 'fdisk', 'mkfs',
-            'dd', 'shutdown', 'reboot', 'halt',
-            'su', 'sudo', 'passwd', 'chown', 'chmod'
-        ]
-        
-        command_lower = command.lower()
-        
-        # 금지된 명령어 확인
-        for forbidden in forbidden_commands:
-            if forbidden in command_lower:
-                return False
-        
-        # 허용된 도구로 시작하는지 확인
-        for tool in allowed_tools:
-            if command_lower.startswith(tool):
-                return True
-        
-        return False
 
 
 class ExecutorAgent:
     """실행자 AI - 코드를 받아서 실행만 함"""
     
-    def __init__(self, executor_id: str, ai_provider: str):
+    def __init__(self, executor_id: str, ai_provider: str, deadline: Optional[Deadline] = None):
         self.executor_id = executor_id
         self.ai_provider = ai_provider
-        self.code_executor = CodeExecutor(executor_id)
+        self.code_executor = CodeExecutor(executor_id, deadline=deadline)
     
     async def process(self, execution_package: Dict[str, Any]) -> Dict[str, Any]:
         """관리자 AI가 보낸 실행 패키지를 처리"""
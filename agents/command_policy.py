@@ -0,0 +1,149 @@
+"""
+명령어 정책 엔진 - 실행자가 실행할 쉘 명령어를 argv 단위로 검증
+"""
+import os
+import re
+import shlex
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Pattern, Tuple
+
+
+# 쉘이 없으므로 파이프/리다이렉션 등은 의미가 없음 - 의도와 다르게 실행되지 않도록 차단
+SHELL_OPERATORS = {'|', '||', '&', '&&', ';', '>', '>>', '<', '<<', '2>', '2>&1'}
+SHELL_EXPANSION = re.compile(r'\$\(|`')
+
+
+@dataclass
+class ToolRule:
+    """도구별 허용 규칙"""
+    name: str
+    denied_args: List[str] = field(default_factory=list)  # 금지된 인자 패턴 (정규식, 인자 전체와 비교)
+    allowed_subcommands: Optional[List[str]] = None  # 첫 번째 위치 인자 제한 (예: pip)
+    # 짧은 옵션 묶음(-sT)과 값을 붙여 쓴 형태(-Tfile)도 문자 단위로 검사
+    denied_flags: str = ""  # 금지된 짧은 옵션 문자
+    value_flags: str = ""  # 값을 받는 짧은 옵션 문자 (묶음에서 이 문자 뒤는 값이므로 검사하지 않음)
+    value_options: List[str] = field(default_factory=list)  # 다음 인자를 값으로 받는 긴 옵션
+    script_tool: bool = False  # 첫 위치 인자(스크립트 경로) 뒤는 스크립트의 인자이므로 검사하지 않음
+
+
+# 허용된 보안 도구와 인자 규칙
+DEFAULT_RULES = [
+    ToolRule('nmap'),
+    ToolRule('sqlmap', denied_args=[
+        r'--os-(shell|pwn|cmd|smbrelay|bof)(=.*)?', r'--file-(write|dest)(=.*)?',
+        r'--sql-shell', r'--reg-(add|del)'
+    ]),
+    ToolRule('nikto'),
+    ToolRule('dirb'),
+    ToolRule('gobuster'),
+    ToolRule('curl', denied_args=[r'--upload-file(=.*)?', r'--config(=.*)?'],
+             denied_flags='TK', value_flags='AbcCdDeEFHmoPQrtuUwxXyYz'),
+    ToolRule('wget', denied_args=[r'--post-file(=.*)?', r'--body-file(=.*)?', r'--execute(=.*)?'],
+             denied_flags='e', value_flags='aABDiIloOPQRtTUwX'),
+    ToolRule('openssl'),
+    ToolRule('dig'),
+    ToolRule('nslookup'),
+    # -c(코드 문자열)와 -m(임의 모듈 실행) 금지 - 실행자가 만든 스크립트 파일만 실행
+    ToolRule('python', denied_flags='cm', value_flags='WX', value_options=['--check-hash-based-pycs'], script_tool=True),
+    ToolRule('python3', denied_flags='cm', value_flags='WX', value_options=['--check-hash-based-pycs'], script_tool=True),
+    ToolRule('pip', allowed_subcommands=['install', 'show', 'list', 'freeze']),
+    ToolRule('pip3', allowed_subcommands=['install', 'show', 'list', 'freeze']),
+]
+
+
+@dataclass
+class PolicyDecision:
+    """명령어 검증 결과"""
+    allowed: bool
+    argv: List[str]
+    reason: str = ""
+
+
+class CommandPolicy:
+    """사전 컴파일된 허용 목록으로 명령어를 검증하는 정책 엔진"""
+
+    def __init__(self, rules: Optional[List[ToolRule]] = None):
+        self._tools: Dict[str, ToolRule] = {}
+        self._denied: Dict[str, Optional[Pattern]] = {}
+
+        for rule in rules or DEFAULT_RULES:
+            self._tools[rule.name] = rule
+            # 도구별 금지 인자 패턴을 하나의 정규식으로 컴파일
+            if rule.denied_args:
+                self._denied[rule.name] = re.compile(
+                    '|'.join(f'(?:{pattern})' for pattern in rule.denied_args)
+                )
+            else:
+                self._denied[rule.name] = None
+
+    def evaluate(self, command: str) -> PolicyDecision:
+        """명령어를 한 번 토큰화하고 argv를 허용 목록과 대조"""
+
+        try:
+            argv = shlex.split(command)
+        except ValueError as e:
+            return PolicyDecision(False, [], f"명령어 파싱 실패: {e}")
+
+        if not argv:
+            return PolicyDecision(False, [], "빈 명령어")
+
+        # 경로로 지정된 실행 파일은 허용 목록을 우회할 수 있으므로 PATH 상의 이름만 허용
+        tool = argv[0]
+        rule = self._tools.get(tool) if os.sep not in tool else None
+        if rule is None:
+            return PolicyDecision(False, argv, f"허용되지 않은 도구: {tool}")
+
+        denied = self._denied[tool]
+        options = True  # 옵션 구간 (--나 스크립트 경로 뒤로는 도구의 옵션이 아님)
+        takes_value = False  # 앞 옵션의 값인 인자
+        for arg in argv[1:]:
+            if arg in SHELL_OPERATORS or SHELL_EXPANSION.search(arg):
+                return PolicyDecision(False, argv, f"쉘 연산자는 지원하지 않습니다: {arg}")
+            if not options:
+                continue
+            if takes_value:
+                takes_value = False
+                continue
+            if arg == '--':
+                options = False
+                continue
+            if denied is not None and denied.fullmatch(arg):
+                return PolicyDecision(False, argv, f"{tool}에서 금지된 인자: {arg}")
+
+            if arg.startswith('--'):
+                takes_value = arg in rule.value_options
+            elif arg.startswith('-') and len(arg) > 1:
+                flag, takes_value = self._short_flags(rule, arg)
+                if flag:
+                    return PolicyDecision(False, argv, f"{tool}에서 금지된 인자: {arg}")
+            elif rule.script_tool:
+                options = False
+
+        if rule.allowed_subcommands is not None:
+            positional = [arg for arg in argv[1:] if not arg.startswith('-')]
+            if not positional or positional[0] not in rule.allowed_subcommands:
+                return PolicyDecision(False, argv, f"{tool}에서 허용되지 않은 하위 명령")
+
+        return PolicyDecision(True, argv)
+
+    @staticmethod
+    def _short_flags(rule: ToolRule, arg: str) -> Tuple[Optional[str], bool]:
+        """짧은 옵션 묶음 검사 - (금지된 옵션 문자, 다음 인자가 값인지)
+
+        값을 받는 옵션이 나오면 나머지는 그 값(-XPUT, -Oout.html)이므로 검사를 멈춤
+        """
+
+        for index, flag in enumerate(arg[1:], start=1):
+            if flag in rule.denied_flags:
+                return flag, False
+            if flag in rule.value_flags:
+                return None, index == len(arg) - 1
+        return None, False
+
+    def is_allowed(self, command: str) -> bool:
+        """허용 여부만 반환"""
+        return self.evaluate(command).allowed
+
+
+# 기본 정책 인스턴스 (모듈 로드 시 한 번만 컴파일)
+default_policy = CommandPolicy()
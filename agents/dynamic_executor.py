@@ -2,6 +2,8 @@
 동적 테스트 실행자 AI
 """
 from typing import Dict, Any
+from core.deadline import Deadline
+from tools.fingerprint import FingerprintStore, run_package
 from .base_agent import BaseAgent
 from loguru import logger
 
@@ -9,6 +11,15 @@ from loguru import logger
 class DynamicTestExecutor(BaseAgent):
     """동적 테스트 실행자 AI"""
     
+    _fingerprint_store = None
+    
+    @property
+    def fingerprint_store(self) -> FingerprintStore:
+        """증분 재스캔용 지문 저장소 (FINGERPRINT_DB, 처음 사용할 때 생성)"""
+        if self._fingerprint_store is None:
+            self._fingerprint_store = FingerprintStore()
+        return self._fingerprint_store
+    
     async def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """관리자 AI가 생성한 동적 테스트 코드를 실행"""
         
@@ -24,14 +35,25 @@ class DynamicTestExecutor(BaseAgent):
             }
         
         try:
+            deadline = Deadline.from_payload(input_data)
+            
             # 코드 실행자 생성
             executor = ExecutorAgent(
                 executor_id=f"dynamic_{self.primary_provider}",
-                ai_provider=self.primary_provider
+                ai_provider=self.primary_provider,
+                deadline=deadline
             )
             
             # 관리자 AI가 생성한 코드 실행 (시간이 오래 걸림)
-            execution_result = await executor.process(execution_package)
+            # 공격 표면 지문을 함께 기록하고, 재스캔이면 입력이 그대로인 패키지는 이전 결과를 이어받음
+            execution_result = await run_package(
+                self.fingerprint_store,
+                input_data.get("target_url") or "",
+                execution_package,
+                lambda: executor.process(execution_package),
+                rescan=bool(input_data.get("rescan")),
+                deadline=deadline
+            )
             
             logger.info(f"{self.name}: 동적 테스트 코드 실행 완료")
             
@@ -41,6 +63,7 @@ class DynamicTestExecutor(BaseAgent):
                 "provider": self.primary_provider,
                 "analysis_type": "dynamic",
                 "execution_result": execution_result,
+                "carried_forward": bool(execution_result.get("carried_forward")),
                 "token_usage": "0 토큰 (코드 실행만 함)",
                 "execution_time": "실제 테스트 시간: 5-15분 (브루트포스, SQL인젝션 등)",
                 "note": "관리자 AI가 생성한 완벽한 테스트 코드를 실행했습니다"
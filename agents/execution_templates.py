@@ -0,0 +1,367 @@
+"""
+실행 템플릿 라이브러리
+검증된 테스트 코드를 템플릿으로 두고, 관리자 AI는 파라미터(경로, 페이로드 선택, 임계값)만 생성
+파라미터는 스키마로 검증한 뒤 JSON 리터럴로만 코드에 삽입하므로 생성된 값이 코드로 실행되지 않음
+"""
+import json
+import shlex
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Callable
+from urllib.parse import urlparse
+
+
+# 파라미터 스키마
+# type: int / float / bool / choice / choices(여러 개 선택) / paths / strings / credentials / ports
+
+def _validate(name: str, spec: Dict[str, Any], value: Any) -> Any:
+    kind = spec["type"]
+
+    if kind in ("int", "float"):
+        value = int(value) if kind == "int" else float(value)
+        return min(spec["max"], max(spec["min"], value))
+
+    if kind == "bool":
+        # JSON 불리언만 허용 ("false" 같은 문자열이 참으로 바뀌지 않도록)
+        if not isinstance(value, bool):
+            raise ValueError(f"{name}: true 또는 false여야 합니다")
+        return value
+
+    if kind == "choice":
+        if value not in spec["choices"]:
+            raise ValueError(f"{name}: 허용되지 않은 값 {value}")
+        return value
+
+    if not isinstance(value, list):
+        raise ValueError(f"{name}: 목록이어야 합니다")
+    value = value[:spec.get("max_items", 50)]
+
+    if kind == "choices":
+        invalid = [v for v in value if v not in spec["choices"]]
+        if invalid:
+            raise ValueError(f"{name}: 허용되지 않은 값 {invalid}")
+        return list(dict.fromkeys(value))
+
+    if kind == "paths":
+        invalid = [v for v in value if not isinstance(v, str) or not v.startswith("/") or "//" in v or len(v) > 200]
+        if invalid:
+            raise ValueError(f"{name}: 잘못된 경로 {invalid}")
+        return value
+
+    if kind == "strings":
+        return [str(v)[:100] for v in value]
+
+    if kind == "credentials":
+        return [[str(pair[0])[:64], str(pair[1])[:64]] for pair in value if isinstance(pair, (list, tuple)) and len(pair) == 2]
+
+    if kind == "ports":
+        invalid = [v for v in value if not isinstance(v, int) or not 0 < v < 65536]
+        if invalid:
+            raise ValueError(f"{name}: 잘못된 포트 {invalid}")
+        return sorted(set(value))
+
+    raise ValueError(f"{name}: 알 수 없는 파라미터 유형 {kind}")
+
+
+@dataclass
+class ExecutionTemplate:
+    """테스트 유형 하나의 실행 템플릿"""
+    test_type: str
+    description: str
+    parameters: Dict[str, Dict[str, Any]]
+    code: str = ""
+    commands: Optional[Callable[[str, Dict[str, Any]], List[str]]] = None
+    shard_parameter: Optional[str] = None  # 계획의 샤드(index/count)로 나눌 파라미터
+    expected_output: str = "JSON"
+
+    def resolve(self, overrides: Optional[Dict[str, Any]] = None, shard: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """기본값 + AI 파라미터 + 샤드 (잘못된 AI 파라미터는 기본값 사용)
+
+        샤드는 AI 파라미터까지 반영된 분할 파라미터 값을 index/count로 나눈 몫만 남김
+        """
+
+        params = {name: spec["default"] for name, spec in self.parameters.items()}
+        errors = []
+
+        for name, value in (overrides or {}).items():
+            if name not in self.parameters:
+                errors.append(f"{name}: 알 수 없는 파라미터")
+                continue
+            try:
+                params[name] = _validate(name, self.parameters[name], value)
+            except (TypeError, ValueError) as e:
+                errors.append(str(e))
+
+        if shard and self.shard_parameter:
+            params[self.shard_parameter] = params[self.shard_parameter][shard["index"]::shard["count"]]
+
+        params["_errors"] = errors
+        return params
+
+    def render(self, target_url: str, overrides: Optional[Dict[str, Any]] = None, shard: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """실행 패키지 생성 (CodeExecutor 입력 형식)"""
+
+        params = self.resolve(overrides, shard)
+        errors = params.pop("_errors")
+        literal = json.dumps({"target_url": target_url, **params}, ensure_ascii=False)
+
+        return {
+            "test_type": self.test_type,
+            "execution_code": self.code.replace("__PARAMS__", repr(literal)) if self.code else "",
+            "shell_commands": self.commands(target_url, params) if self.commands else [],
+            "expected_output": self.expected_output,
+            "parameters": params,
+            "parameter_errors": errors,
+            "shard": shard
+        }
+
+
+BRUTE_FORCE_CODE = '''
+import json, time, requests
+from urllib.parse import urljoin
+
+P = json.loads(__PARAMS__)
+session = requests.Session()
+results = {"target": P["target_url"], "login_endpoints": [], "successful_logins": [],
+           "account_lockout_detected": False, "timing": []}
+
+for path in P["endpoints"]:
+    url = urljoin(P["target_url"], path)
+    try:
+        page = session.get(url, timeout=P["timeout"])
+    except requests.RequestException:
+        continue
+    if page.status_code != 200 or not any(k in page.text.lower() for k in ("password", "login", "username")):
+        continue
+    results["login_endpoints"].append(url)
+
+    for username, password in P["credentials"][:P["max_attempts"]]:
+        data = {"username": username, "password": password, "user": username, "pass": password, "email": username}
+        started = time.time()
+        try:
+            response = session.post(url, data=data, timeout=P["timeout"], allow_redirects=False)
+        except requests.RequestException:
+            continue
+        elapsed = time.time() - started
+        body = response.text.lower()
+        results["timing"].append({"username": username, "response_time": elapsed})
+
+        if any(k in body for k in ("locked", "blocked", "too many")):
+            results["account_lockout_detected"] = True
+            break
+        success = response.status_code in (301, 302) or any(k in body for k in P["success_markers"])
+        if success and not any(k in body for k in ("invalid", "incorrect", "failed", "error")):
+            results["successful_logins"].append({"endpoint": url, "username": username, "status_code": response.status_code})
+        time.sleep(P["delay_seconds"])
+
+results["vulnerabilities"] = [
+    {"type": "Weak Credentials", "severity": "High", "endpoint": login["endpoint"], "username": login["username"]}
+    for login in results["successful_logins"]
+]
+if results["login_endpoints"] and not results["account_lockout_detected"]:
+    results["vulnerabilities"].append({"type": "Missing Account Lockout", "severity": "Medium"})
+print(json.dumps(results, ensure_ascii=False))
+'''
+
+XSS_CODE = '''
+import json, requests
+
+PAYLOADS = {
+    "reflected": ['<script>alert("XSS")</script>', '"><script>alert("XSS")</script>'],
+    "attribute": ['" onmouseover="alert(1)', "' autofocus onfocus='alert(1)"],
+    "uri": ["javascript:alert('XSS')", '<img src=x onerror=alert("XSS")>'],
+}
+P = json.loads(__PARAMS__)
+results = {"target": P["target_url"], "tested": 0, "vulnerabilities": []}
+
+for group in P["payload_groups"]:
+    for payload in PAYLOADS[group]:
+        for param in P["parameters"]:
+            results["tested"] += 1
+            try:
+                response = requests.get(P["target_url"], params={param: payload}, timeout=P["timeout"])
+            except requests.RequestException:
+                continue
+            if payload in response.text:
+                results["vulnerabilities"].append({
+                    "type": "Reflected XSS", "severity": "Medium", "parameter": param,
+                    "payload_group": group, "payload": payload
+                })
+print(json.dumps(results, ensure_ascii=False))
+'''
+
+SSL_TLS_CODE = '''
+import json, socket, ssl
+from urllib.parse import urlparse
+
+P = json.loads(__PARAMS__)
+host = urlparse(P["target_url"]).hostname
+results = {"target": host, "port": P["port"], "vulnerabilities": []}
+
+try:
+    context = ssl.create_default_context()
+    with socket.create_connection((host, P["port"]), timeout=P["timeout"]) as sock:
+        with context.wrap_socket(sock, server_hostname=host) as tls:
+            cert = tls.getpeercert()
+            results.update({"tls_version": tls.version(), "cipher": tls.cipher(), "not_after": cert.get("notAfter")})
+except ssl.SSLCertVerificationError as e:
+    results["vulnerabilities"].append({"type": "Invalid Certificate", "severity": "High", "detail": str(e)})
+
+for version in P["legacy_protocols"]:
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    try:
+        context.minimum_version = context.maximum_version = getattr(ssl.TLSVersion, version)
+        with socket.create_connection((host, P["port"]), timeout=P["timeout"]) as sock:
+            with context.wrap_socket(sock, server_hostname=host):
+                results["vulnerabilities"].append({"type": "Legacy Protocol", "severity": "Medium", "protocol": version})
+    except (ssl.SSLError, OSError, ValueError, AttributeError):
+        continue
+print(json.dumps(results, ensure_ascii=False))
+'''
+
+
+def _sqlmap_commands(target_url: str, params: Dict[str, Any]) -> List[str]:
+    return [" ".join([
+        "sqlmap", "-u", shlex.quote(target_url), "--batch",
+        f"--crawl={params['crawl_depth']}", f"--level={params['level']}", f"--risk={params['risk']}",
+        f"--technique={''.join(params['techniques'])}", f"--timeout={params['timeout']}",
+        "--retries=1", "--disable-coloring"
+    ])]
+
+
+def _nmap_commands(target_url: str, params: Dict[str, Any]) -> List[str]:
+    host = urlparse(target_url).hostname or ""
+    args = ["nmap", "-Pn", "-p", ",".join(str(p) for p in params["ports"]), f"--host-timeout={params['host_timeout']}s"]
+    if params["service_detection"]:
+        args.append("-sV")
+    return [" ".join(args + [shlex.quote(host)])]
+
+
+TEMPLATES: Dict[str, ExecutionTemplate] = {
+    "brute_force": ExecutionTemplate(
+        test_type="brute_force",
+        description="로그인 페이지 탐지 후 약한 자격증명/계정 잠금 확인",
+        parameters={
+            "endpoints": {"type": "paths", "default": ["/login", "/admin", "/wp-admin", "/signin", "/auth"], "max_items": 20},
+            "credentials": {"type": "credentials", "default": [["admin", "admin"], ["admin", "password"], ["admin", "123456"],
+                                                                ["root", "root"], ["test", "test"]], "max_items": 20},
+            "max_attempts": {"type": "int", "default": 5, "min": 1, "max": 20},
+            "delay_seconds": {"type": "float", "default": 1.0, "min": 0.5, "max": 5.0},
+            "success_markers": {"type": "strings", "default": ["dashboard", "welcome", "logout"], "max_items": 10},
+            "timeout": {"type": "int", "default": 10, "min": 1, "max": 30},
+        },
+        code=BRUTE_FORCE_CODE,
+        shard_parameter="endpoints"
+    ),
+    "sql_injection": ExecutionTemplate(
+        test_type="sql_injection",
+        description="sqlmap 기반 SQL 인젝션 탐지 (데이터 추출/OS 명령 옵션 없음)",
+        parameters={
+            "techniques": {"type": "choices", "default": ["B", "E", "U", "T"], "choices": ["B", "E", "U", "S", "T", "Q"]},
+            "crawl_depth": {"type": "int", "default": 2, "min": 0, "max": 3},
+            "level": {"type": "int", "default": 1, "min": 1, "max": 3},
+            "risk": {"type": "int", "default": 1, "min": 1, "max": 2},
+            "timeout": {"type": "int", "default": 10, "min": 1, "max": 30},
+        },
+        commands=_sqlmap_commands,
+        shard_parameter="techniques",
+        expected_output="sqlmap 텍스트 출력"
+    ),
+    "xss_testing": ExecutionTemplate(
+        test_type="xss_testing",
+        description="검증된 페이로드 그룹으로 반사형 XSS 확인 (스크립트 실행 없음)",
+        parameters={
+            "payload_groups": {"type": "choices", "default": ["reflected", "attribute", "uri"],
+                               "choices": ["reflected", "attribute", "uri"]},
+            "parameters": {"type": "strings", "default": ["q", "search", "test"], "max_items": 20},
+            "timeout": {"type": "int", "default": 10, "min": 1, "max": 30},
+        },
+        code=XSS_CODE,
+        shard_parameter="payload_groups"
+    ),
+    "port_scan": ExecutionTemplate(
+        test_type="port_scan",
+        description="nmap 포트 스캔과 서비스 버전 탐지",
+        parameters={
+            "ports": {"type": "ports", "default": [21, 22, 25, 53, 80, 110, 143, 443, 993, 995, 3306, 5432, 6379, 27017],
+                      "max_items": 1000},
+            "service_detection": {"type": "bool", "default": True},
+            "host_timeout": {"type": "int", "default": 180, "min": 10, "max": 600},
+        },
+        commands=_nmap_commands,
+        expected_output="nmap 텍스트 출력"
+    ),
+    "ssl_tls_test": ExecutionTemplate(
+        test_type="ssl_tls_test",
+        description="인증서 유효성과 레거시 프로토콜 지원 여부 확인",
+        parameters={
+            "port": {"type": "int", "default": 443, "min": 1, "max": 65535},
+            "legacy_protocols": {"type": "choices", "default": ["TLSv1", "TLSv1_1"], "choices": ["SSLv3", "TLSv1", "TLSv1_1"]},
+            "timeout": {"type": "int", "default": 10, "min": 1, "max": 30},
+        },
+        code=SSL_TLS_CODE
+    ),
+}
+
+
+def shard_values(test_type: str, overrides: Optional[Dict[str, Any]] = None) -> Optional[List[Any]]:
+    """AI 파라미터까지 반영한 분할 파라미터 값 (분할할 수 없는 테스트는 None)"""
+
+    template = TEMPLATES.get(test_type)
+    if template is None or not template.shard_parameter:
+        return None
+    return template.resolve(overrides)[template.shard_parameter]
+
+
+def parameter_prompt(test_types: List[str]) -> str:
+    """AI가 채울 파라미터 설명 (유형, 기본값, 허용 범위)"""
+
+    lines = []
+    for test_type in test_types:
+        template = TEMPLATES.get(test_type)
+        if not template:
+            continue
+        lines.append(f"[{test_type}] {template.description}")
+        for name, spec in template.parameters.items():
+            constraint = spec.get("choices") or (f"{spec['min']}~{spec['max']}" if "min" in spec else spec["type"])
+            lines.append(f"- {name}: 기본값 {json.dumps(spec['default'], ensure_ascii=False)} (허용: {constraint})")
+    return "\n".join(lines)
+
+
+def render_package(test_type: str, target_url: str, overrides: Optional[Dict[str, Any]] = None,
+                   shard: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """테스트 유형의 실행 패키지 (템플릿이 없으면 None)"""
+
+    template = TEMPLATES.get(test_type)
+    if template is None:
+        return None
+
+    return template.render(target_url, overrides, shard)
+
+
+def custom_package(test_type: str, entry: Any) -> Optional[Dict[str, Any]]:
+    """템플릿이 없는 테스트 유형의 AI 생성 코드를 실행 패키지로 변환 (형식이 잘못되었거나 실행할 내용이 없으면 None)
+
+    생성된 명령어는 실행자의 명령어 정책으로 다시 검사됨
+    """
+
+    if not isinstance(entry, dict):
+        return None
+
+    code = entry.get("execution_code") or ""
+    commands = entry.get("shell_commands") or []
+    if not isinstance(code, str) or not isinstance(commands, list) or not all(isinstance(c, str) for c in commands):
+        return None
+    if not code.strip() and not commands:
+        return None
+
+    return {
+        "test_type": test_type,
+        "execution_code": code,
+        "shell_commands": commands,
+        "expected_output": str(entry.get("expected_output") or "JSON"),
+        "parameters": {},
+        "parameter_errors": [],
+        "shard": None
+    }
@@ -2,8 +2,11 @@
 관리자 AI 에이전트
 전체 보안 테스트 프로세스를 관리하고 조율
 """
+import json
 from typing import Dict, Any, List
 from .base_agent import BaseAgent
+from .execution_templates import TEMPLATES, custom_package, parameter_prompt, render_package, shard_values
+from .test_planner import TestPlanner
 from loguru import logger
 
 
@@ -11,12 +14,119 @@ class ManagerAgent(BaseAgent):
     """관리자 AI - 전체 프로세스 관리 및 조율"""
     
     async def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        """보안 테스트 계획 수립 및 실행 코드 생성"""
+        """보안 테스트 계획 수립 및 실행 패키지 생성
+        
+        템플릿이 있는 테스트는 AI가 파라미터만 생성하고 코드는 로컬에서 렌더링
+        """
         
         target_info = input_data.get("target_info", {})
         test_scope = input_data.get("test_scope", [])
         target_url = target_info.get("target_url", "")
         
+        # 실행 시간 기록과 현재 실행자 여유 용량으로 순서/분할/예상 완료 시각 결정
+        strategy = input_data.get("plan_strategy", "sjf")
+        planner = TestPlanner(input_data.get("runtime_stats"), input_data.get("capacity"))
+        schedule = planner.plan(test_scope, strategy=strategy)
+        test_scope = schedule["order"]
+        
+        templated = [t for t in test_scope if t in TEMPLATES]
+        custom = [t for t in test_scope if t not in TEMPLATES]
+        
+        try:
+            parameters = await self._generate_parameters(target_url, templated, schedule) if templated else {}
+            custom_packages = await self._generate_custom_packages(target_url, custom) if custom else {}
+            
+            # AI가 바꾼 분할 파라미터(엔드포인트, 기법, 페이로드 그룹)를 기준으로 샤드를 다시 나눔
+            values = {t: shard_values(t, parameters.get(t)) for t in templated}
+            schedule = planner.plan(test_scope, strategy=strategy, shard_values={t: v for t, v in values.items() if v is not None})
+            
+            # 실행 코드를 받지 못한 유형은 큐에 넣지 않고 건너뛴 테스트로 기록 (실행자가 빈 패키지로 실패하지 않도록)
+            skipped_tests = [
+                {"test_type": t, "reason": "실행 코드를 생성하지 못했습니다"} for t in custom if t not in custom_packages
+            ]
+            if skipped_tests:
+                skipped = {item["test_type"] for item in skipped_tests}
+                test_scope = [t for t in test_scope if t not in skipped]
+                schedule["order"] = test_scope
+                schedule["tasks"] = [task for task in schedule["tasks"] if task["test_type"] not in skipped]
+            
+            # 계획의 작업(샤드)마다 실행 패키지 렌더링
+            for task in schedule["tasks"]:
+                task["execution_package"] = (
+                    render_package(task["test_type"], target_url, parameters.get(task["test_type"]), task["shard"])
+                    if task["test_type"] in TEMPLATES else custom_packages[task["test_type"]]
+                )
+            
+            logger.info(f"{self.name}: 실행 패키지 생성 완료 (템플릿 {len(templated)}개, 직접 생성 {len(custom_packages)}개)")
+            
+            return {
+                "status": "success",
+                "agent": self.name,
+                "execution_codes": {
+                    **{t: render_package(t, target_url, parameters.get(t)) for t in templated},
+                    **custom_packages
+                },
+                "parameters": parameters,
+                "target_url": target_url,
+                "test_scope": test_scope,
+                "skipped_tests": skipped_tests,
+                "schedule": schedule,
+                "next_step": "distribute_to_executors"
+            }
+            
+        except Exception as e:
+            logger.error(f"{self.name}: 코드 생성 실패 - {e}")
+            return {
+                "status": "error",
+                "agent": self.name,
+                "error": str(e)
+            }
+    
+    async def _generate_parameters(self, target_url: str, test_scope: List[str], schedule: Dict[str, Any]) -> Dict[str, Any]:
+        """템플릿 파라미터 생성 (기본값과 다른 값만 짧은 JSON으로 받음)"""
+        
+        system_prompt = self.create_system_prompt() + """
+
+당신은 보안 테스트 관리자입니다. 실행 코드는 검증된 템플릿으로 이미 준비되어 있으므로
+대상에 맞게 템플릿 파라미터만 조정하세요. 설명 없이 JSON 객체 하나로만 응답합니다.
+"""
+        
+        user_prompt = f"""
+보안 테스트 대상: {target_url}
+
+{self._schedule_notes(test_scope, schedule)}
+
+템플릿 파라미터:
+{parameter_prompt(test_scope)}
+
+기본값에서 바꿀 파라미터만 다음 형식으로 응답하세요 (바꿀 것이 없으면 {{}}):
+{{"test_type": {{"파라미터": 값}}}}
+"""
+        
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+        
+        response = await self.call_llm(messages, max_tokens=400)
+        return self._parse_parameters(response, test_scope)
+    
+    def _parse_parameters(self, response: str, test_scope: List[str]) -> Dict[str, Any]:
+        """AI 응답에서 파라미터 JSON 추출 (형식이 잘못되면 기본값 사용)"""
+        
+        try:
+            parsed = json.loads(response[response.index("{"):response.rindex("}") + 1])
+        except ValueError:
+            logger.warning(f"{self.name}: 파라미터 응답을 해석할 수 없어 기본값 사용")
+            return {}
+        
+        if not isinstance(parsed, dict):
+            return {}
+        return {t: parsed[t] for t in test_scope if isinstance(parsed.get(t), dict)}
+    
+    async def _generate_custom_packages(self, target_url: str, test_scope: List[str]) -> Dict[str, Dict[str, Any]]:
+        """템플릿이 없는 테스트 유형은 실행 코드를 직접 생성하여 실행 패키지로 변환"""
+        
         system_prompt = self.create_system_prompt() + """
 
 당신은 보안 테스트 관리자로서 실행자 AI들이 바로 실행할 수 있는 완벽한 코드를 생성해야 합니다.
@@ -27,24 +137,20 @@ class ManagerAgent(BaseAgent):
 3. 결과 파싱 로직
 4. 에러 처리 코드
 
-실행자들은 이 코드를 받아서 그대로 실행만 하면 됩니다.
+실행자들은 이 코드를 받아서 그대로 실행만 하면 됩니다. 설명 없이 JSON 객체 하나로만 응답합니다.
 """
         
         user_prompt = f"""
 보안 테스트 대상: {target_url}
 테스트 유형: {', '.join(test_scope)}
 
-다음 테스트들에 대해 완벽한 실행 코드를 생성해주세요:
-
-{self._generate_test_requirements(test_scope)}
-
-각 테스트별로 다음 형식으로 제공하세요:
+테스트 유형을 키로 하여 다음 형식으로 제공하세요:
 {{
-    "test_type": "브루트포스",
-    "execution_code": "완전한 Python 코드",
-    "shell_commands": ["필요한 쉘 명령어들"],
-    "expected_output": "예상 결과 형식",
-    "parsing_logic": "결과 파싱 코드"
+    "테스트 유형": {{
+        "execution_code": "완전한 Python 코드 (결과를 JSON으로 출력)",
+        "shell_commands": ["필요한 쉘 명령어들"],
+        "expected_output": "예상 결과 형식"
+    }}
 }}
 """
         
@@ -53,77 +159,36 @@ class ManagerAgent(BaseAgent):
             {"role": "user", "content": user_prompt}
         ]
         
+        response = await self.call_llm(messages, max_tokens=4000)
+        return self._parse_custom_packages(response, test_scope)
+    
+    def _parse_custom_packages(self, response: str, test_scope: List[str]) -> Dict[str, Dict[str, Any]]:
+        """AI 응답에서 테스트 유형별 실행 패키지 추출 (형식이 잘못된 유형은 제외)"""
+        
         try:
-            response = await self.call_llm(messages, max_tokens=4000)
-            logger.info(f"{self.name}: 실행 코드 생성 완료")
-            
-            return {
-                "status": "success",
-                "agent": self.name,
-                "execution_codes": response,
-                "target_url": target_url,
-                "test_scope": test_scope,
-                "next_step": "distribute_to_executors"
-            }
-            
-        except Exception as e:
-            logger.error(f"{self.name}: 코드 생성 실패 - {e}")
-            return {
-                "status": "error",
-                "agent": self.name,
-                "error": str(e)
-            }
+            parsed = json.loads(response[response.index("{"):response.rindex("}") + 1])
+        except ValueError:
+            logger.warning(f"{self.name}: 실행 코드 응답을 해석할 수 없음")
+            return {}
+        
+        if not isinstance(parsed, dict):
+            return {}
+        
+        packages = {t: custom_package(t, parsed.get(t)) for t in test_scope}
+        return {t: package for t, package in packages.items() if package}
     
-    def _generate_test_requirements(self, test_scope: list) -> str:
-        """테스트 유형별 요구사항 생성"""
-        
-        requirements = {
-            "brute_force": """
-브루트포스 테스트:
-- 로그인 페이지 탐지 (/login, /admin, /wp-admin 등)
-- 일반적인 패스워드 리스트로 테스트 (admin/admin, admin/password 등)
-- 계정 잠금 정책 확인
-- 응답 시간 분석으로 유효한 사용자명 탐지
-- 실행 시간: 최대 10분
-""",
-            "sql_injection": """
-SQL 인젝션 테스트:
-- GET/POST 파라미터에 SQL 페이로드 삽입
-- Error-based, Boolean-based, Time-based 테스트
-- sqlmap 도구 사용 또는 커스텀 페이로드
-- 데이터베이스 정보 추출 시도
-- 실행 시간: 최대 15분
-""",
-            "xss_testing": """
-XSS 테스트:
-- Reflected, Stored, DOM-based XSS 테스트
-- 다양한 XSS 페이로드 시도
-- 입력 필드, URL 파라미터, 헤더 테스트
-- WAF 우회 기법 적용
-- 실행 시간: 최대 5분
-""",
-            "port_scan": """
-포트 스캔:
-- nmap을 사용한 포트 스캔
-- 서비스 버전 탐지
-- OS 핑거프린팅
-- 취약한 서비스 식별
-- 실행 시간: 최대 3분
-""",
-            "ssl_tls_test": """
-SSL/TLS 테스트:
-- 인증서 유효성 검사
-- 암호화 강도 확인
-- 프로토콜 버전 테스트
-- 취약한 암호화 알고리즘 탐지
-- 실행 시간: 최대 2분
-"""
-        }
+    def _schedule_notes(self, test_scope: list, schedule: Dict[str, Any]) -> str:
+        """테스트별 예상 실행 시간과 분할 방식 (파라미터 조정 참고용)"""
         
         result = []
         for test_type in test_scope:
-            if test_type in requirements:
-                result.append(requirements[test_type])
+            estimate = schedule["estimates"][test_type]
+            line = f"- {test_type}: 예상 실행 시간 {estimate['seconds'] / 60:.1f}분"
+            
+            shards = [task["shard"] for task in schedule["tasks"] if task["test_type"] == test_type and task["shard"]]
+            if shards:
+                line += f", {len(shards)}개 샤드로 병렬 실행 ({shards[0]['key']} 기준, 샤드 값은 자동 적용)"
+            result.append(line)
         
         return "\n".join(result)
     
@@ -2,6 +2,7 @@
 정적 분석 실행자 AI
 """
 from typing import Dict, Any
+from core.deadline import Deadline
 from .base_agent import BaseAgent
 from loguru import logger
 
@@ -27,7 +28,8 @@ class StaticAnalysisExecutor(BaseAgent):
             # 코드 실행자 생성
             executor = ExecutorAgent(
                 executor_id=f"static_{self.primary_provider}",
-                ai_provider=self.primary_provider
+                ai_provider=self.primary_provider,
+                deadline=Deadline.from_payload(input_data)
             )
             
             # 관리자 AI가 생성한 코드 실행
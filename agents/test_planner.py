@@ -0,0 +1,150 @@
+"""
+비용/지연 인지 테스트 계획
+기록된 테스트별 실행 시간과 현재 실행자 여유 용량으로 실행 순서, 분할(샤드), 예상 완료 시각을 계산
+"""
+import math
+import time
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, List, Optional
+
+from .execution_templates import TEMPLATES
+
+
+# 기록이 없을 때 쓰는 기본 실행 시간(초)
+DEFAULT_RUNTIMES = {
+    "brute_force": 600,
+    "sql_injection": 900,
+    "xss_testing": 300,
+    "port_scan": 180,
+    "ssl_tls_test": 120,
+}
+DEFAULT_RUNTIME = 300
+
+# 테스트별 가치 (발견 시 영향도 기준 가중치, value 전략에서 초당 가치로 정렬)
+TEST_VALUES = {
+    "sql_injection": 10,
+    "brute_force": 6,
+    "xss_testing": 6,
+    "ssl_tls_test": 3,
+    "port_scan": 3,
+}
+DEFAULT_VALUE = 3
+
+def _template_default(test_type: str) -> List[Any]:
+    """실행 템플릿의 분할 파라미터 기본값 (AI 파라미터를 받기 전 첫 계획에 사용)"""
+    template = TEMPLATES[test_type]
+    return list(template.parameters[template.shard_parameter]["default"])
+
+
+# 나눠서 병렬 실행할 수 있는 테스트와 분할 기준
+SHARDABLE_TESTS = {
+    "sql_injection": {"key": "technique", "values": _template_default("sql_injection")},
+    "brute_force": {"key": "endpoint", "values": _template_default("brute_force")},
+    "xss_testing": {"key": "payload_group", "values": _template_default("xss_testing")},
+}
+TARGET_SHARD_SECONDS = 180
+
+DEFAULT_SLOTS = 4
+
+
+@dataclass
+class PlannedTask:
+    """실행자에게 보낼 작업 하나 (분할된 테스트면 샤드 하나)"""
+    test_type: str
+    estimated_seconds: float
+    shard: Optional[Dict[str, Any]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class TestPlanner:
+    """실행 시간 통계와 용량 기반 테스트 계획"""
+
+    __test__ = False  # pytest 수집 대상 아님
+
+    def __init__(self, runtime_stats: Optional[Dict[str, Dict[str, Any]]] = None, capacity: Optional[Dict[str, Any]] = None):
+        self.runtime_stats = runtime_stats or {}
+        self.capacity = capacity or {}
+
+    def estimate(self, test_type: str) -> Dict[str, Any]:
+        """테스트 하나의 예상 실행 시간 (기록이 있으면 최근 평균)"""
+
+        stats = self.runtime_stats.get(test_type) or {}
+        if stats.get("count"):
+            return {"seconds": float(stats["avg_seconds"]), "samples": int(stats["count"]), "source": "history"}
+        return {"seconds": float(DEFAULT_RUNTIMES.get(test_type, DEFAULT_RUNTIME)), "samples": 0, "source": "default"}
+
+    def order(self, test_types: List[str], strategy: str = "sjf") -> List[str]:
+        """sjf: 짧은 테스트 먼저, value: 초당 가치가 높은 테스트 먼저"""
+
+        if strategy == "value":
+            return sorted(test_types, key=lambda t: -TEST_VALUES.get(t, DEFAULT_VALUE) / self.estimate(t)["seconds"])
+        return sorted(test_types, key=lambda t: self.estimate(t)["seconds"])
+
+    @property
+    def slots(self) -> int:
+        return max(1, int(self.capacity.get("slots") or DEFAULT_SLOTS))
+
+    def shard(self, test_type: str, seconds: float, values: Optional[List[Any]] = None) -> List[PlannedTask]:
+        """긴 테스트를 여유 슬롯 수 안에서 나눔
+
+        values: 실제로 나눌 분할 파라미터 값 (AI 파라미터 반영, 없으면 템플릿 기본값)
+        """
+
+        spec = SHARDABLE_TESTS.get(test_type)
+        values = (values if values is not None else spec["values"]) if spec else []
+        count = min(
+            len(values) if spec else 1,
+            math.ceil(seconds / TARGET_SHARD_SECONDS),
+            self.slots
+        )
+        if count <= 1:
+            return [PlannedTask(test_type, seconds)]
+
+        groups = [values[i::count] for i in range(count)]
+        return [
+            PlannedTask(
+                test_type,
+                round(seconds * len(group) / len(values), 1),
+                {"index": i, "count": count, "key": spec["key"], "values": group,
+                 "fraction": round(len(group) / len(values), 4)}
+            )
+            for i, group in enumerate(groups)
+        ]
+
+    def plan(self, test_types: List[str], strategy: str = "sjf",
+             shard_values: Optional[Dict[str, List[Any]]] = None) -> Dict[str, Any]:
+        """실행 순서, 작업 목록, 예상 완료 시각
+
+        shard_values: 테스트별 실제 분할 파라미터 값 (파라미터 생성 후 다시 계획할 때)
+        """
+
+        shard_values = shard_values or {}
+        ordered = self.order(test_types, strategy)
+        tasks = [
+            task
+            for test_type in ordered
+            for task in self.shard(test_type, self.estimate(test_type)["seconds"], shard_values.get(test_type))
+        ]
+
+        # 현재 적체를 먼저 처리한 뒤 슬롯에 순서대로 배정 (가장 먼저 비는 슬롯에)
+        queue_wait = float(self.capacity.get("backlog_seconds") or 0.0)
+        slot_free_at = [0.0] * self.slots
+        for task in tasks:
+            index = slot_free_at.index(min(slot_free_at))
+            slot_free_at[index] += task.estimated_seconds
+        makespan = max(slot_free_at)
+
+        estimated_seconds = round(queue_wait + makespan, 1)
+
+        return {
+            "strategy": strategy,
+            "order": ordered,
+            "tasks": [task.to_dict() for task in tasks],
+            "estimates": {test_type: self.estimate(test_type) for test_type in ordered},
+            "slots": self.slots,
+            "queue_wait_seconds": round(queue_wait, 1),
+            "estimated_seconds": estimated_seconds,
+            "estimated_completion_at": time.time() + estimated_seconds
+        }
@@ -0,0 +1,55 @@
+"""
+Alembic 마이그레이션 환경 (대시보드와 같은 DATABASE_URL 사용, 동기 드라이버로 실행)
+"""
+import os
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+from web.models import Base
+from web.search import FULLTEXT_TABLE, FULLTEXT_COLUMN
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./security_dashboard.db")
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    """모델에 없는 전문 검색 색인(FTS5 가상 테이블과 부속 테이블, tsvector 열/인덱스)은 비교에서 제외"""
+    if type_ == "table" and name.startswith(FULLTEXT_TABLE):
+        return False
+    if name in (FULLTEXT_COLUMN, f"ix_findings_{FULLTEXT_COLUMN}"):
+        return False
+    return True
+
+
+def run_migrations_offline():
+    """SQL 스크립트만 출력"""
+    context.configure(url=DATABASE_URL, target_metadata=target_metadata, literal_binds=True, include_object=include_object)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    """데이터베이스에 직접 적용 (SQLite는 ALTER 제약 때문에 배치 모드 사용)"""
+    engine = create_engine(DATABASE_URL, poolclass=pool.NullPool)
+    with engine.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+            render_as_batch=connection.dialect.name == "sqlite"
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
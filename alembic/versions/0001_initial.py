@@ -0,0 +1,48 @@
+"""기존 스키마 (create_all로 만든 데이터베이스는 alembic stamp 0001 후 업그레이드)
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "api_keys",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("provider", sa.String(50), nullable=False),
+        sa.Column("config", sa.JSON(), nullable=False),
+        sa.Column("is_active", sa.Boolean(), default=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_api_keys_id", "api_keys", ["id"])
+
+    op.create_table(
+        "security_tests",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("target_url", sa.String(500), nullable=False),
+        sa.Column("target_type", sa.String(100), nullable=False),
+        sa.Column("test_types", sa.Text(), nullable=False),
+        sa.Column("test_id", sa.String(100)),
+        sa.Column("status", sa.String(50), default="pending"),
+        sa.Column("progress", sa.Integer(), default=0),
+        sa.Column("results", sa.JSON()),
+        sa.Column("error_message", sa.Text()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_security_tests_id", "security_tests", ["id"])
+
+
+def downgrade():
+    op.drop_table("security_tests")
+    op.drop_table("api_keys")
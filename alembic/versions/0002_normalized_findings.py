@@ -0,0 +1,171 @@
+"""테스트 실행/발견 사항 테이블과 대시보드 조회용 인덱스, 기존 results JSON에서 발견 사항 이관
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+import hashlib
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_security_tests_test_id", "security_tests", ["test_id"])
+    op.create_index("ix_security_tests_created_at", "security_tests", ["created_at"])
+    op.create_index("ix_security_tests_status_created_at", "security_tests", ["status", "created_at"])
+    op.create_index("ix_security_tests_target_created_at", "security_tests", ["target_url", "created_at"])
+
+    op.create_table(
+        "test_runs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("security_test_id", sa.Integer(), sa.ForeignKey("security_tests.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("test_type", sa.String(100), nullable=False),
+        sa.Column("status", sa.String(50)),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("finished_at", sa.DateTime(timezone=True)),
+        sa.UniqueConstraint("security_test_id", "test_type", name="uq_test_runs_test_type"),
+    )
+    op.create_index("ix_test_runs_test_type_status", "test_runs", ["test_type", "status"])
+
+    op.create_table(
+        "findings",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("security_test_id", sa.Integer(), sa.ForeignKey("security_tests.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("test_run_id", sa.Integer(), sa.ForeignKey("test_runs.id", ondelete="SET NULL")),
+        sa.Column("fingerprint", sa.String(64), nullable=False),
+        sa.Column("target_url", sa.String(500), nullable=False),
+        sa.Column("test_type", sa.String(100), nullable=False),
+        sa.Column("finding_type", sa.String(200), nullable=False),
+        sa.Column("severity", sa.String(20), nullable=False),
+        sa.Column("title", sa.String(500)),
+        sa.Column("location", sa.String(1000)),
+        sa.Column("details", sa.JSON()),
+        sa.Column("source", sa.String(200)),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint("security_test_id", "fingerprint", name="uq_findings_fingerprint"),
+    )
+    op.create_index("ix_findings_target_severity_created_at", "findings", ["target_url", "severity", "created_at"])
+    op.create_index("ix_findings_test_severity", "findings", ["security_test_id", "severity"])
+    op.create_index("ix_findings_type_created_at", "findings", ["finding_type", "created_at"])
+
+    backfill()
+
+
+# 이관 당시의 발견 사항 추출/변환 규칙 (애플리케이션 코드가 바뀌어도 마이그레이션 결과가 같도록 고정한 사본,
+# 에이전트/LLM 의존성 없이 실행)
+SEVERITIES = ["critical", "high", "medium", "low", "info"]
+SEVERITY_ALIASES = {"위험": "high", "심각": "critical", "주의": "medium", "경고": "medium", "낮음": "low", "정보": "info"}
+LOCATION_FIELDS = ("endpoint", "url", "parameter", "port", "protocol")
+
+
+def extract_findings(execution_result):
+    findings = []
+
+    def walk(node, test_type):
+        if isinstance(node, dict):
+            test_type = node.get("test_type", test_type)
+            for item in node.get("vulnerabilities", []) or []:
+                if isinstance(item, dict):
+                    findings.append({"test_type": test_type, **item})
+            for value in node.values():
+                walk(value, test_type)
+        elif isinstance(node, list):
+            for value in node:
+                walk(value, test_type)
+
+    walk(execution_result, "unknown")
+    return findings
+
+
+def finding_key(finding):
+    return hashlib.sha1(json.dumps(finding, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+
+def normalize_severity(value):
+    value = str(value or "").strip().lower()
+    value = SEVERITY_ALIASES.get(value, value)
+    return value if value in SEVERITIES else "info"
+
+
+def finding_fields(finding):
+    finding_type = str(finding.get("type") or finding.get("name") or "unknown")[:200]
+    location = " ".join(f"{name}={finding[name]}" for name in LOCATION_FIELDS if finding.get(name) is not None)
+
+    return {
+        "test_type": finding.get("test_type") or "unknown",
+        "finding_type": finding_type,
+        "severity": normalize_severity(finding.get("severity")),
+        "title": str(finding.get("title") or finding.get("description") or finding_type)[:500],
+        "location": location[:1000] or None,
+        "details": finding
+    }
+
+
+def backfill():
+    """기존 스캔의 test_types와 results JSON을 테스트 실행/발견 사항 행으로 이관"""
+
+    conn = op.get_bind()
+    tests = conn.execute(sa.text(
+        "SELECT id, target_url, test_types, status, results, created_at FROM security_tests"
+    )).mappings().all()
+
+    test_runs = sa.table(
+        "test_runs",
+        sa.column("security_test_id"), sa.column("test_type"), sa.column("status"), sa.column("created_at")
+    )
+    findings = sa.table(
+        "findings",
+        sa.column("security_test_id"), sa.column("test_run_id"), sa.column("fingerprint"), sa.column("target_url"),
+        sa.column("test_type"), sa.column("finding_type"), sa.column("severity"), sa.column("title"),
+        sa.column("location"), sa.column("details", sa.JSON()), sa.column("source"), sa.column("created_at")
+    )
+
+    for test in tests:
+        status = {"completed": "completed", "failed": "failed"}.get(test["status"], "running")
+        test_types = [t for t in dict.fromkeys((test["test_types"] or "").split(",")) if t]
+        if test_types:
+            conn.execute(test_runs.insert(), [
+                {"security_test_id": test["id"], "test_type": t, "status": status, "created_at": test["created_at"]}
+                for t in test_types
+            ])
+
+        results = test["results"]
+        if isinstance(results, str):
+            results = json.loads(results)
+        if not results:
+            continue
+
+        run_ids = dict(conn.execute(
+            sa.text("SELECT test_type, id FROM test_runs WHERE security_test_id = :id"), {"id": test["id"]}
+        ).all())
+
+        rows = {}
+        for finding in extract_findings(results):
+            rows.setdefault(finding_key(finding), {
+                "security_test_id": test["id"],
+                "test_run_id": run_ids.get(finding.get("test_type")),
+                "fingerprint": finding_key(finding),
+                "target_url": test["target_url"],
+                "source": "migration",
+                "created_at": test["created_at"],
+                **finding_fields(finding)
+            })
+        if rows:
+            conn.execute(findings.insert(), list(rows.values()))
+
+
+def downgrade():
+    op.drop_table("findings")
+    op.drop_table("test_runs")
+    op.drop_index("ix_security_tests_target_created_at", table_name="security_tests")
+    op.drop_index("ix_security_tests_status_created_at", table_name="security_tests")
+    op.drop_index("ix_security_tests_created_at", table_name="security_tests")
+    op.drop_index("ix_security_tests_test_id", table_name="security_tests")
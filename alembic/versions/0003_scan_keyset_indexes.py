@@ -0,0 +1,31 @@
+"""스캔 목록 커서 페이지네이션용 (created_at, id) 인덱스
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    "ix_security_tests_created_at": ("ix_security_tests_created_at_id", ["created_at"]),
+    "ix_security_tests_status_created_at": ("ix_security_tests_status_created_at_id", ["status", "created_at"]),
+    "ix_security_tests_target_created_at": ("ix_security_tests_target_created_at_id", ["target_url", "created_at"]),
+}
+
+
+def upgrade():
+    for old_name, (new_name, columns) in INDEXES.items():
+        op.create_index(new_name, "security_tests", [*columns, "id"])
+        op.drop_index(old_name, table_name="security_tests")
+
+
+def downgrade():
+    for old_name, (new_name, columns) in INDEXES.items():
+        op.create_index(old_name, "security_tests", columns)
+        op.drop_index(new_name, table_name="security_tests")
@@ -0,0 +1,94 @@
+"""대시보드 일별 집계 테이블과 기존 스캔 집계
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+from collections import Counter
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "scan_rollups",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("completed", sa.Integer(), nullable=False),
+        sa.Column("failed", sa.Integer(), nullable=False),
+        sa.Column("total_duration_seconds", sa.Float(), nullable=False),
+    )
+    op.create_table(
+        "finding_rollups",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("target_url", sa.String(500), primary_key=True),
+        sa.Column("severity", sa.String(20), primary_key=True),
+        sa.Column("findings", sa.Integer(), nullable=False),
+    )
+    op.create_index("ix_finding_rollups_target_day", "finding_rollups", ["target_url", "day"])
+
+    backfill()
+
+
+def as_datetime(value):
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def backfill():
+    """종료된 기존 스캔을 종료일(updated_at, 없으면 created_at) 기준으로 집계"""
+
+    conn = op.get_bind()
+    tests = conn.execute(sa.text(
+        "SELECT id, target_url, status, created_at, updated_at FROM security_tests WHERE status IN ('completed', 'failed')"
+    )).mappings().all()
+
+    scans = {}
+    findings = Counter()
+    for test in tests:
+        created_at = as_datetime(test["created_at"])
+        finished_at = as_datetime(test["updated_at"]) or created_at
+        if finished_at is None:
+            continue
+
+        day = finished_at.date()
+        row = scans.setdefault(day, {"day": day, "completed": 0, "failed": 0, "total_duration_seconds": 0.0})
+        if test["status"] == "completed":
+            row["completed"] += 1
+            row["total_duration_seconds"] += max(0.0, (finished_at - created_at).total_seconds())
+        else:
+            row["failed"] += 1
+
+        for severity, count in conn.execute(
+            sa.text("SELECT severity, COUNT(*) FROM findings WHERE security_test_id = :id GROUP BY severity"),
+            {"id": test["id"]}
+        ).all():
+            findings[(day, test["target_url"], severity)] += count
+
+    scan_rollups = sa.table(
+        "scan_rollups",
+        sa.column("day", sa.Date()), sa.column("completed"), sa.column("failed"), sa.column("total_duration_seconds")
+    )
+    finding_rollups = sa.table(
+        "finding_rollups",
+        sa.column("day", sa.Date()), sa.column("target_url"), sa.column("severity"), sa.column("findings")
+    )
+
+    if scans:
+        conn.execute(scan_rollups.insert(), list(scans.values()))
+    if findings:
+        conn.execute(finding_rollups.insert(), [
+            {"day": day, "target_url": target_url, "severity": severity, "findings": count}
+            for (day, target_url, severity), count in findings.items()
+        ])
+
+
+def downgrade():
+    op.drop_table("finding_rollups")
+    op.drop_table("scan_rollups")
@@ -0,0 +1,25 @@
+"""일괄 등록 배치 ID
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("security_tests", sa.Column("batch_id", sa.String(26)))
+    op.create_index("ix_security_tests_batch_id", "security_tests", ["batch_id"])
+
+
+def downgrade():
+    op.drop_index("ix_security_tests_batch_id", table_name="security_tests")
+    with op.batch_alter_table("security_tests") as batch_op:
+        batch_op.drop_column("batch_id")
@@ -0,0 +1,137 @@
+"""발견 사항 검색 역색인과 전문 검색 색인, 종료된 스캔의 발견 사항 색인
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+"""
+import json
+from urllib.parse import urlparse
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+# 색인 당시의 규칙 (web.search가 바뀌어도 마이그레이션 결과가 같도록 고정한 사본)
+TERM_KEYS = {
+    "port": ("port", "ports"),
+    "parameter": ("parameter", "param", "parameters"),
+    "payload": ("payload", "payloads"),
+    "endpoint": ("endpoint", "path", "url")
+}
+TEXT_KEYS = ("description", "detail", "evidence", "recommendation")
+MAX_TERM_LENGTH = 200
+INDEX_BATCH_SIZE = 1000
+
+FULLTEXT_TABLE = "findings_fts"
+FULLTEXT_COLUMN = "search_vector"
+
+
+def normalize_term(value):
+    return str(value).strip().lower()[:MAX_TERM_LENGTH]
+
+
+def target_host(target_url):
+    parsed = urlparse(target_url if "://" in target_url else f"//{target_url}")
+    return normalize_term(parsed.hostname or target_url)
+
+
+def finding_terms(finding):
+    details = finding.get("details") or {}
+    terms = {("type", normalize_term(finding["finding_type"])), ("target", target_host(finding["target_url"]))}
+
+    for field, keys in TERM_KEYS.items():
+        for key in keys:
+            values = details.get(key)
+            for value in values if isinstance(values, list) else [values]:
+                if value is not None and not isinstance(value, (dict, list)) and str(value).strip():
+                    terms.add((field, normalize_term(value)))
+
+    return [{"field": field, "value": value, "finding_id": finding["id"]} for field, value in terms]
+
+
+def fulltext_rows(findings):
+    rows = []
+    for finding in findings:
+        details = finding.get("details") or {}
+        body = " ".join(str(details[key]) for key in TEXT_KEYS if isinstance(details.get(key), (str, int, float)))
+        rows.append({"rowid": finding["id"], "title": finding["title"] or finding["finding_type"], "body": body})
+    return rows
+
+
+def create_fulltext_index(conn):
+    if conn.dialect.name == "sqlite":
+        conn.execute(sa.text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FULLTEXT_TABLE} USING fts5(title, body, tokenize='unicode61')"
+        ))
+    elif conn.dialect.name == "postgresql":
+        conn.execute(sa.text(
+            f"ALTER TABLE findings ADD COLUMN IF NOT EXISTS {FULLTEXT_COLUMN} tsvector GENERATED ALWAYS AS ("
+            "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(details->>'description', '') || ' ' "
+            "|| coalesce(details->>'detail', '') || ' ' || coalesce(details->>'evidence', '') || ' ' "
+            "|| coalesce(details->>'recommendation', ''))) STORED"
+        ))
+        conn.execute(sa.text(
+            f"CREATE INDEX IF NOT EXISTS ix_findings_{FULLTEXT_COLUMN} ON findings USING gin ({FULLTEXT_COLUMN})"
+        ))
+
+
+def upgrade():
+    op.create_table(
+        "finding_terms",
+        sa.Column("field", sa.String(20), primary_key=True),
+        sa.Column("value", sa.String(200), primary_key=True),
+        sa.Column("finding_id", sa.Integer(), sa.ForeignKey("findings.id", ondelete="CASCADE"), primary_key=True),
+    )
+    op.create_index("ix_finding_terms_finding_id", "finding_terms", ["finding_id"])
+
+    create_fulltext_index(op.get_bind())
+
+    backfill()
+
+
+def backfill():
+    """이미 종료된 스캔의 발견 사항을 색인 (진행 중인 스캔은 종료 시 색인됨)"""
+
+    conn = op.get_bind()
+    terms = sa.table(
+        "finding_terms",
+        sa.column("field"), sa.column("value"), sa.column("finding_id")
+    )
+
+    last_id = 0
+    while True:
+        rows = [dict(row) for row in conn.execute(sa.text(
+            "SELECT f.id, f.finding_type, f.target_url, f.title, f.details FROM findings f "
+            "JOIN security_tests t ON t.id = f.security_test_id "
+            "WHERE t.status IN ('completed', 'failed') AND f.id > :last_id ORDER BY f.id LIMIT :limit"
+        ), {"last_id": last_id, "limit": INDEX_BATCH_SIZE}).mappings()]
+        if not rows:
+            return
+
+        for row in rows:
+            if isinstance(row["details"], str):
+                row["details"] = json.loads(row["details"])
+
+        conn.execute(terms.insert(), [term for row in rows for term in finding_terms(row)])
+        if conn.dialect.name == "sqlite":
+            conn.execute(
+                sa.text(f"INSERT INTO {FULLTEXT_TABLE} (rowid, title, body) VALUES (:rowid, :title, :body)"),
+                fulltext_rows(rows)
+            )
+        last_id = rows[-1]["id"]
+
+
+def downgrade():
+    conn = op.get_bind()
+    if conn.dialect.name == "sqlite":
+        op.execute(f"DROP TABLE IF EXISTS {FULLTEXT_TABLE}")
+    elif conn.dialect.name == "postgresql":
+        op.execute(f"DROP INDEX IF EXISTS ix_findings_{FULLTEXT_COLUMN}")
+        op.execute(f"ALTER TABLE findings DROP COLUMN IF EXISTS {FULLTEXT_COLUMN}")
+    op.drop_table("finding_terms")
@@ -0,0 +1,201 @@
+"""
+도구 원본 출력 저장소
+- 내용의 SHA-256을 키로 zstd 압축하여 저장 (같은 출력은 한 번만 저장)
+- 큐 메시지와 DB에는 참조({"artifact": sha256, ...})만 남기고, 필요한 곳에서 원본을 다시 채움
+- 로컬 파일시스템 또는 S3 호환 저장소 (ARTIFACT_STORE=fs|s3)
+"""
+import hashlib
+import json
+import os
+import tempfile
+from contextlib import closing
+from typing import Dict, Any, Iterator, Optional
+
+import zstandard
+from loguru import logger
+
+
+# 이 길이를 넘는 출력만 저장소로 옮김 (짧은 출력은 메시지에 그대로 둠)
+OFFLOAD_THRESHOLD = int(os.getenv("ARTIFACT_THRESHOLD", "4096"))
+PREVIEW_CHARS = 500
+ZSTD_LEVEL = int(os.getenv("ARTIFACT_ZSTD_LEVEL", "3"))
+
+# 도구 원본 출력이 담기는 필드
+OUTPUT_KEYS = {"output", "stdout", "stderr", "raw_output", "result", "error"}
+
+CHUNK_SIZE = 64 * 1024
+
+
+def artifact_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def is_artifact_ref(value) -> bool:
+    return isinstance(value, dict) and "artifact" in value and "size" in value
+
+
+class ArtifactStore:
+    """압축/주소 지정 공통 처리 (저장 위치는 하위 클래스)"""
+
+    def put(self, data: bytes, content_type: str = "text/plain; charset=utf-8") -> Dict[str, Any]:
+        """저장 후 참조 반환 (이미 있으면 다시 쓰지 않음)"""
+
+        digest = artifact_digest(data)
+        meta = self.metadata(digest)
+        if meta is None:
+            compressed = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+            meta = {"size": len(data), "compressed_size": len(compressed), "content_type": content_type}
+            self._write(digest, compressed, meta)
+
+        return {"artifact": digest, **meta}
+
+    def get(self, digest: str) -> bytes:
+        return b"".join(self.iter_range(digest))
+
+    def iter_range(self, digest: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """압축을 풀면서 [start, end] 구간(양 끝 포함)만 내보냄"""
+
+        remaining = None if end is None else end - start + 1
+        with self._open(digest) as compressed:
+            reader = zstandard.ZstdDecompressor().stream_reader(compressed)
+
+            # zstd 프레임은 임의 위치 접근이 안 되므로 앞부분은 풀어서 버림
+            to_skip = start
+            while to_skip > 0:
+                skipped = len(reader.read(min(CHUNK_SIZE, to_skip)))
+                if not skipped:
+                    return
+                to_skip -= skipped
+
+            while remaining is None or remaining > 0:
+                chunk = reader.read(CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    return
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    def metadata(self, digest: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def _write(self, digest: str, compressed: bytes, meta: Dict[str, Any]):
+        raise NotImplementedError
+
+    def _open(self, digest: str):
+        raise NotImplementedError
+
+
+class LocalArtifactStore(ArtifactStore):
+    """파일시스템 저장소 (root/ab/cd/<sha256>.zst + 메타데이터 .json)"""
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or os.getenv("ARTIFACT_ROOT", "./artifacts")
+
+    def _path(self, digest: str, suffix: str) -> str:
+        return os.path.join(self.root, digest[:2], digest[2:4], f"{digest}{suffix}")
+
+    def metadata(self, digest: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(digest, ".json")) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write(self, digest: str, compressed: bytes, meta: Dict[str, Any]):
+        directory = os.path.dirname(self._path(digest, ".zst"))
+        os.makedirs(directory, exist_ok=True)
+
+        # 여러 실행자가 같은 출력을 동시에 써도 완성된 파일만 보이도록 임시 파일 후 교체 (메타데이터는 마지막에)
+        for suffix, content in ((".zst", compressed), (".json", json.dumps(meta).encode())):
+            fd, temp_path = tempfile.mkstemp(dir=directory)
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(temp_path, self._path(digest, suffix))
+
+    def _open(self, digest: str):
+        return open(self._path(digest, ".zst"), "rb")
+
+
+class S3ArtifactStore(ArtifactStore):
+    """S3 호환 저장소 (MinIO 등은 S3_ENDPOINT_URL로 지정)"""
+
+    def __init__(self, bucket: Optional[str] = None, endpoint_url: Optional[str] = None, prefix: str = "artifacts/"):
+        import boto3
+
+        self.bucket = bucket or os.getenv("ARTIFACT_BUCKET", "security-artifacts")
+        self.prefix = prefix
+        self.client = boto3.client("s3", endpoint_url=endpoint_url or os.getenv("S3_ENDPOINT_URL"))
+
+    def _key(self, digest: str) -> str:
+        return f"{self.prefix}{digest[:2]}/{digest}.zst"
+
+    def metadata(self, digest: str) -> Optional[Dict[str, Any]]:
+        from botocore.exceptions import ClientError
+
+        try:
+            head = self.client.head_object(Bucket=self.bucket, Key=self._key(digest))
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
+        meta = head.get("Metadata", {})
+        return {
+            "size": int(meta.get("size", 0)),
+            "compressed_size": head["ContentLength"],
+            "content_type": meta.get("content-type", "application/octet-stream")
+        }
+
+    def _write(self, digest: str, compressed: bytes, meta: Dict[str, Any]):
+        self.client.put_object(
+            Bucket=self.bucket,
+            Key=self._key(digest),
+            Body=compressed,
+            ContentType="application/zstd",
+            Metadata={"size": str(meta["size"]), "content-type": meta["content_type"]}
+        )
+
+    def _open(self, digest: str):
+        return closing(self.client.get_object(Bucket=self.bucket, Key=self._key(digest))["Body"])
+
+
+def artifact_store() -> ArtifactStore:
+    """환경 변수에 따른 저장소 (ARTIFACT_STORE=fs|s3)"""
+
+    if os.getenv("ARTIFACT_STORE", "fs") == "s3":
+        return S3ArtifactStore()
+    return LocalArtifactStore()
+
+
+def offload_outputs(node, store: ArtifactStore, threshold: int = OFFLOAD_THRESHOLD):
+    """긴 도구 출력 문자열을 저장소 참조로 바꾼 사본 반환 (참조에는 앞부분 미리보기 포함)"""
+
+    if isinstance(node, dict):
+        offloaded = {}
+        for key, value in node.items():
+            if key in OUTPUT_KEYS and isinstance(value, str) and len(value) > threshold:
+                ref = store.put(value.encode("utf-8"))
+                offloaded[key] = {**ref, "preview": value[:PREVIEW_CHARS]}
+                logger.debug(f"출력 {key} ({len(value)}자)를 저장소로 이동: {ref['artifact'][:12]}")
+            else:
+                offloaded[key] = offload_outputs(value, store, threshold)
+        return offloaded
+    if isinstance(node, list):
+        return [offload_outputs(value, store, threshold) for value in node]
+    return node
+
+
+def hydrate_outputs(node, store: ArtifactStore):
+    """저장소 참조를 원본 출력 문자열로 되돌린 사본 반환 (원본이 없으면 미리보기 유지)"""
+
+    if is_artifact_ref(node):
+        try:
+            return store.get(node["artifact"]).decode("utf-8", "replace")
+        except Exception as e:
+            logger.warning(f"저장소에서 출력을 찾을 수 없음: {node['artifact'][:12]} - {e}")
+            return node.get("preview", "")
+    if isinstance(node, dict):
+        return {key: hydrate_outputs(value, store) for key, value in node.items()}
+    if isinstance(node, list):
+        return [hydrate_outputs(value, store) for value in node]
+    return node
@@ -0,0 +1,137 @@
+"""
+워크플로우 체크포인트 저장소
+완료된 DAG 작업 결과를 내용 해시와 함께 저장하여 재시작/재실행 시 마지막 정상 지점부터 재개
+"""
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, Any, Iterable, Optional
+
+
+def content_hash(data: Any) -> str:
+    """정규화된 JSON의 SHA-256"""
+    canonical = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class CheckpointStore:
+    """SQLite 기반 체크포인트 저장소 (Postgres/Redis 대신 쓸 수 있는 로컬 저장소)"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("CHECKPOINT_DB", "./workflow_checkpoints.db")
+        self._init_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path)
+
+    def _init_schema(self):
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS workflows (
+                    workflow_id TEXT PRIMARY KEY,
+                    input_hash TEXT NOT NULL,
+                    input_data TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS checkpoints (
+                    workflow_id TEXT NOT NULL,
+                    task_name TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (workflow_id, task_name)
+                );
+            """)
+
+    async def start_workflow(self, workflow_id: str, input_data: Dict[str, Any]) -> bool:
+        """워크플로우 등록 - 입력이 이전과 다르면 기존 체크포인트를 버림
+
+        기존 체크포인트를 이어서 쓸 수 있으면 True
+        """
+        return await asyncio.to_thread(self._start_workflow, workflow_id, input_data)
+
+    def _start_workflow(self, workflow_id: str, input_data: Dict[str, Any]) -> bool:
+        input_hash = content_hash(input_data)
+
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT input_hash FROM workflows WHERE workflow_id = ?", (workflow_id,)
+            ).fetchone()
+
+            resumable = row is not None and row[0] == input_hash
+            if not resumable:
+                conn.execute("DELETE FROM checkpoints WHERE workflow_id = ?", (workflow_id,))
+
+            conn.execute(
+                "INSERT OR REPLACE INTO workflows VALUES (?, ?, ?, ?, ?)",
+                (workflow_id, input_hash, json.dumps(input_data, ensure_ascii=False, default=str), "running", time.time())
+            )
+
+        return resumable
+
+    async def save(self, workflow_id: str, task_name: str, payload: Dict[str, Any]):
+        """작업 결과 저장"""
+        await asyncio.to_thread(self._save, workflow_id, task_name, payload)
+
+    def _save(self, workflow_id: str, task_name: str, payload: Dict[str, Any]):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?)",
+                (workflow_id, task_name, content_hash(payload),
+                 json.dumps(payload, ensure_ascii=False, default=str), time.time())
+            )
+
+    async def load(self, workflow_id: str) -> Dict[str, Dict[str, Any]]:
+        """저장된 작업 결과 조회 (해시가 맞지 않는 손상된 체크포인트는 제외)"""
+        return await asyncio.to_thread(self._load, workflow_id)
+
+    def _load(self, workflow_id: str) -> Dict[str, Dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT task_name, content_hash, payload FROM checkpoints WHERE workflow_id = ?", (workflow_id,)
+            ).fetchall()
+
+        checkpoints = {}
+        for task_name, stored_hash, raw in rows:
+            payload = json.loads(raw)
+            if content_hash(payload) == stored_hash:
+                checkpoints[task_name] = payload
+
+        return checkpoints
+
+    async def invalidate(self, workflow_id: str, task_names: Iterable[str]):
+        """지정한 작업의 체크포인트 삭제 (재실행 대상)"""
+        await asyncio.to_thread(self._invalidate, workflow_id, list(task_names))
+
+    def _invalidate(self, workflow_id: str, task_names: list):
+        with self._connect() as conn:
+            conn.executemany(
+                "DELETE FROM checkpoints WHERE workflow_id = ? AND task_name = ?",
+                [(workflow_id, name) for name in task_names]
+            )
+
+    async def finish_workflow(self, workflow_id: str, status: str):
+        """워크플로우 최종 상태 기록"""
+        await asyncio.to_thread(self._finish_workflow, workflow_id, status)
+
+    def _finish_workflow(self, workflow_id: str, status: str):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE workflows SET status = ?, updated_at = ? WHERE workflow_id = ?",
+                (status, time.time(), workflow_id)
+            )
+
+    async def load_input(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        """재개할 워크플로우의 입력 조회"""
+        return await asyncio.to_thread(self._load_input, workflow_id)
+
+    def _load_input(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT input_data FROM workflows WHERE workflow_id = ?", (workflow_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
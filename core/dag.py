@@ -0,0 +1,123 @@
+"""
+DAG 기반 비동기 작업 스케줄러
+의존성이 모두 완료된 작업은 즉시 시작되므로 전체 소요 시간이 임계 경로 길이로 줄어듦
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Callable, Awaitable, Optional
+
+
+@dataclass
+class DAGTask:
+    """DAG 노드 - 의존 작업들의 결과를 받아 실행되는 코루틴"""
+    name: str
+    func: Callable[[Dict[str, Any]], Awaitable[Any]]
+    depends_on: List[str] = field(default_factory=list)
+
+
+class DAGError(Exception):
+    """DAG 정의 오류 (알 수 없는 의존성, 순환 의존성)"""
+
+
+class DAGTaskError(Exception):
+    """DAG 작업 실행 실패"""
+
+    def __init__(self, task_name: str, error: Exception):
+        super().__init__(f"{task_name}: {error}")
+        self.task_name = task_name
+        self.error = error
+
+
+class DAGScheduler:
+    """의존성이 해결되는 즉시 작업을 시작하는 비동기 스케줄러"""
+
+    def __init__(self, tasks: List[DAGTask]):
+        self.tasks = {task.name: task for task in tasks}
+        self.timings: Dict[str, Dict[str, float]] = {}
+        self._validate()
+
+    def _validate(self):
+        """의존성 검증 및 순환 탐지 (Kahn 알고리즘)"""
+
+        for task in self.tasks.values():
+            unknown = [dep for dep in task.depends_on if dep not in self.tasks]
+            if unknown:
+                raise DAGError(f"{task.name}: 알 수 없는 의존 작업 {unknown}")
+
+        remaining = {name: set(task.depends_on) for name, task in self.tasks.items()}
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise DAGError(f"순환 의존성: {sorted(remaining)}")
+            for name in ready:
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+
+    def descendants(self, names) -> set:
+        """지정한 작업들에 (직간접적으로) 의존하는 작업 목록 (자기 자신 포함)"""
+
+        affected = set(names)
+        changed = True
+        while changed:
+            changed = False
+            for name, task in self.tasks.items():
+                if name not in affected and affected.intersection(task.depends_on):
+                    affected.add(name)
+                    changed = True
+        return affected
+
+    async def run(self, completed: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """전체 DAG 실행
+
+        completed에 결과가 있는 작업은 다시 실행하지 않음 (재개/부분 재실행용)
+        하나라도 실패하면 실행 중인 작업을 취소하고 DAGTaskError 발생
+        """
+
+        results: Dict[str, Any] = {name: value for name, value in (completed or {}).items() if name in self.tasks}
+        waiting = {
+            name: set(task.depends_on) - set(results)
+            for name, task in self.tasks.items() if name not in results
+        }
+        running: Dict[asyncio.Task, str] = {}
+        origin = time.monotonic()
+
+        def launch_ready():
+            for name in [n for n, deps in waiting.items() if not deps]:
+                del waiting[name]
+                task = self.tasks[name]
+                inputs = {dep: results[dep] for dep in task.depends_on}
+                self.timings[name] = {"start": time.monotonic() - origin}
+                running[asyncio.create_task(task.func(inputs))] = name
+
+        launch_ready()
+
+        try:
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+
+                for finished in done:
+                    name = running.pop(finished)
+                    self.timings[name]["end"] = time.monotonic() - origin
+
+                    error = finished.exception()
+                    if error is not None:
+                        raise DAGTaskError(name, error)
+
+                    results[name] = finished.result()
+                    for deps in waiting.values():
+                        deps.discard(name)
+
+                launch_ready()
+        finally:
+            for pending in running:
+                pending.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+        return results
+
+    def critical_path_seconds(self) -> float:
+        """마지막 작업 종료 시각 (실행된 작업 기준 전체 소요 시간)"""
+        return max((t.get("end", 0.0) for t in self.timings.values()), default=0.0)
@@ -0,0 +1,113 @@
+"""
+스캔 마감 시각과 시간 예산
+스캔 시작 시 정한 마감 시각을 모든 계층(워크플로우, 큐 메시지, 실행자, 도구)에 전달하고
+각 계층은 고정 타임아웃 대신 남은 예산에서 자신의 타임아웃을 계산
+"""
+import os
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+
+# 테스트 유형별 우선순위(낮을수록 먼저)와 의미 있는 결과를 얻는 데 필요한 최소 시간(초)
+TEST_PROFILES = {
+    "header_security": {"priority": 1, "min_seconds": 10},
+    "ssl_tls_test": {"priority": 1, "min_seconds": 15},
+    "port_scan": {"priority": 1, "min_seconds": 30},
+    "sql_injection": {"priority": 2, "min_seconds": 120},
+    "xss_testing": {"priority": 2, "min_seconds": 60},
+    "brute_force": {"priority": 3, "min_seconds": 60},
+}
+DEFAULT_TEST_PROFILE = {"priority": 2, "min_seconds": 60}
+
+# 실행 단계가 끝난 뒤 분석/최종 결정에 남겨둘 시간
+ANALYSIS_RESERVE_SECONDS = float(os.getenv("SCAN_ANALYSIS_RESERVE", "120"))
+
+
+def profile_for(test_type: str) -> Dict[str, Any]:
+    return TEST_PROFILES.get(test_type, DEFAULT_TEST_PROFILE)
+
+
+class Deadline:
+    """스캔 전체 마감 시각 (expires_at이 None이면 제한 없음)"""
+
+    def __init__(self, expires_at: Optional[float] = None):
+        self.expires_at = expires_at
+
+    @classmethod
+    def after(cls, seconds: Optional[float]) -> "Deadline":
+        """지금부터 seconds 후 마감 (None이면 SCAN_TIME_BUDGET 환경 변수, 그것도 없으면 제한 없음)"""
+
+        if seconds is None and os.getenv("SCAN_TIME_BUDGET"):
+            seconds = float(os.getenv("SCAN_TIME_BUDGET"))
+        return cls(time.time() + seconds if seconds else None)
+
+    @classmethod
+    def from_payload(cls, payload: Optional[Dict[str, Any]]) -> "Deadline":
+        """작업/메시지의 deadline 필드에서 복원"""
+
+        expires_at = (payload or {}).get("deadline")
+        return cls(float(expires_at) if expires_at else None)
+
+    def to_payload(self) -> Optional[float]:
+        return self.expires_at
+
+    def before(self, seconds: float) -> "Deadline":
+        """seconds 만큼 앞당긴 마감 시각 (다음 단계에 쓸 시간을 남겨둘 때)"""
+        return Deadline(self.expires_at - seconds if self.expires_at is not None else None)
+
+    def remaining(self) -> Optional[float]:
+        """남은 시간(초), 제한이 없으면 None"""
+
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.time())
+
+    @property
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def timeout(self, default: float, reserve: float = 0.0, minimum: float = 1.0) -> float:
+        """기본 타임아웃과 남은 예산(reserve 제외) 중 작은 값"""
+
+        remaining = self.remaining()
+        if remaining is None:
+            return default
+        return max(minimum, min(default, remaining - reserve))
+
+    def allows(self, seconds: float) -> bool:
+        """seconds 만큼의 작업을 마감 전에 시작할 수 있는지"""
+
+        remaining = self.remaining()
+        return remaining is None or remaining >= seconds
+
+    def select_tests(self, test_types: List[str], reserve: float = 0.0) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """남은 예산에 들어가는 테스트 선택 (우선순위 순)
+
+        반환: (실행할 테스트 - 우선순위 순, 건너뛴 테스트와 사유)
+        """
+
+        ordered = sorted(test_types, key=lambda t: profile_for(t)["priority"])
+        remaining = self.remaining()
+        if remaining is None:
+            return ordered, []
+
+        budget = remaining - reserve
+        selected, skipped = [], []
+
+        for test_type in ordered:
+            needed = profile_for(test_type)["min_seconds"]
+            if needed <= budget:
+                selected.append(test_type)
+                budget -= needed
+            else:
+                skipped.append({
+                    "test_type": test_type,
+                    "reason": f"시간 예산 부족 (필요 {needed}초, 남은 예산 {max(0, int(budget))}초)"
+                })
+
+        return selected, skipped
+
+    def __repr__(self) -> str:
+        remaining = self.remaining()
+        return "Deadline(제한 없음)" if remaining is None else f"Deadline(남은 시간 {remaining:.0f}초)"
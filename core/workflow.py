@@ -1,11 +1,16 @@
 """
 멀티 AI 보안 테스트 워크플로우 관리
 """
-from typing import Dict, Any, List
+import uuid
+from typing import Dict, Any, List, Optional
 from enum import Enum
 from dataclasses import dataclass
 from loguru import logger
 
+from .checkpoint import CheckpointStore
+from .dag import DAGTask, DAGScheduler, DAGTaskError
+from .deadline import Deadline, ANALYSIS_RESERVE_SECONDS
+
 
 class WorkflowStatus(Enum):
     """워크플로우 상태"""
@@ -26,6 +31,46 @@ class TestPhase(Enum):
     COMPLETED = "completed"
 
 
+# 각 팀의 실행자 AI
+EXECUTOR_PROVIDERS = ["openai", "claude", "gemini"]
+
+
+class PhaseFailed(Exception):
+    """단계 실패 (DAG 실행 중단)"""
+
+
+# 다시 실행해도 결과가 달라지지 않는 테스트 상태
+FINAL_TEST_STATUSES = {"completed", "not_implemented", "skipped"}
+
+
+@dataclass
+class QualityVerdict:
+    """실행 단위 (팀/실행자/테스트 유형) 품질 판정"""
+    team: str
+    provider: str
+    test_type: str
+    reason: str
+    
+    @property
+    def task_name(self) -> str:
+        return f"{self.team}:{self.provider}"
+    
+    @property
+    def unit(self) -> str:
+        return f"{self.team}:{self.provider}:{self.test_type}"
+    
+    def __str__(self) -> str:
+        return f"{self.provider} {self.team} {self.test_type} {self.reason}"
+
+
+class AnalysisQualityFailed(Exception):
+    """분석 품질 기준 미달 (미달 실행 단위 목록 포함)"""
+    
+    def __init__(self, verdicts: List[QualityVerdict]):
+        super().__init__("; ".join(str(v) for v in verdicts))
+        self.verdicts = verdicts
+
+
 @dataclass
 class WorkflowResult:
     """워크플로우 결과"""
@@ -34,68 +79,216 @@ class WorkflowResult:
     results: Dict[str, Any]
     errors: List[str]
     retry_count: int = 0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "phase": self.phase.value,
+            "status": self.status.value,
+            "results": self.results,
+            "errors": self.errors,
+            "retry_count": self.retry_count
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "WorkflowResult":
+        return cls(
+            phase=TestPhase(data["phase"]),
+            status=WorkflowStatus(data["status"]),
+            results=data["results"],
+            errors=data["errors"],
+            retry_count=data.get("retry_count", 0)
+        )
 
 
 class SecurityTestWorkflow:
     """보안 테스트 워크플로우 관리자"""
     
-    def __init__(self):
+    def __init__(self, workflow_id: Optional[str] = None, checkpoint_store: Optional[CheckpointStore] = None):
+        self.workflow_id = workflow_id or uuid.uuid4().hex
+        self.checkpoint_store = checkpoint_store or CheckpointStore()
+        self.input_data = {}
         self.current_phase = TestPhase.PLANNING
         self.status = WorkflowStatus.PENDING
         self.results = {}
         self.errors = []
         self.retry_counts = {phase: 0 for phase in TestPhase}
-        self.max_retries = 3
+        self.max_retries = 3  # 실행 단위별 최대 재실행 횟수
+        self.unit_retries: Dict[str, int] = {}
+        self.pending_units: Dict[str, Dict[str, Any]] = {}
+        self.timings = {}
+        self.elapsed_seconds = 0.0
+        self.deadline: Optional[Deadline] = None
         
+    @classmethod
+    async def resume(cls, workflow_id: str, checkpoint_store: Optional[CheckpointStore] = None) -> Dict[str, Any]:
+        """중단된 워크플로우를 저장된 입력과 체크포인트로 재개"""
+        
+        store = checkpoint_store or CheckpointStore()
+        input_data = await store.load_input(workflow_id)
+        if input_data is None:
+            raise ValueError(f"워크플로우를 찾을 수 없습니다: {workflow_id}")
+        
+        return await cls(workflow_id, store).execute_workflow(input_data)
+    
     async def execute_workflow(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        """전체 워크플로우 실행"""
+        """전체 워크플로우 실행 (DAG - 정적 분석과 동적 테스트는 계획 수립 직후 동시에 시작)"""
         
-        logger.info("보안 테스트 워크플로우 시작")
+        logger.info(f"보안 테스트 워크플로우 시작 ({self.workflow_id})")
+        
+        self.input_data = input_data
+        if self.deadline is None:
+            # 재실행(부분 재시도) 중에도 처음 정한 마감 시각 유지
+            self.deadline = (
+                Deadline.from_payload(input_data) if input_data.get("deadline")
+                else Deadline.after(input_data.get("time_budget_seconds"))
+            )
+        scheduler = DAGScheduler(self._build_dag(input_data))
+        completed = await self._load_checkpoints(scheduler)
         
         try:
-            # 1. 계획 수립 단계
-            planning_result = await self._execute_planning(input_data)
-            if planning_result.status == WorkflowStatus.FAILED:
-                return self._create_failure_result("계획 수립 실패")
-            
-            # 2. 정적 분석 단계
-            static_result = await self._execute_static_analysis(planning_result.results)
-            if static_result.status == WorkflowStatus.FAILED:
-                return self._create_failure_result("정적 분석 실패")
+            results = await scheduler.run(completed)
             
-            # 3. 동적 테스트 단계
-            dynamic_result = await self._execute_dynamic_testing(planning_result.results)
-            if dynamic_result.status == WorkflowStatus.FAILED:
-                return self._create_failure_result("동적 테스트 실패")
-            
-            # 4. 분석 단계
-            analysis_result = await self._execute_analysis({
-                "static_results": static_result.results,
-                "dynamic_results": dynamic_result.results
-            })
-            
-            # 품질 검증 및 재실행 로직
-            if not self._validate_analysis_quality(analysis_result.results):
-                if self.retry_counts[TestPhase.ANALYSIS] < self.max_retries:
-                    logger.warning("분석 품질 미달, 재실행")
+        except DAGTaskError as e:
+            if isinstance(e.error, AnalysisQualityFailed):
+                retryable = [v for v in e.error.verdicts if self.unit_retries.get(v.unit, 0) < self.max_retries]
+                if retryable:
+                    logger.warning(f"분석 품질 미달, 부분 재실행: {[str(v) for v in retryable]}")
                     self.retry_counts[TestPhase.ANALYSIS] += 1
-                    return await self._retry_execution_phase()
-                else:
-                    return self._create_failure_result("분석 품질 기준 미달")
+                    return await self._retry_execution_phase(retryable)
+                return await self._fail(f"분석 품질 기준 미달: {e.error}")
             
-            # 5. 최종 결정 단계
-            decision_result = await self._execute_decision(analysis_result.results)
-            
-            return {
-                "status": "success",
-                "workflow_id": id(self),
-                "final_result": decision_result.results,
-                "summary": self._create_summary()
-            }
+            if isinstance(e.error, PhaseFailed):
+                return await self._fail(str(e.error))
             
-        except Exception as e:
             logger.error(f"워크플로우 실행 중 오류: {e}")
-            return self._create_failure_result(f"워크플로우 오류: {str(e)}")
+            return await self._fail(f"워크플로우 오류: {str(e)}")
+        
+        self.results = results
+        self.current_phase = TestPhase.COMPLETED
+        self.status = WorkflowStatus.COMPLETED
+        self.timings = scheduler.timings
+        self.elapsed_seconds = scheduler.critical_path_seconds()
+        await self.checkpoint_store.finish_workflow(self.workflow_id, self.status.value)
+        
+        return {
+            "status": "success",
+            "workflow_id": self.workflow_id,
+            "final_result": results["decision"].results,
+            "resumed_tasks": sorted(completed),
+            "summary": self._create_summary()
+        }
+    
+    async def _load_checkpoints(self, scheduler: DAGScheduler) -> Dict[str, WorkflowResult]:
+        """체크포인트 로드 - 실패한 실행자와 그 결과에 의존하는 작업은 다시 실행"""
+        
+        if not await self.checkpoint_store.start_workflow(self.workflow_id, self.input_data):
+            return {}
+        
+        completed = {
+            name: WorkflowResult.from_dict(payload)
+            for name, payload in (await self.checkpoint_store.load(self.workflow_id)).items()
+        }
+        
+        missing_executors = [name for name in self._executor_task_names() if name not in completed]
+        stale = scheduler.descendants(missing_executors) - set(missing_executors)
+        stale_completed = stale.intersection(completed)
+        if stale_completed:
+            await self.checkpoint_store.invalidate(self.workflow_id, stale_completed)
+            for name in stale_completed:
+                del completed[name]
+        
+        if completed:
+            logger.info(f"체크포인트에서 재개: {sorted(completed)}")
+        
+        return completed
+    
+    @staticmethod
+    def _executor_task_names() -> List[str]:
+        return [f"{team}:{provider}" for team in ("static", "dynamic") for provider in EXECUTOR_PROVIDERS]
+    
+    def _with_checkpoint(self, task: DAGTask) -> DAGTask:
+        """완료된 작업 결과를 체크포인트로 저장 (실패한 결과는 저장하지 않아 재개 시 다시 실행)"""
+        
+        async def run(inputs):
+            result = await task.func(inputs)
+            if result.status == WorkflowStatus.COMPLETED:
+                await self.checkpoint_store.save(self.workflow_id, task.name, result.to_dict())
+            return result
+        
+        return DAGTask(task.name, run, task.depends_on)
+    
+    def _build_dag(self, input_data: Dict[str, Any]) -> List[DAGTask]:
+        """단계별 작업과 의존성 정의"""
+        
+        async def planning(_):
+            return self._check(await self._execute_planning(input_data), "계획 수립 실패")
+        
+        def executor_task(team: str, provider: str):
+            async def run(inputs):
+                # 품질 재실행 대상이면 미달 테스트만 이전 부분 결과와 함께 다시 실행
+                unit = self.pending_units.pop(f"{team}:{provider}", None)
+                try:
+                    if unit:
+                        return await self._execute_executor(
+                            team, provider, inputs["planning"].results, unit["test_types"], unit["previous"]
+                        )
+                    return await self._execute_executor(team, provider, inputs["planning"].results, self._test_types())
+                except Exception as e:
+                    # 실행자 하나의 실패는 팀 결과 취합 단계에서 판단
+                    logger.error(f"{team} 실행자 ({provider}) 실패: {e}")
+                    return WorkflowResult(
+                        phase=TestPhase.STATIC_ANALYSIS if team == "static" else TestPhase.DYNAMIC_TESTING,
+                        status=WorkflowStatus.FAILED,
+                        results={},
+                        errors=[f"{provider}: {e}"]
+                    )
+            return run
+        
+        def team_task(phase: TestPhase, team: str, error_message: str):
+            async def run(inputs):
+                return self._check(self._collect_team_results(phase, team, inputs), error_message)
+            return run
+        
+        async def analysis(inputs):
+            result = await self._execute_analysis({
+                "static_results": inputs["static_analysis"].results,
+                "dynamic_results": inputs["dynamic_testing"].results
+            })
+            
+            # 품질 검증 (미달 시 해당 실행 단위만 재실행, 실행 예산을 다 썼으면 경고만 남기고 진행)
+            verdicts = self._validate_analysis_quality(result.results, inputs)
+            if verdicts and not self._execution_deadline().expired:
+                raise AnalysisQualityFailed(verdicts)
+            if verdicts:
+                logger.warning(f"시간 예산 소진으로 재실행 생략: {[str(v) for v in verdicts]}")
+                result.results["quality_warnings"] = [str(v) for v in verdicts]
+            return result
+        
+        async def decision(inputs):
+            return await self._execute_decision(inputs["analysis"].results)
+        
+        tasks = [DAGTask("planning", planning)]
+        
+        for team, phase, error_message in (
+            ("static", TestPhase.STATIC_ANALYSIS, "정적 분석 실패"),
+            ("dynamic", TestPhase.DYNAMIC_TESTING, "동적 테스트 실패")
+        ):
+            executor_names = [f"{team}:{provider}" for provider in EXECUTOR_PROVIDERS]
+            for provider, name in zip(EXECUTOR_PROVIDERS, executor_names):
+                tasks.append(DAGTask(name, executor_task(team, provider), ["planning"]))
+            tasks.append(DAGTask(phase.value, team_task(phase, team, error_message), executor_names))
+        
+        tasks.append(DAGTask("analysis", analysis, [TestPhase.STATIC_ANALYSIS.value, TestPhase.DYNAMIC_TESTING.value]))
+        tasks.append(DAGTask("decision", decision, ["analysis"]))
+        
+        return [self._with_checkpoint(task) for task in tasks]
+    
+    @staticmethod
+    def _check(result: WorkflowResult, error_message: str) -> WorkflowResult:
+        """단계 실패 시 DAG 실행 중단"""
+        if result.status == WorkflowStatus.FAILED:
+            raise PhaseFailed(error_message)
+        return result
     
     async def _execute_planning(self, input_data: Dict[str, Any]) -> WorkflowResult:
         """계획 수립 단계"""
@@ -119,44 +312,81 @@ class SecurityTestWorkflow:
             errors=[]
         )
     
-    async def _execute_static_analysis(self, planning_data: Dict[str, Any]) -> WorkflowResult:
-        """정적 분석 단계 - 3개 AI 병렬 실행"""
-        self.current_phase = TestPhase.STATIC_ANALYSIS
+    def _execution_deadline(self) -> Deadline:
+        """실행 단계 마감 시각 (분석/최종 결정 시간을 남겨둠)"""
+        return (self.deadline or Deadline()).before(ANALYSIS_RESERVE_SECONDS)
+    
+    def _test_types(self) -> List[str]:
+        """실행자별로 수행할 테스트 유형"""
+        return list(self.input_data.get("test_scope", []))
+    
+    async def _execute_executor(
+        self,
+        team: str,
+        provider: str,
+        planning_data: Dict[str, Any],
+        test_types: List[str],
+        previous: Optional[Dict[str, Any]] = None
+    ) -> WorkflowResult:
+        """실행자 AI 하나의 테스트 실행 (같은 팀의 다른 실행자들과 동시에 실행)
+        
+        previous가 있으면 재실행 - test_types만 다시 실행하고 나머지 테스트 결과는 이전 것을 유지
+        """
         
-        logger.info("정적 분석 단계 실행 (OpenAI, Claude, Gemini)")
+        phase = TestPhase.STATIC_ANALYSIS if team == "static" else TestPhase.DYNAMIC_TESTING
+        self.current_phase = phase
         
-        # 실제로는 3개 StaticAnalysisExecutor 병렬 실행
-        static_results = {
-            "openai_result": "OpenAI 정적 분석 결과",
-            "claude_result": "Claude 정적 분석 결과", 
-            "gemini_result": "Gemini 정적 분석 결과"
+        if previous is None:
+            logger.info(f"{phase.value} 실행 ({provider})")
+        else:
+            logger.info(f"{phase.value} 부분 재실행 ({provider}): {test_types}")
+        
+        # 남은 실행 예산에 들어가지 않는 테스트는 우선순위가 낮은 것부터 건너뜀
+        test_types, skipped = self._execution_deadline().select_tests(test_types)
+        tests = {
+            item["test_type"]: {"status": "skipped", "reason": item["reason"]}
+            for item in skipped
         }
         
+        # 실제로는 StaticAnalysisExecutor / DynamicTestExecutor 실행 (실행 마감 시각을 함께 전달)
+        # (재실행 시 이전 부분 결과를 함께 전달하여 이어서 실행)
+        label = "정적 분석" if team == "static" else "동적 테스트"
+        previous_output = {t: previous[t] for t in test_types if t in (previous or {})}
+        
+        tests.update({
+            test_type: {
+                "status": "completed",
+                "output": f"{provider} {label} 결과 ({test_type})",
+                "resumed_from": previous_output.get(test_type)
+            }
+            for test_type in test_types
+        })
+        
         return WorkflowResult(
-            phase=TestPhase.STATIC_ANALYSIS,
+            phase=phase,
             status=WorkflowStatus.COMPLETED,
-            results=static_results,
+            results={"tests": {**(previous or {}), **tests}},
             errors=[]
         )
     
-    async def _execute_dynamic_testing(self, planning_data: Dict[str, Any]) -> WorkflowResult:
-        """동적 테스트 단계 - 3개 AI 병렬 실행"""
-        self.current_phase = TestPhase.DYNAMIC_TESTING
+    def _collect_team_results(self, phase: TestPhase, team: str, executor_results: Dict[str, WorkflowResult]) -> WorkflowResult:
+        """팀 내 3개 실행자 결과 취합"""
         
-        logger.info("동적 테스트 단계 실행 (OpenAI, Claude, Gemini)")
+        results = {}
+        errors = []
+        for provider in EXECUTOR_PROVIDERS:
+            executor_result = executor_results[f"{team}:{provider}"]
+            results[f"{provider}_result"] = executor_result.results.get("tests", {})
+            errors.extend(executor_result.errors)
         
-        # 실제로는 3개 DynamicTestExecutor 병렬 실행
-        dynamic_results = {
-            "openai_result": "OpenAI 동적 테스트 결과",
-            "claude_result": "Claude 동적 테스트 결과",
-            "gemini_result": "Gemini 동적 테스트 결과"
-        }
+        # 모든 실행자가 실패한 경우에만 단계 실패
+        failed = all(r.status == WorkflowStatus.FAILED for r in executor_results.values())
         
         return WorkflowResult(
-            phase=TestPhase.DYNAMIC_TESTING,
-            status=WorkflowStatus.COMPLETED,
-            results=dynamic_results,
-            errors=[]
+            phase=phase,
+            status=WorkflowStatus.FAILED if failed else WorkflowStatus.COMPLETED,
+            results=results,
+            errors=errors
         )
     
     async def _execute_analysis(self, test_results: Dict[str, Any]) -> WorkflowResult:
@@ -200,25 +430,68 @@ class SecurityTestWorkflow:
             errors=[]
         )
     
-    def _validate_analysis_quality(self, analysis_results: Dict[str, Any]) -> bool:
-        """분석 품질 검증"""
-        # 실제 품질 검증 로직 구현
-        # 예: 분석 결과의 완성도, 일관성 등 검사
-        return True  # 임시로 항상 통과
+    def _validate_analysis_quality(
+        self,
+        analysis_results: Dict[str, Any],
+        team_results: Dict[str, WorkflowResult]
+    ) -> List[QualityVerdict]:
+        """분석 품질 검증 - 실행자/테스트 유형별 판정 (빈 목록이면 통과)"""
+        
+        verdicts = []
+        for team, phase in (("static", TestPhase.STATIC_ANALYSIS), ("dynamic", TestPhase.DYNAMIC_TESTING)):
+            results = team_results[phase.value].results
+            
+            for provider in EXECUTOR_PROVIDERS:
+                tests = results.get(f"{provider}_result") or {}
+                
+                for test_type in self._test_types():
+                    test_result = tests.get(test_type)
+                    if not isinstance(test_result, dict):
+                        verdicts.append(QualityVerdict(team, provider, test_type, "결과 누락"))
+                    elif test_result.get("status") not in FINAL_TEST_STATUSES:
+                        verdicts.append(QualityVerdict(
+                            team, provider, test_type, f"결과 불완전 ({test_result.get('status', 'unknown')})"
+                        ))
+        
+        return verdicts
+    
+    async def _retry_execution_phase(self, verdicts: List[QualityVerdict]) -> Dict[str, Any]:
+        """품질 미달 실행 단위만 재실행 - 이전 부분 결과를 첨부하고 나머지 작업은 체크포인트 재사용"""
+        
+        checkpoints = await self.checkpoint_store.load(self.workflow_id)
+        
+        units: Dict[str, List[str]] = {}
+        for verdict in verdicts:
+            units.setdefault(verdict.task_name, []).append(verdict.test_type)
+            self.unit_retries[verdict.unit] = self.unit_retries.get(verdict.unit, 0) + 1
+        
+        for name, test_types in units.items():
+            self.pending_units[name] = {
+                "test_types": test_types,
+                "previous": checkpoints.get(name, {}).get("results", {}).get("tests", {})
+            }
+        
+        scheduler = DAGScheduler(self._build_dag(self.input_data))
+        await self.checkpoint_store.invalidate(self.workflow_id, scheduler.descendants(units))
+        
+        logger.info(f"실행 단위 재실행: {units}")
+        return await self.execute_workflow(self.input_data)
     
-    async def _retry_execution_phase(self) -> Dict[str, Any]:
-        """실행 단계 재시도"""
-        logger.info("실행 단계 재시도")
-        # 정적 분석과 동적 테스트 재실행 로직
-        return {"status": "retry", "message": "실행 단계 재시도 중"}
+    async def _fail(self, error_message: str) -> Dict[str, Any]:
+        """실패 기록 후 실패 결과 반환"""
+        self.status = WorkflowStatus.FAILED
+        await self.checkpoint_store.finish_workflow(self.workflow_id, self.status.value)
+        return self._create_failure_result(error_message)
     
     def _create_failure_result(self, error_message: str) -> Dict[str, Any]:
         """실패 결과 생성"""
         return {
             "status": "failed",
+            "workflow_id": self.workflow_id,
             "error": error_message,
             "current_phase": self.current_phase.value,
-            "retry_counts": self.retry_counts
+            "retry_counts": self.retry_counts,
+            "unit_retries": self.unit_retries
         }
     
     def _create_summary(self) -> Dict[str, Any]:
@@ -227,5 +500,29 @@ class SecurityTestWorkflow:
             "total_phases": len(TestPhase),
             "completed_phases": len([p for p in TestPhase if self.retry_counts[p] >= 0]),
             "total_retries": sum(self.retry_counts.values()),
-            "final_status": self.status.value
-        }
\ No newline at end of file
+            "unit_retries": self.unit_retries,
+            "final_status": self.status.value,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "task_timings": self.timings,
+            "deadline": self.deadline.to_payload() if self.deadline else None,
+            "skipped_tests": self._skipped_tests()
+        }
+    
+    def _skipped_tests(self) -> List[Dict[str, Any]]:
+        """시간 예산 부족으로 건너뛴 테스트 목록"""
+        
+        skipped = []
+        for phase in (TestPhase.STATIC_ANALYSIS, TestPhase.DYNAMIC_TESTING):
+            team_result = self.results.get(phase.value)
+            if team_result is None:
+                continue
+            for provider in EXECUTOR_PROVIDERS:
+                for test_type, test_result in (team_result.results.get(f"{provider}_result") or {}).items():
+                    if test_result.get("status") == "skipped":
+                        skipped.append({
+                            "phase": phase.value,
+                            "provider": provider,
+                            "test_type": test_type,
+                            "reason": test_result.get("reason")
+                        })
+        return skipped
\ No newline at end of file
@@ -0,0 +1,251 @@
+"""
+실행 결과 집계 마이크로서비스 (fan-in/fan-out)
+- 실행자 결과를 도착하는 즉시 스캔 ID와 순번을 붙여 분석가별 스트림에 전달 (실행과 분석이 겹침)
+- 스캔별 결과 수 또는 마감 시각 조건(배리어)을 만족하면 종료 표시를 한 번 전달하여 분석가가 최종 정리
+"""
+import asyncio
+import json
+import os
+import socket
+import time
+import redis.asyncio as redis
+from typing import Dict, Any, Optional
+
+from core.deadline import Deadline
+from services.scan_registry import ScanRegistry
+from services.task_queue import ReliableQueue, QueueMessage
+from services.telemetry import QueueTelemetry, ANALYZER_PROVIDERS, EXECUTION_RESULTS_QUEUE, analysis_stream
+
+
+# 결과가 모두 모이지 않은 스캔은 대기 목록(점수 = 배리어 마감 시각)에서 관리
+PENDING_KEY = "aggregation:pending"
+
+# 스캔 마감 시각이 없을 때 첫 결과 이후 기다리는 최대 시간(초)
+AGGREGATION_TIMEOUT = int(os.getenv("AGGREGATION_TIMEOUT", "1800"))
+
+# 마감 시각이 지난 뒤 늦게 도착하는 결과(건너뜀 처리 결과 등)를 기다리는 여유 시간(초)
+AGGREGATION_GRACE = int(os.getenv("AGGREGATION_GRACE", "30"))
+
+# 종료 표시 후 늦게 도착한 결과를 버리기 위해 집계 정보를 남겨두는 시간(초)
+PUBLISHED_TTL = 3600
+
+# 분석가 스트림 메시지 종류
+RESULT_MESSAGE = "result"
+END_MESSAGE = "end"
+
+
+class AggregatorService:
+    """스캔별 실행 결과 집계 서비스"""
+
+    def __init__(self):
+        self.redis_client = None
+        self.result_queue = None
+        self.analysis_queues = []
+        self.registry = None
+        self.telemetry = None
+        self.sweep_interval = float(os.getenv("AGGREGATION_SWEEP_INTERVAL", "5"))
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}"
+        self._running = 0
+
+    async def initialize(self):
+        """서비스 초기화"""
+
+        redis_url = os.getenv("REDIS_URL", "redis://localhost:6379")
+        self.redis_client = redis.from_url(redis_url)
+
+        self.result_queue = ReliableQueue(self.redis_client, stream=EXECUTION_RESULTS_QUEUE, group="aggregators")
+        self.analysis_queues = [
+            ReliableQueue(self.redis_client, stream=analysis_stream(analyzer), group="analyzers")
+            for analyzer in ANALYZER_PROVIDERS
+        ]
+        self.registry = ScanRegistry(self.redis_client)
+        self.telemetry = QueueTelemetry(self.redis_client, self.result_queue.stream)
+
+        print("결과 집계 서비스 시작됨")
+
+    @staticmethod
+    def _meta_key(scan_id: str) -> str:
+        return f"aggregation:{scan_id}"
+
+    @staticmethod
+    def _results_key(scan_id: str) -> str:
+        return f"aggregation:{scan_id}:results"
+
+    async def start_worker(self):
+        """워커 시작 (결과 수신과 마감 시각 확인을 함께 실행)"""
+
+        try:
+            await asyncio.gather(self.receive_loop(), self.sweep_loop(), self._report_telemetry())
+        finally:
+            await self.telemetry.remove_worker(self.worker_id)
+
+    async def _report_telemetry(self):
+        """처리 중인 결과 수를 주기적으로 보고 (오토스케일링 신호, 한 번에 하나씩 처리)"""
+
+        interval = float(os.getenv("TELEMETRY_INTERVAL", "10"))
+
+        while True:
+            try:
+                await self.telemetry.worker_heartbeat(self.worker_id, self._running, 1)
+            except Exception as e:
+                print(f"텔레메트리 보고 실패: {e}")
+            await asyncio.sleep(interval)
+
+    async def receive_loop(self):
+        """실행 결과 수신"""
+
+        while True:
+            try:
+                messages = await self.result_queue.fetch(block_ms=5000)
+
+                for message in messages:
+                    started_at = asyncio.get_running_loop().time()
+                    self._running += 1
+                    try:
+                        await self.handle_result(message)
+                        await self.result_queue.ack(message)
+                    finally:
+                        self._running -= 1
+                    await self.telemetry.record_completion(asyncio.get_running_loop().time() - started_at)
+
+            except Exception as e:
+                print(f"결과 집계 중 오류: {e}")
+                await asyncio.sleep(5)
+
+    async def sweep_loop(self):
+        """배리어 마감 시각이 지난 스캔은 받은 결과까지만으로 종료 표시"""
+
+        while True:
+            try:
+                expired = await self.redis_client.zrangebyscore(PENDING_KEY, "-inf", time.time())
+                for scan_id in expired:
+                    scan_id = scan_id.decode() if isinstance(scan_id, bytes) else scan_id
+                    await self.publish(scan_id, reason="deadline")
+
+            except Exception as e:
+                print(f"집계 마감 확인 중 오류: {e}")
+
+            await asyncio.sleep(self.sweep_interval)
+
+    def barrier_deadline(self, result: Dict[str, Any]) -> float:
+        """결과를 더 기다리지 않는 시각 (스캔 마감 시각 + 여유, 없으면 첫 결과 + 최대 대기 시간)"""
+
+        deadline = Deadline.from_payload(result)
+        if deadline.expires_at is not None:
+            return deadline.expires_at + AGGREGATION_GRACE
+        return time.time() + AGGREGATION_TIMEOUT
+
+    async def handle_result(self, message: QueueMessage):
+        """실행 결과 하나를 분석가들에게 바로 전달하고 배리어 조건 확인
+
+        전달한 뒤에 결과를 기록하므로 종료 표시는 항상 기록된 결과보다 뒤에 전달됨
+        기록 전에 중단되어 재전달된 결과는 다시 전달되며 분석가가 source로 중복을 거름
+        """
+
+        result = message.payload
+        scan_id = result.get("scan_id") or "unknown"
+        source = result.get("source") or f"{result.get('executor_type')}:{result.get('ai_provider')}"
+
+        if await self.redis_client.hget(self._meta_key(scan_id), "published_at"):
+            print(f"이미 종료 표시한 스캔의 늦은 결과 무시 ({scan_id}, {source})")
+            return
+        if await self.redis_client.hexists(self._results_key(scan_id), source):
+            print(f"이미 전달한 결과 무시 ({scan_id}, {source})")
+            return
+
+        sequence = await self.redis_client.hincrby(self._meta_key(scan_id), "sequence", 1)
+        await self.forward(RESULT_MESSAGE, {
+            "scan_id": scan_id,
+            "sequence": sequence,
+            "source": source,
+            "target_url": result.get("target_url") or "",
+            "expected_results": result.get("expected_results") or 6,
+            "result": result
+        })
+
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.hset(self._results_key(scan_id), source, sequence)
+            pipe.hsetnx(self._meta_key(scan_id), "expected_results", result.get("expected_results") or 6)
+            pipe.hsetnx(self._meta_key(scan_id), "target_url", result.get("target_url") or "")
+            if result.get("skipped_tests"):
+                pipe.hsetnx(self._meta_key(scan_id), "skipped_tests", json.dumps(result["skipped_tests"], ensure_ascii=False))
+            pipe.zadd(PENDING_KEY, {scan_id: self.barrier_deadline(result)}, nx=True)
+            pipe.hlen(self._results_key(scan_id))
+            pipe.hget(self._meta_key(scan_id), "expected_results")
+            *_, received, expected = await pipe.execute()
+
+        print(f"실행 결과 전달 ({scan_id}, {source}, #{sequence}): {received}/{int(expected)}")
+
+        if received >= int(expected):
+            await self.publish(scan_id, reason="complete")
+
+    async def forward(self, kind: str, payload: Dict[str, Any]):
+        """분석가별 스트림에 메시지 전달"""
+
+        for queue in self.analysis_queues:
+            await queue.enqueue({"kind": kind, **payload})
+            await QueueTelemetry(self.redis_client, queue.stream).record_arrival()
+
+    async def publish(self, scan_id: str, reason: str) -> Optional[Dict[str, Any]]:
+        """종료 표시를 분석가별 스트림에 전달 (대기 목록에서 먼저 제거한 워커 하나만 전달)"""
+
+        if not await self.redis_client.zrem(PENDING_KEY, scan_id):
+            return None
+
+        marker = await self.build_marker(scan_id, reason)
+        await self.forward(END_MESSAGE, marker)
+
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.hset(self._meta_key(scan_id), "published_at", time.time())
+            pipe.expire(self._meta_key(scan_id), PUBLISHED_TTL)
+            pipe.delete(self._results_key(scan_id))
+            await pipe.execute()
+
+        await self.registry.update(
+            scan_id,
+            stage="aggregated",
+            aggregated_results=marker["received_results"],
+            missing_results=marker["missing_results"]
+        )
+
+        print(f"종료 표시를 분석가에게 전달: {scan_id} ({marker['received_results']}/{marker['expected_results']}, {reason})")
+        return marker
+
+    async def build_marker(self, scan_id: str, reason: str) -> Dict[str, Any]:
+        """스캔 하나의 종료 표시 (reason: complete 또는 deadline)"""
+
+        meta = await self.redis_client.hgetall(self._meta_key(scan_id))
+        meta = {
+            (k.decode() if isinstance(k, bytes) else k): (v.decode() if isinstance(v, bytes) else v)
+            for k, v in meta.items()
+        }
+        received = await self.redis_client.hlen(self._results_key(scan_id))
+        expected = int(meta.get("expected_results") or received)
+
+        return {
+            "scan_id": scan_id,
+            "reason": reason,
+            "sequence": int(meta.get("sequence") or 0),
+            "target_url": meta.get("target_url", ""),
+            "expected_results": expected,
+            "received_results": received,
+            "missing_results": max(0, expected - received),
+            "complete": reason == "complete",
+            "skipped_tests": json.loads(meta["skipped_tests"]) if meta.get("skipped_tests") else []
+        }
+
+
+async def main():
+    """메인 실행 함수"""
+
+    service = AggregatorService()
+    await service.initialize()
+
+    try:
+        await service.start_worker()
+    finally:
+        await service.redis_client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
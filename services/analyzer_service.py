@@ -0,0 +1,223 @@
+"""
+분석가 AI 마이크로서비스
+"""
+import asyncio
+import os
+import socket
+import redis.asyncio as redis
+from typing import Dict, Any
+
+from agents.analyzer_agent import AnalyzerAgent, ClaudeAnalyzer, GeminiAnalyzer, OpenAIAnalyzer, IncrementalAnalysisState
+from core.artifacts import artifact_store, hydrate_outputs
+from services.scan_registry import ScanRegistry
+from services.task_queue import ReliableQueue, QueueMessage
+from services.telemetry import QueueTelemetry, ANALYZER_PROVIDERS, analysis_stream
+
+
+ANALYZER_CLASSES = {
+    "claude": ClaudeAnalyzer,
+    "gemini": GeminiAnalyzer,
+    "openai": OpenAIAnalyzer
+}
+
+DECISION_QUEUE = "decision_queue"
+STATE_TTL = 24 * 3600
+
+
+class AnalyzerService:
+    """분석가 서비스
+
+    집계 서비스가 실행 결과를 도착하는 대로 전달하고, 스캔이 끝나면(결과가 다 모이거나 마감 시각) 종료 표시를 전달
+    streaming 모드: 실행 결과마다 새 발견 사항만 분석하고 종료 표시를 받으면 짧게 종합
+    batch 모드: 실행 결과를 모아 두었다가 종료 표시를 받으면 한 번에 분석
+    """
+
+    def __init__(self):
+        self.ai_provider = os.getenv("AI_PROVIDER", "claude")
+        self.mode = os.getenv("ANALYZER_MODE", "streaming")
+        self.redis_client = None
+        self.agent = None
+        self.result_queue = None
+        self.decision_queue = None
+        self.registry = None
+        self.artifacts = None
+        self.telemetry = None
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}"
+        self._running = 0
+
+    async def initialize(self):
+        """서비스 초기화"""
+
+        redis_url = os.getenv("REDIS_URL", "redis://localhost:6379")
+        self.redis_client = redis.from_url(redis_url)
+
+        self.result_queue = ReliableQueue(self.redis_client, stream=analysis_stream(self.ai_provider), group="analyzers")
+        self.decision_queue = ReliableQueue(self.redis_client, stream=DECISION_QUEUE, group="decision")
+        self.registry = ScanRegistry(self.redis_client)
+        self.artifacts = artifact_store()
+        self.telemetry = QueueTelemetry(self.redis_client, self.result_queue.stream)
+
+        self.agent = self.create_agent()
+
+        print(f"분석가 ({self.ai_provider}) 서비스 시작됨 - {self.mode} 모드")
+
+    def create_agent(self) -> AnalyzerAgent:
+        """AI 에이전트 생성"""
+
+        from config.settings import AGENT_ROLES
+
+        agent_config = AGENT_ROLES["analyzers"][self.ai_provider]
+        return ANALYZER_CLASSES[self.ai_provider](
+            name=agent_config["name"],
+            model=agent_config["model"],
+            primary_provider=agent_config["primary_provider"],
+            fallback_providers=agent_config["fallback_providers"],
+            role_description=agent_config["description"]
+        )
+
+    async def start_worker(self):
+        """워커 시작"""
+
+        reporter = asyncio.create_task(self._report_telemetry())
+
+        try:
+            while True:
+                try:
+                    messages = await self.result_queue.fetch(block_ms=5000)
+
+                    for message in messages:
+                        started_at = asyncio.get_running_loop().time()
+                        self._running += 1
+                        try:
+                            await self.handle_message(message)
+                            await self.result_queue.ack(message)
+                        finally:
+                            self._running -= 1
+                        await self.telemetry.record_completion(asyncio.get_running_loop().time() - started_at)
+
+                except Exception as e:
+                    print(f"분석 처리 중 오류: {e}")
+                    await asyncio.sleep(5)
+        finally:
+            reporter.cancel()
+            await self.telemetry.remove_worker(self.worker_id)
+
+    async def _report_telemetry(self):
+        """처리 중인 메시지 수를 주기적으로 보고 (오토스케일링 신호, 한 번에 하나씩 처리)"""
+
+        interval = float(os.getenv("TELEMETRY_INTERVAL", "10"))
+
+        while True:
+            try:
+                await self.telemetry.worker_heartbeat(self.worker_id, self._running, 1)
+            except Exception as e:
+                print(f"텔레메트리 보고 실패: {e}")
+            await asyncio.sleep(interval)
+
+    async def handle_message(self, message: QueueMessage):
+        """집계 서비스 메시지 처리 (같은 스캔의 메시지는 복제 컨테이너 간에도 순서대로 처리)"""
+
+        payload = message.payload
+        scan_id = payload.get("scan_id", "unknown")
+
+        async with self.redis_client.lock(f"analysis_lock:{self.ai_provider}:{scan_id}", timeout=600):
+            # 종료 표시까지 처리한 스캔의 재전달/늦은 메시지는 무시
+            if await self.redis_client.exists(self._done_key(scan_id)):
+                print(f"이미 분석한 스캔의 메시지 무시: {scan_id} ({payload.get('kind')})")
+                return
+
+            state = await self.load_state(payload)
+
+            if payload.get("kind") == "end":
+                await self.registry.update(scan_id, stage="analyzing")
+                await self.finalize(state, payload)
+                async with self.redis_client.pipeline(transaction=True) as pipe:
+                    pipe.set(self._done_key(scan_id), 1, ex=STATE_TTL)
+                    pipe.delete(self._state_key(scan_id))
+                    await pipe.execute()
+                return
+
+            await self.handle_result(state, payload)
+            await self.redis_client.set(self._state_key(scan_id), state.to_json(), ex=STATE_TTL)
+
+    async def handle_result(self, state: IncrementalAnalysisState, payload: Dict[str, Any]):
+        """실행 결과 하나 처리 (상태에는 저장소 참조가 남은 원본 결과를 보관)"""
+
+        result = payload["result"]
+        source = payload.get("source") or f"{result.get('executor_type')}:{result.get('ai_provider')}"
+
+        if source in state.received:
+            outcome = {"status": "duplicate", "source": source}
+        elif self.mode == "streaming":
+            # 실행자가 저장소로 옮긴 도구 출력을 원본으로 되돌려 분석
+            hydrated = await asyncio.to_thread(hydrate_outputs, result, self.artifacts)
+            outcome = await self.agent.process_incremental(state, hydrated, source)
+            state.execution_results[-1] = result
+        else:
+            state.received.append(source)
+            state.execution_results.append(result)
+            outcome = {"status": "buffered", "source": source}
+
+        print(f"실행 결과 처리 ({state.scan_id}, {source}, #{payload.get('sequence')}): {outcome['status']} - {len(state.received)}/{state.expected_results}")
+
+    async def finalize(self, state: IncrementalAnalysisState, marker: Dict[str, Any]):
+        """최종 분석 리포트를 결정자에게 전송 (마감 시각 때문에 일부 결과가 빠졌으면 함께 표시)"""
+
+        state.execution_results = await asyncio.to_thread(hydrate_outputs, state.execution_results, self.artifacts)
+
+        if self.mode == "streaming":
+            report = await self.agent.reconcile(state)
+        else:
+            report = await self.agent.process({
+                "execution_results": [r.get("result", r) for r in state.execution_results],
+                "target_url": state.target_url
+            })
+
+        # 시간 예산 부족으로 건너뛴 테스트도 최종 리포트에 포함
+        await self.decision_queue.enqueue({
+            "scan_id": state.scan_id,
+            "analyzer": self.ai_provider,
+            "report": report,
+            "skipped_tests": marker.get("skipped_tests", []),
+            "complete": marker.get("complete", True),
+            "missing_results": marker.get("missing_results", 0)
+        })
+
+        await self.registry.record_analysis(state.scan_id, self.ai_provider, len(ANALYZER_PROVIDERS))
+
+        print(f"분석 리포트를 결정자 큐에 전송: {state.scan_id} ({self.ai_provider})")
+
+    def _done_key(self, scan_id: str) -> str:
+        return f"analysis_done:{self.ai_provider}:{scan_id}"
+
+    def _state_key(self, scan_id: str) -> str:
+        return f"analysis_state:{self.ai_provider}:{scan_id}"
+
+    async def load_state(self, payload: Dict[str, Any]) -> IncrementalAnalysisState:
+        """스캔별 분석 상태 조회 (없으면 새로 생성)"""
+
+        raw = await self.redis_client.get(self._state_key(payload.get("scan_id", "unknown")))
+        if raw:
+            return IncrementalAnalysisState.from_json(raw)
+
+        return IncrementalAnalysisState(
+            scan_id=payload.get("scan_id", "unknown"),
+            target_url=payload.get("target_url", ""),
+            expected_results=payload.get("expected_results", 6)
+        )
+
+
+async def main():
+    """메인 실행 함수"""
+
+    service = AnalyzerService()
+    await service.initialize()
+
+    try:
+        await service.start_worker()
+    finally:
+        await service.redis_client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
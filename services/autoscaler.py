@@ -0,0 +1,122 @@
+"""
+로컬 오토스케일링 슈퍼바이저
+관리자 AI의 /autoscaling 권장 레플리카 수에 맞춰 docker compose 서비스 수를 조정
+"""
+import asyncio
+import json
+import os
+from typing import Dict
+
+from services.manager_client import ManagerClient
+
+
+class ComposeAutoscaler:
+    """큐 적체량 기반으로 docker compose 서비스 레플리카를 조정"""
+
+    def __init__(self):
+        self.manager_url = os.getenv("MANAGER_URL", "http://localhost:8000")
+        self.interval = float(os.getenv("AUTOSCALE_INTERVAL", "30"))
+        # 축소는 권장값이 연속으로 낮게 나올 때만 (작업 도중 컨테이너가 줄어드는 것 방지)
+        self.scale_down_after = int(os.getenv("AUTOSCALE_SCALE_DOWN_AFTER", "5"))
+        self.current: Dict[str, int] = {}
+        self._lower_streak: Dict[str, int] = {}
+
+    async def fetch_recommendations(self, client: ManagerClient) -> Dict[str, int]:
+        """서비스별 권장 레플리카 수 조회"""
+
+        recommendations = {}
+        for report in (await client.autoscaling()).values():
+            recommendations.update(report["services"])
+        return recommendations
+
+    async def observe(self) -> Dict[str, int]:
+        """docker compose로 실행 중인 서비스별 레플리카 수 조회"""
+
+        process = await asyncio.create_subprocess_exec(
+            "docker", "compose", "ps", "--format", "json",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await process.communicate()
+
+        if process.returncode != 0:
+            raise RuntimeError(stderr.decode('utf-8'))
+
+        # compose 버전에 따라 JSON 배열 또는 줄마다 객체 하나
+        output = stdout.decode('utf-8').strip()
+        containers = json.loads(output) if output.startswith("[") else [json.loads(line) for line in output.splitlines() if line.strip()]
+
+        replicas: Dict[str, int] = {}
+        for container in containers:
+            if container.get("State") == "running":
+                replicas[container["Service"]] = replicas.get(container["Service"], 0) + 1
+        return replicas
+
+    def plan(self, recommendations: Dict[str, int]) -> Dict[str, int]:
+        """변경이 필요한 서비스와 목표 레플리카 수 결정 (현재 레플리카 수를 모르는 서비스는 조정하지 않음)"""
+
+        changes = {}
+
+        for service, target in recommendations.items():
+            current = self.current.get(service)
+
+            if current is None:
+                continue
+            if target > current:
+                changes[service] = target
+                self._lower_streak[service] = 0
+            elif target < current:
+                self._lower_streak[service] = self._lower_streak.get(service, 0) + 1
+                if self._lower_streak[service] >= self.scale_down_after:
+                    changes[service] = target
+                    self._lower_streak[service] = 0
+            else:
+                self._lower_streak[service] = 0
+
+        return changes
+
+    async def apply(self, changes: Dict[str, int]):
+        """docker compose로 레플리카 수 적용"""
+
+        args = ["docker", "compose", "up", "-d", "--no-recreate"]
+        for service, replicas in changes.items():
+            args += ["--scale", f"{service}={replicas}"]
+        args += list(changes)
+
+        process = await asyncio.create_subprocess_exec(
+            *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        _, stderr = await process.communicate()
+
+        if process.returncode != 0:
+            raise RuntimeError(stderr.decode('utf-8'))
+
+        self.current.update(changes)
+        print(f"레플리카 조정: {changes}")
+
+    async def run(self):
+        """주기적으로 권장값을 확인하고 적용"""
+
+        print(f"오토스케일러 시작 (관리자: {self.manager_url}, 주기: {self.interval}초)")
+
+        async with ManagerClient(self.manager_url) as client:
+            while True:
+                try:
+                    # 실행 중이 아닌 서비스는 0개로 간주 (수동 변경/컨테이너 종료도 반영)
+                    observed = await self.observe()
+                    recommendations = await self.fetch_recommendations(client)
+                    self.current = {service: observed.get(service, 0) for service in recommendations}
+
+                    changes = self.plan(recommendations)
+                    if changes:
+                        await self.apply(changes)
+                except Exception as e:
+                    print(f"오토스케일링 실패: {e}")
+
+                await asyncio.sleep(self.interval)
+
+
+if __name__ == "__main__":
+    asyncio.run(ComposeAutoscaler().run())
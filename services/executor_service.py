@@ -3,11 +3,20 @@
 """
 import asyncio
 import os
-import json
+import signal
+import socket
+import time
 import redis.asyncio as redis
 from typing import Dict, Any
 
+from agents.analyzer_agent import extract_findings, finding_key
 from agents.base_agent import BaseAgent
+from core.artifacts import artifact_store, offload_outputs
+from core.deadline import Deadline
+from services.scan_registry import ScanRegistry
+from services.scheduler import FairScheduler
+from services.task_queue import ReliableQueue, QueueMessage, executor_stream
+from services.telemetry import QueueTelemetry, RuntimeStats, EXECUTION_RESULTS_QUEUE
 
 
 class ExecutorService:
@@ -18,6 +27,23 @@ class ExecutorService:
         self.executor_type = os.getenv("EXECUTOR_TYPE", "static")  # static or dynamic
         self.redis_client = None
         self.agent = None
+        self.task_queue = None
+        self.result_queue = None
+        self.telemetry = None
+        self.runtime_stats = None
+        self.registry = None
+        self.artifacts = None
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}"
+        
+        # 동시 실행 설정: 최대 N개 작업을 동시에 실행하고 M개까지 미리 가져옴
+        self.concurrency = int(os.getenv("EXECUTOR_CONCURRENCY", "4"))
+        self.prefetch = int(os.getenv("EXECUTOR_PREFETCH", "2"))
+        self.drain_timeout = float(os.getenv("EXECUTOR_DRAIN_TIMEOUT", "900"))
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._fetch_slots = asyncio.Semaphore(self.concurrency + self.prefetch)
+        self._in_flight = set()
+        self._running = 0
+        self._stopping = asyncio.Event()
         
     async def initialize(self):
         """서비스 초기화"""
@@ -26,6 +52,19 @@ class ExecutorService:
         redis_url = os.getenv("REDIS_URL", "redis://localhost:6379")
         self.redis_client = redis.from_url(redis_url)
         
+        # 이 실행자 전용 작업 스트림 (같은 유형/제공업체의 복제 컨테이너끼리 작업을 나눠 가짐)
+        # 우선순위/테넌트별 서브 스트림을 가중 라운드로빈으로 순회
+        self.task_queue = FairScheduler(
+            self.redis_client,
+            base_stream=executor_stream(self.executor_type, self.ai_provider),
+            group="executors"
+        )
+        self.result_queue = ReliableQueue(self.redis_client, stream=EXECUTION_RESULTS_QUEUE, group="aggregators")
+        self.telemetry = QueueTelemetry(self.redis_client, self.task_queue.base_stream)
+        self.runtime_stats = RuntimeStats(self.redis_client)
+        self.registry = ScanRegistry(self.redis_client)
+        self.artifacts = artifact_store()
+        
         # AI 에이전트 초기화
         self.agent = self.create_agent()
         
@@ -34,94 +73,214 @@ class ExecutorService:
     def create_agent(self) -> BaseAgent:
         """AI 에이전트 생성"""
         
+        from config.settings import AGENT_ROLES
+        
         if self.executor_type == "static":
-            from agents.static_executor import StaticAnalysisExecutor
-            return StaticAnalysisExecutor(
-                name=f"정적분석 실행자 ({self.ai_provider})",
-                model=self.get_model_name(),
-                provider=self.ai_provider,
-                role_description=f"{self.ai_provider}를 사용한 정적 코드 분석"
-            )
+            from agents.static_executor import StaticAnalysisExecutor as agent_class
+            agent_config = AGENT_ROLES["static_executors"][self.ai_provider]
         else:
-            from agents.dynamic_executor import DynamicTestExecutor
-            return DynamicTestExecutor(
-                name=f"동적테스트 실행자 ({self.ai_provider})",
-                model=self.get_model_name(),
-                provider=self.ai_provider,
-                role_description=f"{self.ai_provider}를 사용한 동적 보안 테스트"
-            )
-    
-    def get_model_name(self) -> str:
-        """AI 모델명 반환"""
-        model_map = {
-            "openai": "gpt-4",
-            "claude": "claude-3-sonnet-20240229",
-            "gemini": "gemini-pro"
-        }
-        return model_map.get(self.ai_provider, "gpt-4")
+            from agents.dynamic_executor import DynamicTestExecutor as agent_class
+            agent_config = AGENT_ROLES["dynamic_executors"][self.ai_provider]
+        
+        return agent_class(
+            name=agent_config["name"],
+            model=agent_config["model"],
+            primary_provider=agent_config["primary_provider"],
+            fallback_providers=agent_config["fallback_providers"],
+            role_description=agent_config["description"]
+        )
     
     async def start_worker(self):
-        """워커 시작"""
+        """워커 시작 - 세마포어로 동시 실행 수를 제한하며 큐에서 계속 작업을 가져옴"""
+        
+        print(f"워커 시작: 동시 실행 {self.concurrency}개, 선반입 {self.prefetch}개")
         
-        queue_name = f"{self.executor_type}_analysis_queue"
+        reporter = asyncio.create_task(self._report_telemetry())
+        
+        while not self._stopping.is_set():
+            # 실행 중 + 대기 중인 작업이 한도에 도달하면 새로 가져오지 않음
+            await self._fetch_slots.acquire()
+            
+            if self._stopping.is_set():
+                self._fetch_slots.release()
+                break
+            
+            try:
+                # 큐에서 작업 가져오기 (블로킹, 시간 초과된 작업은 회수)
+                messages = await self.task_queue.fetch(block_ms=5000)
+            except Exception as e:
+                self._fetch_slots.release()
+                print(f"작업 수신 중 오류: {e}")
+                await asyncio.sleep(5)
+                continue
+            
+            if not messages:
+                self._fetch_slots.release()
+                continue
+            
+            runner = asyncio.create_task(self._run_task(messages[0]))
+            self._in_flight.add(runner)
+            runner.add_done_callback(self._in_flight.discard)
+        
+        await self.drain()
+        
+        reporter.cancel()
+        await self.telemetry.remove_worker(self.worker_id)
+    
+    async def _report_telemetry(self):
+        """처리 중인 작업 수를 주기적으로 보고 (오토스케일링 신호)"""
+        
+        interval = float(os.getenv("TELEMETRY_INTERVAL", "10"))
         
         while True:
             try:
-                # 큐에서 작업 가져오기 (블로킹)
-                task_data = await self.redis_client.brpop(queue_name, timeout=10)
-                
-                if task_data:
-                    _, task_json = task_data
-                    task = json.loads(task_json)
+                await self.telemetry.worker_heartbeat(self.worker_id, self._running, self.concurrency)
+            except Exception as e:
+                print(f"텔레메트리 보고 실패: {e}")
+            await asyncio.sleep(interval)
+    
+    async def _run_task(self, message: QueueMessage):
+        """단일 작업 처리 (실행 슬롯 확보 후 실행, 결과 전송 후 ack)"""
+        
+        heartbeat = asyncio.create_task(self._heartbeat(message))
+        
+        try:
+            async with self._slots:
+                self._running += 1
+                started_at = time.monotonic()
+                try:
+                    task = message.payload
                     
-                    print(f"작업 수신: {task['type']}")
+                    print(f"작업 수신: {task['type']} (우선순위 {task.get('priority')}, 시도 {message.attempts}회)")
                     
                     # 작업 실행
                     result = await self.execute_task(task)
                     
-                    # 결과를 분석가 큐에 전송
-                    await self.send_to_analyzers(result)
+                    # 긴 도구 출력은 저장소에 두고 메시지에는 참조만 전달
+                    result = await asyncio.to_thread(offload_outputs, result, self.artifacts)
+                    
+                    # 결과를 집계 큐에 전송하고 스캔 레지스트리에 도착 기록
+                    await self.send_to_aggregator(result)
+                    if task.get("scan_id"):
+                        await self.registry.record_result(task["scan_id"], result["source"])
+                        await self.registry.record_findings(
+                            task["scan_id"],
+                            {finding_key(f): f for f in extract_findings(result.get("result") or {})},
+                            result["source"]
+                        )
                     
+                    # 결과 전송까지 끝나야 작업을 완료 처리 (실패 시 가시성 타임아웃 후 재시도)
+                    await self.task_queue.ack(message)
+                    await self.record_runtime(task, result, time.monotonic() - started_at)
+                finally:
+                    self._running -= 1
+                
+        except Exception as e:
+            print(f"작업 처리 중 오류: {e}")
+        finally:
+            heartbeat.cancel()
+            self._fetch_slots.release()
+    
+    async def record_runtime(self, task: Dict[str, Any], result: Dict[str, Any], duration: float):
+        """큐 처리 시간과 테스트별 실행 시간 기록 (샤드는 전체 테스트 기준으로 환산)"""
+        
+        await self.telemetry.record_completion(duration)
+        
+        # 건너뛰었거나 이전 결과를 이어받은 작업은 실제 실행 시간이 아니므로 제외
+        outcome = result.get("result") or {}
+        if task.get("test_type") and "error" not in result and outcome.get("status") != "skipped" and not outcome.get("carried_forward"):
+            fraction = (task.get("shard") or {}).get("fraction", 1.0)
+            await self.runtime_stats.record(task["test_type"], duration / fraction)
+    
+    async def _heartbeat(self, message: QueueMessage):
+        """장시간 실행 중인 작업이 회수되지 않도록 주기적으로 가시성 타임아웃 연장"""
+        
+        interval = self.task_queue.visibility_timeout / 3
+        
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.task_queue.touch(message)
             except Exception as e:
-                print(f"작업 처리 중 오류: {e}")
-                await asyncio.sleep(5)
+                print(f"작업 처리 상태 갱신 실패: {e}")
+    
+    def stop(self):
+        """새 작업 수신 중단 (실행 중인 작업은 drain에서 마무리)"""
+        
+        if not self._stopping.is_set():
+            print("종료 요청 수신: 새 작업 수신을 중단합니다")
+            self._stopping.set()
+    
+    async def drain(self):
+        """실행 중인 작업이 모두 끝날 때까지 대기"""
+        
+        if not self._in_flight:
+            return
+        
+        print(f"실행 중인 작업 {len(self._in_flight)}개 완료 대기")
+        
+        done, pending = await asyncio.wait(set(self._in_flight), timeout=self.drain_timeout)
+        
+        for task in pending:
+            task.cancel()
+        
+        if pending:
+            print(f"종료 대기 시간 초과: 작업 {len(pending)}개 취소")
     
     async def execute_task(self, task: Dict[str, Any]) -> Dict[str, Any]:
         """작업 실행"""
         
+        # 대기 중에 마감 시각이 지난 작업은 실행하지 않고 건너뛴 결과만 전달 (분석가 결과 수는 맞춤)
+        if Deadline.from_payload(task).expired:
+            print(f"마감 시각 초과로 작업 건너뜀: {task.get('scan_id')}")
+            return {
+                **self._result_envelope(task),
+                "result": {"status": "skipped", "reason": "스캔 마감 시각 초과", "test_scope": task.get("test_scope", [])},
+                "timestamp": time.time()
+            }
+        
         try:
             # AI 에이전트로 작업 처리
             result = await self.agent.process(task)
             
-            # 실행 시간 시뮬레이션 (실제 보안 테스트는 시간이 오래 걸림)
-            if self.executor_type == "dynamic":
-                print("동적 테스트 실행 중... (시간이 오래 걸릴 수 있습니다)")
-                await asyncio.sleep(30)  # 30초 시뮬레이션
-            else:
-                await asyncio.sleep(10)  # 10초 시뮬레이션
-            
             return {
-                "executor_type": self.executor_type,
-                "ai_provider": self.ai_provider,
+                **self._result_envelope(task),
                 "result": result,
-                "timestamp": asyncio.get_event_loop().time()
+                "timestamp": time.time()
             }
             
         except Exception as e:
             return {
-                "executor_type": self.executor_type,
-                "ai_provider": self.ai_provider,
+                **self._result_envelope(task),
                 "error": str(e),
-                "timestamp": asyncio.get_event_loop().time()
+                "timestamp": time.time()
             }
     
-    async def send_to_analyzers(self, result: Dict[str, Any]):
-        """분석가들에게 결과 전송"""
+    def _result_envelope(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        """집계 서비스가 스캔별로 결과를 모을 수 있도록 스캔 정보 첨부"""
+        
+        source = f"{self.executor_type}:{self.ai_provider}"
+        if task.get("test_type"):
+            source += f":{task['test_type']}#{(task.get('shard') or {}).get('index', 0)}"
+        
+        return {
+            "scan_id": task.get("scan_id"),
+            "source": source,
+            "target_url": task.get("target_url"),
+            "expected_results": task.get("expected_results"),
+            "deadline": task.get("deadline"),
+            "skipped_tests": task.get("skipped_tests", []),
+            "executor_type": self.executor_type,
+            "ai_provider": self.ai_provider
+        }
+    
+    async def send_to_aggregator(self, result: Dict[str, Any]):
+        """집계 서비스에 결과 전송 (집계 서비스가 분석가들에게 바로 전달)"""
         
-        result_json = json.dumps(result)
-        await self.redis_client.lpush("analysis_queue", result_json)
+        await self.result_queue.enqueue(result)
+        await QueueTelemetry(self.redis_client, self.result_queue.stream).record_arrival()
         
-        print(f"결과를 분석가 큐에 전송: {self.executor_type} ({self.ai_provider})")
+        print(f"결과를 집계 큐에 전송: {self.executor_type} ({self.ai_provider})")
 
 
 async def main():
@@ -130,8 +289,16 @@ async def main():
     service = ExecutorService()
     await service.initialize()
     
+    # SIGTERM/SIGINT 수신 시 실행 중인 작업을 마무리하고 종료
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, service.stop)
+    
     # 워커 시작
-    await service.start_worker()
+    try:
+        await service.start_worker()
+    finally:
+        await service.redis_client.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,193 @@
+"""
+관리자 AI 서비스 클라이언트
+- 프로세스당 하나의 httpx.AsyncClient를 유지하여 연결 풀과 keep-alive 재사용
+- 일시적 오류는 지수 백오프 + 지터로 재시도 (POST는 요청이 전달되지 않은 연결 오류만 재시도하여 스캔이 중복 생성되지 않음)
+- 연속 실패 시 서킷 브레이커를 열어 관리자 AI가 복구될 때까지 즉시 실패
+- 대시보드, 오토스케일러, 시스템 테스트 스크립트가 함께 사용하며 요청 형식은 관리자 AI와 같은 모델을 공유
+"""
+import asyncio
+import os
+import random
+import time
+from typing import Dict, Any, List, Literal, Optional
+
+import httpx
+from pydantic import BaseModel
+
+
+class TestRequest(BaseModel):
+    """보안 테스트 시작 요청"""
+    __test__ = False  # pytest 수집 대상 아님
+
+    target_info: Dict[str, Any]
+    test_scope: list
+    priority: Literal["urgent", "normal", "batch"] = "normal"
+    tenant: Optional[str] = None  # 공정 분배 단위 (미지정 시 프로젝트명 또는 대상 호스트)
+    time_budget_seconds: Optional[int] = None  # 스캔 전체 시간 예산 (미지정 시 SCAN_TIME_BUDGET 또는 제한 없음)
+    batch_id: Optional[str] = None  # 일괄 등록된 스캔의 배치 ID
+    rescan: bool = False  # 증분 재스캔 (공격 표면 지문이 그대로인 동적 테스트는 이전 결과 재사용)
+
+
+class BatchTestRequest(BaseModel):
+    """보안 테스트 일괄 시작 요청"""
+    scans: List[TestRequest]
+    batch_id: Optional[str] = None
+
+
+class ManagerError(Exception):
+    """관리자 AI 호출 실패 (status_code는 HTTP 응답이 있었던 경우)"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class ManagerUnavailable(ManagerError):
+    """서킷 브레이커가 열려 있어 호출하지 않음"""
+
+
+# 다시 보내도 안전한 응답 코드 (관리자 AI 재시작/과부하)
+RETRYABLE_STATUS = {502, 503, 504}
+
+# 요청이 서버에 전달되기 전에 난 오류 (POST도 재시도 가능)
+CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class CircuitBreaker:
+    """연속 실패 횟수 기반 서킷 브레이커 (열린 뒤 reset_timeout이 지나면 한 번 시험 호출 허용)"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial:
+            self._trial = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._trial or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self._trial = False
+
+
+class ManagerClient:
+    """관리자 AI 서비스 API 클라이언트 (async with 또는 aclose()로 연결 정리)"""
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        timeout: float = 30.0,
+        retries: Optional[int] = None,
+        backoff: float = 0.2,
+        breaker: Optional[CircuitBreaker] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.base_url = base_url or os.getenv("MANAGER_URL", "http://manager-ai:8000")
+        self.retries = retries if retries is not None else int(os.getenv("MANAGER_RETRIES", "3"))
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker(
+            failure_threshold=int(os.getenv("MANAGER_BREAKER_THRESHOLD", "5")),
+            reset_timeout=float(os.getenv("MANAGER_BREAKER_RESET", "30"))
+        )
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=int(os.getenv("MANAGER_MAX_CONNECTIONS", "20")),
+                max_keepalive_connections=int(os.getenv("MANAGER_MAX_KEEPALIVE", "10")),
+                keepalive_expiry=60.0
+            ),
+            transport=transport
+        )
+
+    async def __aenter__(self) -> "ManagerClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    def _delay(self, attempt: int) -> float:
+        """전체 지터 백오프 (여러 클라이언트가 동시에 재시도하지 않도록)"""
+        return random.uniform(0, min(5.0, self.backoff * 2 ** attempt))
+
+    async def request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """재시도와 서킷 브레이커를 적용한 요청 (2xx가 아니면 ManagerError)"""
+
+        if not self.breaker.allow():
+            raise ManagerUnavailable("관리자 AI 서비스가 응답하지 않아 호출을 일시 중단했습니다.")
+
+        idempotent = method.upper() in ("GET", "HEAD")
+        attempt = 0
+        while True:
+            try:
+                response = await self.client.request(method, path, **kwargs)
+            except httpx.TransportError as e:
+                retryable = idempotent or isinstance(e, CONNECT_ERRORS)
+                if retryable and attempt < self.retries:
+                    await asyncio.sleep(self._delay(attempt))
+                    attempt += 1
+                    continue
+                self.breaker.record_failure()
+                raise ManagerError(f"관리자 AI 연결 실패: {e!r}") from e
+
+            if response.status_code in RETRYABLE_STATUS:
+                if idempotent and attempt < self.retries:
+                    await asyncio.sleep(self._delay(attempt))
+                    attempt += 1
+                    continue
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+
+            if response.is_success:
+                return response
+            raise ManagerError(f"API 호출 실패: {response.status_code}", status_code=response.status_code)
+
+    async def health(self) -> Dict[str, Any]:
+        return (await self.request("GET", "/health")).json()
+
+    async def start_security_test(self, request: TestRequest) -> Dict[str, Any]:
+        """보안 테스트 시작 (test_id, deadline, test_scope, skipped_tests 반환)"""
+        return (await self.request("POST", "/start-security-test", json=request.dict())).json()
+
+    async def start_security_tests_batch(self, request: BatchTestRequest) -> Dict[str, Any]:
+        """보안 테스트 일괄 시작 (batch_id와 요청 순서대로의 scans 반환)"""
+
+        result = (await self.request("POST", "/start-security-tests/batch", json=request.dict(), timeout=60.0)).json()
+        if result.get("status") != "started":
+            raise ManagerError(result.get("error") or "배치 시작 실패")
+        return result
+
+    async def get_scan(self, scan_id: str) -> Dict[str, Any]:
+        return (await self.request("GET", f"/scans/{scan_id}")).json()
+
+    async def status(self) -> Dict[str, Any]:
+        return (await self.request("GET", "/status")).json()
+
+    async def autoscaling(self) -> Dict[str, Any]:
+        return (await self.request("GET", "/autoscaling", timeout=10.0)).json()
@@ -3,23 +3,30 @@
 """
 import asyncio
 import os
+import time
 from fastapi import FastAPI, BackgroundTasks
-from pydantic import BaseModel
 import redis.asyncio as redis
 import json
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlparse
 
 from agents.manager_agent import ManagerAgent
 from config.settings import AGENT_ROLES
+from core.deadline import Deadline, ANALYSIS_RESERVE_SECONDS
+from services.manager_client import TestRequest, BatchTestRequest
+from services.scan_registry import ScanRegistry, new_scan_id
+from services.scheduler import FairScheduler, PRIORITY_WEIGHTS
+from services.task_queue import EXECUTOR_QUEUES, EXECUTOR_PROVIDERS, executor_stream
+from services.telemetry import QueueTelemetry, RuntimeStats, ANALYSIS_QUEUE, EXECUTION_RESULTS_QUEUE, SERVICE_TYPES, collect_telemetry
 
 app = FastAPI(title="Manager AI Service", version="1.0.0")
 
 # Redis 연결
 redis_client = None
 
-class TestRequest(BaseModel):
-    target_info: Dict[str, Any]
-    test_scope: list
+# 일괄 등록 시 동시에 계획을 수립하는 스캔 수 (계획 단계의 LLM 호출이 몰리지 않도록)
+BATCH_PLANNING_CONCURRENCY = int(os.getenv("BATCH_PLANNING_CONCURRENCY", "4"))
+MAX_BATCH_SCANS = int(os.getenv("MAX_BATCH_SCANS", "500"))
 
 
 @app.on_event("startup")
@@ -36,69 +43,259 @@ async def shutdown():
         await redis_client.close()
 
 
-@app.post("/start-security-test")
-async def start_security_test(request: TestRequest, background_tasks: BackgroundTasks):
-    """보안 테스트 시작"""
+def create_manager() -> ManagerAgent:
+    """관리자 AI 초기화"""
     
-    # 관리자 AI 초기화
     manager_config = AGENT_ROLES["manager"]
-    manager = ManagerAgent(
+    return ManagerAgent(
         name=manager_config["name"],
         model=manager_config["model"],
         primary_provider=manager_config["primary_provider"],
         fallback_providers=manager_config["fallback_providers"],
         role_description=manager_config["description"]
     )
+
+
+async def register_scan(request: TestRequest) -> Dict[str, Any]:
+    """스캔 ID 발급, 시간 예산에 맞춘 테스트 선택, 레지스트리 등록"""
+    
+    # 시간순 정렬 가능한 고유 스캔 ID (모든 큐 메시지와 결과에 포함)
+    test_id = new_scan_id()
+    
+    # 스캔 마감 시각 결정 - 분석 시간을 남겨두고 실행 단계 예산에 들어가는 테스트만 수행
+    deadline = Deadline.after(request.time_budget_seconds)
+    test_scope, skipped_tests = deadline.select_tests(request.test_scope, reserve=ANALYSIS_RESERVE_SECONDS)
+    
+    test_data = {
+        **request.dict(),
+        "test_scope": test_scope,
+        "skipped_tests": skipped_tests,
+        "deadline": deadline.to_payload()
+    }
+    
+    await ScanRegistry(redis_client).create(
+        test_id,
+        target_url=request.target_info.get("target_url"),
+        test_scope=test_scope,
+        skipped_tests=skipped_tests,
+        priority=request.priority,
+        tenant=resolve_tenant(test_data),
+        deadline=deadline.to_payload(),
+        batch_id=request.batch_id
+    )
+    
+    return {"test_id": test_id, "test_data": test_data}
+
+
+def started_response(scan: Dict[str, Any]) -> Dict[str, Any]:
+    test_data = scan["test_data"]
+    return {
+        "test_id": scan["test_id"],
+        "scan_id": scan["test_id"],
+        "deadline": test_data["deadline"],
+        "test_scope": test_data["test_scope"],
+        "skipped_tests": test_data["skipped_tests"]
+    }
+
+
+@app.post("/start-security-test")
+async def start_security_test(request: TestRequest, background_tasks: BackgroundTasks):
+    """보안 테스트 시작"""
+    
+    scan = await register_scan(request)
     
     # 백그라운드에서 테스트 실행
-    background_tasks.add_task(execute_security_test, manager, request.dict())
+    background_tasks.add_task(execute_security_test, create_manager(), scan["test_data"], scan["test_id"])
     
     return {
         "status": "started",
         "message": "보안 테스트가 시작되었습니다",
-        "test_id": "test_" + str(hash(str(request.dict())))
+        **started_response(scan)
     }
 
 
-async def execute_security_test(manager: ManagerAgent, test_data: Dict[str, Any]):
+@app.post("/start-security-tests/batch")
+async def start_security_tests_batch(request: BatchTestRequest, background_tasks: BackgroundTasks):
+    """여러 보안 테스트를 한 번에 시작 (응답의 scans는 요청 순서와 같음)"""
+    
+    if not request.scans or len(request.scans) > MAX_BATCH_SCANS:
+        return {"status": "error", "error": f"스캔은 1개 이상 {MAX_BATCH_SCANS}개 이하로 요청해야 합니다."}
+    
+    batch_id = request.batch_id or new_scan_id()
+    scans = [
+        await register_scan(scan_request.copy(update={"batch_id": batch_id}))
+        for scan_request in request.scans
+    ]
+    
+    background_tasks.add_task(execute_batch, create_manager(), scans)
+    
+    return {
+        "status": "started",
+        "message": f"보안 테스트 {len(scans)}개가 시작되었습니다",
+        "batch_id": batch_id,
+        "scans": [started_response(scan) for scan in scans]
+    }
+
+
+async def execute_batch(manager: ManagerAgent, scans: List[Dict[str, Any]]):
+    """배치의 스캔들을 제한된 동시성으로 실행"""
+    
+    semaphore = asyncio.Semaphore(BATCH_PLANNING_CONCURRENCY)
+    
+    async def run(scan: Dict[str, Any]):
+        async with semaphore:
+            await execute_security_test(manager, scan["test_data"], scan["test_id"])
+    
+    await asyncio.gather(*(run(scan) for scan in scans))
+
+
+async def execute_security_test(manager: ManagerAgent, test_data: Dict[str, Any], test_id: str):
     """보안 테스트 실행"""
     
+    registry = ScanRegistry(redis_client)
+    
     try:
-        # 1. 테스트 계획 수립
-        plan_result = await manager.process(test_data)
+        await registry.update(test_id, stage="planning")
+        
+        # 1. 테스트 계획 수립 (실행 시간 기록과 동적 실행자 여유 용량 반영)
+        plan_result = await manager.process({
+            **test_data,
+            "runtime_stats": await RuntimeStats(redis_client).load(),
+            "capacity": await executor_capacity("dynamic")
+        })
         
         if plan_result["status"] == "success":
+            # 시간 예산으로 제외한 테스트 + 실행 코드를 만들지 못한 테스트
+            skipped_tests = test_data.get("skipped_tests", []) + plan_result.get("skipped_tests", [])
+            
             # 2. 실행자들에게 작업 분배
-            await distribute_tasks_to_executors(plan_result)
+            expected_results = await distribute_tasks_to_executors(
+                plan_result,
+                test_id,
+                priority=test_data.get("priority", "normal"),
+                tenant=resolve_tenant(test_data),
+                deadline=Deadline.from_payload(test_data),
+                skipped_tests=skipped_tests,
+                rescan=test_data.get("rescan", False)
+            )
+            
+            schedule = plan_result.get("schedule") or {}
+            await registry.update(
+                test_id,
+                stage="dispatched",
+                expected_results=expected_results,
+                skipped_tests=skipped_tests,
+                estimated_completion_at=schedule.get("estimated_completion_at")
+            )
+        else:
+            await registry.fail(test_id, plan_result.get("error", "계획 수립 실패"))
             
         print(f"테스트 계획 완료: {plan_result}")
         
     except Exception as e:
         print(f"테스트 실행 중 오류: {e}")
+        await registry.fail(test_id, str(e))
+
+
+async def executor_capacity(executor_type: str) -> Dict[str, Any]:
+    """실행자 여유 용량 (제공업체별 스트림 중 가장 느린 쪽 기준)
+
+    - slots: 전체 슬롯(워커 수 x 동시 실행 수)에서 워커 하트비트의 처리 중 작업 수를 뺀 빈 슬롯 (최소 1)
+    - backlog_seconds: 대기 작업을 전체 슬롯으로 처리할 때 걸리는 예상 대기 시간
+    """
+    
+    default_service_seconds = SERVICE_TYPES[f"{executor_type}_executor"]["default_service_seconds"]
+    default_concurrency = int(os.getenv("EXECUTOR_CONCURRENCY", "4"))
+    slots, backlog_seconds = [], []
+    
+    for ai_provider in EXECUTOR_PROVIDERS:
+        stream = executor_stream(executor_type, ai_provider)
+        snapshot = await QueueTelemetry(redis_client, stream).snapshot(await resolve_streams(stream))
+        
+        provider_slots = max(1, len(snapshot["workers"])) * (snapshot["worker_concurrency"] or default_concurrency)
+        service_seconds = snapshot["avg_service_seconds"] or default_service_seconds
+        
+        slots.append(max(1, provider_slots - snapshot["in_flight"]))
+        backlog_seconds.append(snapshot["depth"] * service_seconds / provider_slots)
+    
+    return {"slots": min(slots), "backlog_seconds": round(max(backlog_seconds), 1)}
 
 
-async def distribute_tasks_to_executors(plan_result: Dict[str, Any]):
-    """실행자들에게 작업 분배"""
+def resolve_tenant(test_data: Dict[str, Any]) -> str:
+    """공정 분배에 사용할 테넌트 결정"""
     
-    # 정적 분석 작업 큐에 추가
-    static_task = {
-        "type": "static_analysis",
-        "plan": plan_result["test_plan"],
-        "timestamp": asyncio.get_event_loop().time()
+    if test_data.get("tenant"):
+        return test_data["tenant"]
+    
+    target_info = test_data.get("target_info", {})
+    return (
+        target_info.get("project_name")
+        or urlparse(target_info.get("target_url", "")).hostname
+        or "default"
+    )
+
+
+async def distribute_tasks_to_executors(
+    plan_result: Dict[str, Any],
+    test_id: str,
+    priority: str = "normal",
+    tenant: str = "default",
+    deadline: Optional[Deadline] = None,
+    skipped_tests: Optional[list] = None,
+    rescan: bool = False
+):
+    """실행자들에게 작업 분배 (제공업체별 스트림에 복제하여 6개 실행자가 모두 수행)
+    
+    동적 테스트는 계획의 작업(샤드) 단위로 나눠 짧은 작업부터 큐에 넣음 (실행 패키지가 있는 작업만 계획에 포함됨)
+    """
+    
+    # 실행자는 분석 시간을 남겨둔 마감 시각까지만 실행
+    execution_deadline = (deadline or Deadline()).before(ANALYSIS_RESERVE_SECONDS)
+    
+    schedule = plan_result.get("schedule") or {}
+    
+    tasks_by_type = {
+        "static": [{"type": "static_analysis"}],
+        "dynamic": [
+            {
+                "type": "dynamic_testing",
+                "test_type": planned["test_type"],
+                "shard": planned["shard"],
+                "estimated_seconds": planned["estimated_seconds"],
+                "execution_package": planned.get("execution_package")
+            }
+            for planned in schedule.get("tasks", [])
+        ]
     }
     
-    await redis_client.lpush("static_analysis_queue", json.dumps(static_task))
+    # 분석가들이 마지막 실행 결과를 알 수 있도록 스캔별 예상 결과 수를 함께 전달
+    expected_results = sum(len(tasks) for tasks in tasks_by_type.values()) * len(EXECUTOR_PROVIDERS)
     
-    # 동적 테스트 작업 큐에 추가
-    dynamic_task = {
-        "type": "dynamic_testing", 
-        "plan": plan_result["test_plan"],
-        "timestamp": asyncio.get_event_loop().time()
+    common = {
+        "scan_id": test_id,
+        "expected_results": expected_results,
+        "plan": plan_result.get("execution_codes"),
+        "target_url": plan_result.get("target_url"),
+        "test_scope": plan_result.get("test_scope", []),
+        "skipped_tests": skipped_tests or [],
+        "deadline": execution_deadline.to_payload(),
+        "rescan": rescan,
+        "timestamp": time.time()
     }
     
-    await redis_client.lpush("dynamic_testing_queue", json.dumps(dynamic_task))
+    for executor_type, tasks in tasks_by_type.items():
+        for ai_provider in EXECUTOR_PROVIDERS:
+            stream = executor_stream(executor_type, ai_provider)
+            scheduler = FairScheduler(redis_client, base_stream=stream)
+            for task in tasks:
+                await scheduler.enqueue({**common, **task}, priority=priority, tenant=tenant)
+                await QueueTelemetry(redis_client, stream).record_arrival()
+    
+    if schedule:
+        print(f"예상 소요 시간: {schedule['estimated_seconds']}초 (대기 {schedule['queue_wait_seconds']}초, 순서 {schedule['order']})")
+    print(f"작업이 실행자 큐에 분배되었습니다 (우선순위: {priority}, 테넌트: {tenant}, 작업 {expected_results}개)")
     
-    print("작업이 실행자 큐에 분배되었습니다")
+    return expected_results
 
 
 @app.get("/health")
@@ -107,23 +304,85 @@ async def health_check():
     return {"status": "healthy", "service": "manager-ai"}
 
 
+@app.get("/scans/{scan_id}")
+async def get_scan(scan_id: str):
+    """스캔 상태 조회 (스캔 ID로 바로 조회)"""
+    
+    scan = await ScanRegistry(redis_client).get(scan_id)
+    if scan is None:
+        return {"error": "스캔을 찾을 수 없습니다."}
+    return scan
+
+
 @app.get("/status")
 async def get_status():
     """현재 상태 조회"""
     
-    # Redis에서 큐 상태 확인
-    static_queue_size = await redis_client.llen("static_analysis_queue")
-    dynamic_queue_size = await redis_client.llen("dynamic_testing_queue")
+    # Redis에서 큐 상태 확인 (제공업체별 스트림을 우선순위별로 합산)
+    queues = {}
+    for executor_type, queue_name in EXECUTOR_QUEUES.items():
+        totals = {priority: {"queued": 0, "in_progress": 0, "dispatched": 0, "total_wait": 0.0, "max_wait_seconds": 0.0}
+                  for priority in PRIORITY_WEIGHTS}
+        dead_letter = 0
+        
+        for ai_provider in EXECUTOR_PROVIDERS:
+            scheduler = FairScheduler(redis_client, base_stream=executor_stream(executor_type, ai_provider))
+            stats = await scheduler.stats()
+            dead_letter += stats["dead_letter"]
+            
+            for priority in PRIORITY_WEIGHTS:
+                total, current = totals[priority], stats[priority]
+                total["queued"] += current["queued"]
+                total["in_progress"] += current["in_progress"]
+                total["dispatched"] += current["dispatched"]
+                total["total_wait"] += current["avg_wait_seconds"] * current["dispatched"]
+                total["max_wait_seconds"] = max(total["max_wait_seconds"], current["max_wait_seconds"])
+        
+        for total in totals.values():
+            total_wait = total.pop("total_wait")
+            total["avg_wait_seconds"] = round(total_wait / total["dispatched"], 3) if total["dispatched"] else 0.0
+        
+        queues[queue_name.replace("_queue", "")] = {
+            "queued": sum(t["queued"] for t in totals.values()),
+            "in_progress": sum(t["in_progress"] for t in totals.values()),
+            "dead_letter": dead_letter,
+            "by_priority": totals
+        }
     
     return {
         "service": "manager-ai",
-        "queues": {
-            "static_analysis": static_queue_size,
-            "dynamic_testing": dynamic_queue_size
+        "queues": queues,
+        "telemetry": await collect_telemetry(redis_client, resolve_streams)
+    }
+
+
+@app.get("/autoscaling")
+async def get_autoscaling():
+    """서비스 유형별 권장 레플리카 수 (외부 오토스케일러/로컬 슈퍼바이저용)"""
+    
+    telemetry = await collect_telemetry(redis_client, resolve_streams)
+    
+    return {
+        service_type: {
+            "depth": report["depth"],
+            "in_flight": report["in_flight"],
+            "oldest_age_seconds": report["oldest_age_seconds"],
+            "recommended_replicas": report["recommended_replicas"],
+            "services": report["services"]
         }
+        for service_type, report in telemetry.items()
     }
 
 
+async def resolve_streams(queue_name: str) -> list:
+    """텔레메트리 대상 큐에 속한 실제 스트림 목록"""
+    
+    if queue_name.startswith(ANALYSIS_QUEUE) or queue_name == EXECUTION_RESULTS_QUEUE:
+        return [queue_name]
+    
+    return await FairScheduler(redis_client, base_stream=queue_name).active_streams()
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,216 @@
+"""
+스캔 레지스트리
+- ULID 형식의 시간순 정렬 가능한 스캔 ID 발급
+- 스캔 상태를 scan:{id} Redis 해시로 저장하여 ID로 O(1) 조회
+- 여러 서비스가 동시에 갱신하므로 상태는 단계별 최초 도달 시각(HSETNX)으로 기록하고 조회 시 계산
+- 상태가 바뀔 때마다 scan_progress:{id} 채널로 진행 이벤트를 발행 (대시보드가 브라우저로 전달)
+"""
+import json
+import os
+import time
+from typing import Dict, Any, List, Optional
+
+
+CROCKFORD_BASE32 = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+# 진행 순서 (뒤에 있는 단계에 도달했으면 그 단계가 현재 상태)
+SCAN_STAGES = ["registered", "planning", "dispatched", "executing", "aggregated", "analyzing", "analyzed"]
+
+# JSON으로 저장하는 필드
+JSON_FIELDS = {"test_scope", "skipped_tests", "schedule", "error"}
+
+# 단계별 진행률 (실행/분석 단계는 받은 결과 수에 비례해 다음 단계 값까지 증가)
+STAGE_PROGRESS = {
+    "registered": 0,
+    "planning": 5,
+    "dispatched": 10,
+    "executing": 10,
+    "aggregated": 80,
+    "analyzing": 80,
+    "analyzed": 100
+}
+TERMINAL_STATUSES = {"analyzed", "failed"}
+
+PROGRESS_CHANNEL = "scan_progress"
+
+
+def progress_channel(scan_id: str) -> str:
+    """스캔별 진행 이벤트 채널"""
+    return f"{PROGRESS_CHANNEL}:{scan_id}"
+
+
+def scan_progress(scan: Dict[str, Any]) -> int:
+    """스캔 상태로 진행률(0-100) 계산"""
+
+    status = scan["status"]
+    if status == "failed":
+        status = next((stage for stage in reversed(SCAN_STAGES) if f"{stage}_at" in scan), "registered")
+
+    progress = STAGE_PROGRESS[status]
+    if status == "executing" and scan.get("expected_results"):
+        progress += 70 * min(1.0, scan.get("received_results", 0) / scan["expected_results"])
+    elif status == "analyzing" and scan.get("expected_analyzers"):
+        progress += 20 * min(1.0, scan.get("completed_analyses", 0) / scan["expected_analyzers"])
+    return int(progress)
+
+
+def new_scan_id() -> str:
+    """ULID - 48비트 밀리초 타임스탬프 + 80비트 난수, Crockford Base32 26자"""
+
+    value = (int(time.time() * 1000) << 80) | int.from_bytes(os.urandom(10), "big")
+    return "".join(CROCKFORD_BASE32[(value >> shift) & 31] for shift in range(125, -1, -5))
+
+
+def scan_id_timestamp(scan_id: str) -> float:
+    """스캔 ID에 포함된 생성 시각 (초)"""
+
+    value = 0
+    for char in scan_id[:10]:
+        value = value * 32 + CROCKFORD_BASE32.index(char)
+    return value / 1000
+
+
+class ScanRegistry:
+    """스캔 ID별 상태 저장소"""
+
+    def __init__(self, redis_client, ttl_seconds: Optional[int] = None):
+        self.redis = redis_client
+        self.ttl = ttl_seconds or int(os.getenv("SCAN_REGISTRY_TTL", str(7 * 24 * 3600)))
+
+    @staticmethod
+    def _key(scan_id: str) -> str:
+        return f"scan:{scan_id}"
+
+    @staticmethod
+    def _encode(fields: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            name: json.dumps(value, ensure_ascii=False, default=str) if name in JSON_FIELDS else value
+            for name, value in fields.items() if value is not None
+        }
+
+    async def create(self, scan_id: str, **fields):
+        """스캔 등록"""
+
+        now = time.time()
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self._key(scan_id), mapping=self._encode({
+                **fields,
+                "scan_id": scan_id,
+                "registered_at": now,
+                "updated_at": now
+            }))
+            pipe.expire(self._key(scan_id), self.ttl)
+            await pipe.execute()
+
+        await self.publish(scan_id, "state")
+
+    async def update(self, scan_id: str, stage: Optional[str] = None, **fields):
+        """필드 갱신 및 단계 도달 기록 (이미 도달한 단계의 시각은 바꾸지 않음)"""
+
+        now = time.time()
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self._key(scan_id), mapping=self._encode({**fields, "updated_at": now}))
+            if stage:
+                pipe.hsetnx(self._key(scan_id), f"{stage}_at", now)
+            pipe.expire(self._key(scan_id), self.ttl)
+            await pipe.execute()
+
+        await self.publish(scan_id, "state")
+
+    async def fail(self, scan_id: str, error: str):
+        """실패 기록"""
+        await self.update(scan_id, stage="failed", error=error)
+
+    async def record_result(self, scan_id: str, source: str):
+        """실행 결과 도착 기록 (source 예: dynamic:claude:sql_injection#0)"""
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hsetnx(self._key(scan_id), "executing_at", time.time())
+            pipe.hincrby(self._key(scan_id), "received_results", 1)
+            pipe.hset(self._key(scan_id), "last_result", source)
+            pipe.hset(self._key(scan_id), "updated_at", time.time())
+            await pipe.execute()
+
+        await self.publish(scan_id, "state", source=source)
+
+    @staticmethod
+    def _findings_key(scan_id: str) -> str:
+        return f"scan:{scan_id}:finding_details"
+
+    async def record_findings(self, scan_id: str, findings: Dict[str, Dict[str, Any]], source: str):
+        """발견 사항 기록 및 새 항목마다 finding 이벤트 발행 (findings: 지문 -> 발견 사항, 여러 실행자가 같은 항목을 보고해도 한 번만)
+
+        이벤트는 받는 쪽이 없으면 사라지므로 원본을 지문별로 보관하여 스캔 종료 시 다시 읽을 수 있게 함
+        """
+
+        if not findings:
+            return
+
+        key = self._findings_key(scan_id)
+        for fingerprint, finding in findings.items():
+            record = json.dumps({"finding": finding, "source": source}, ensure_ascii=False, default=str)
+            if await self.redis.hsetnx(key, fingerprint, record):
+                await self.publish(scan_id, "finding", finding=finding, fingerprint=fingerprint, source=source)
+        await self.redis.expire(key, self.ttl)
+
+    async def findings(self, scan_id: str) -> Dict[str, Dict[str, Any]]:
+        """기록된 발견 사항 (지문 -> {"finding", "source"})"""
+
+        raw = await self.redis.hgetall(self._findings_key(scan_id))
+        return {
+            (fingerprint.decode() if isinstance(fingerprint, bytes) else fingerprint): json.loads(record)
+            for fingerprint, record in raw.items()
+        }
+
+    async def record_analysis(self, scan_id: str, analyzer: str, expected_analyzers: int):
+        """분석가 리포트 완료 기록 (모든 분석가가 끝나면 analyzed)"""
+
+        completed = await self.redis.hincrby(self._key(scan_id), "completed_analyses", 1)
+        await self.update(scan_id, stage="analyzed" if completed >= expected_analyzers else "analyzing",
+                          last_analysis=analyzer, expected_analyzers=expected_analyzers)
+
+    async def get(self, scan_id: str) -> Optional[Dict[str, Any]]:
+        """스캔 상태 조회 (없으면 None)"""
+
+        return self._decode(await self.redis.hgetall(self._key(scan_id)))
+
+    async def get_many(self, scan_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """여러 스캔 상태를 한 번의 왕복으로 조회"""
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for scan_id in scan_ids:
+                pipe.hgetall(self._key(scan_id))
+            raws = await pipe.execute()
+
+        return {scan_id: self._decode(raw) for scan_id, raw in zip(scan_ids, raws)}
+
+    @staticmethod
+    def _decode(raw) -> Optional[Dict[str, Any]]:
+        if not raw:
+            return None
+
+        scan = {}
+        for name, value in raw.items():
+            name = name.decode() if isinstance(name, bytes) else name
+            value = value.decode() if isinstance(value, bytes) else value
+            scan[name] = json.loads(value) if name in JSON_FIELDS else value
+
+        for name in ("received_results", "expected_results", "aggregated_results", "missing_results",
+                     "completed_analyses", "expected_analyzers"):
+            if name in scan:
+                scan[name] = int(scan[name])
+
+        scan["status"] = "failed" if "failed_at" in scan else next(
+            (stage for stage in reversed(SCAN_STAGES) if f"{stage}_at" in scan), "registered"
+        )
+        scan["progress"] = scan_progress(scan)
+        return scan
+
+    async def publish(self, scan_id: str, event_type: str, **data):
+        """진행 이벤트 발행 (state 이벤트에는 현재 스캔 상태 전체를 포함)"""
+
+        event = {"type": event_type, "scan_id": scan_id, "timestamp": time.time(), **data}
+        if event_type == "state":
+            event["scan"] = await self.get(scan_id)
+
+        await self.redis.publish(progress_channel(scan_id), json.dumps(event, ensure_ascii=False, default=str))
@@ -0,0 +1,258 @@
+"""
+우선순위/공정성 스케줄러
+- 우선순위 클래스 간에는 가중 라운드로빈 (긴급 작업이 대량 배치 작업에 밀리지 않음)
+- 같은 우선순위 안에서는 테넌트(프로젝트)별 서브 큐를 번갈아 처리
+- 작업이 없으면 주기적으로 확인하지 않고 작업 추가 신호(Redis 리스트)를 기다림
+"""
+import re
+import time
+from typing import Dict, Any, List, Optional
+
+from services.task_queue import ReliableQueue, QueueMessage
+
+
+# 우선순위 클래스별 가중치 (가중치 비율만큼 작업을 가져감)
+PRIORITY_WEIGHTS = {
+    "urgent": 6,
+    "normal": 3,
+    "batch": 1
+}
+DEFAULT_PRIORITY = "normal"
+DEFAULT_TENANT = "default"
+
+# 소비되지 않은 작업 추가 신호의 최대 개수 (워커가 없을 때 무한히 쌓이지 않도록)
+READY_SIGNAL_LIMIT = 1000
+
+
+def weighted_round_robin(weights: Dict[str, int]) -> List[str]:
+    """부드러운 가중 라운드로빈 순서 생성 (예: urgent, normal, urgent, urgent, ...)"""
+
+    current = {name: 0 for name in weights}
+    total = sum(weights.values())
+    sequence = []
+
+    for _ in range(total):
+        for name, weight in weights.items():
+            current[name] += weight
+        selected = max(current, key=current.get)
+        current[selected] -= total
+        sequence.append(selected)
+
+    return sequence
+
+
+def normalize_tenant(tenant: Optional[str]) -> str:
+    """스트림 키에 사용할 수 있도록 테넌트 이름 정리"""
+    cleaned = re.sub(r"[^A-Za-z0-9._-]+", "-", tenant or "").strip("-")
+    return cleaned[:64] or DEFAULT_TENANT
+
+
+class FairScheduler:
+    """기본 스트림을 우선순위/테넌트별 서브 스트림으로 나누어 공정하게 분배"""
+
+    def __init__(
+        self,
+        redis_client,
+        base_stream: str,
+        group: str = "executors",
+        consumer: Optional[str] = None,
+        weights: Optional[Dict[str, int]] = None
+    ):
+        self.redis = redis_client
+        self.base_stream = base_stream
+        self.group = group
+        self.consumer = consumer
+        self.weights = weights or PRIORITY_WEIGHTS
+
+        self._sequence = weighted_round_robin(self.weights)
+        self._position = 0
+        self._tenant_cursor = {priority: 0 for priority in self.weights}
+        self._queues: Dict[str, ReliableQueue] = {}
+
+    @property
+    def visibility_timeout(self) -> float:
+        return self._queue(DEFAULT_PRIORITY, DEFAULT_TENANT).visibility_timeout
+
+    @property
+    def dead_letter_stream(self) -> str:
+        return f"{self.base_stream}:dead"
+
+    def sub_stream(self, priority: str, tenant: str) -> str:
+        return f"{self.base_stream}:{priority}:{tenant}"
+
+    def _tenants_key(self, priority: str) -> str:
+        return f"{self.base_stream}:tenants:{priority}"
+
+    @property
+    def _ready_key(self) -> str:
+        return f"{self.base_stream}:ready"
+
+    def _wait_key(self, priority: str) -> str:
+        return f"{self.base_stream}:wait:{priority}"
+
+    def _queue(self, priority: str, tenant: str) -> ReliableQueue:
+        stream = self.sub_stream(priority, tenant)
+        if stream not in self._queues:
+            self._queues[stream] = ReliableQueue(
+                self.redis, stream=stream, group=self.group, consumer=self.consumer,
+                dead_letter_stream=self.dead_letter_stream
+            )
+        return self._queues[stream]
+
+    async def enqueue(self, payload: Dict[str, Any], priority: str = DEFAULT_PRIORITY, tenant: Optional[str] = None) -> str:
+        """작업 추가"""
+
+        if priority not in self.weights:
+            raise ValueError(f"알 수 없는 우선순위: {priority}")
+
+        tenant = normalize_tenant(tenant)
+        payload = {**payload, "priority": priority, "tenant": tenant, "enqueued_at": time.time()}
+
+        message_id = await self._queue(priority, tenant).enqueue(payload)
+        await self.redis.sadd(self._tenants_key(priority), tenant)
+
+        # 대기 중인 워커 하나를 깨움
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.lpush(self._ready_key, message_id)
+            pipe.ltrim(self._ready_key, 0, READY_SIGNAL_LIMIT - 1)
+            await pipe.execute()
+
+        return message_id
+
+    async def fetch(self, block_ms: int = 5000) -> List[QueueMessage]:
+        """가중 라운드로빈 순서로 다음 작업 하나를 가져옴
+
+        한 바퀴 확인해서 없으면 block_ms 동안 작업 추가 신호를 기다렸다가 다시 확인
+        (신호 하나에 워커 하나만 깨어나므로 서브 스트림 확인 횟수가 시간이 아닌 작업 수에 비례)
+        """
+
+        deadline = time.monotonic() + block_ms / 1000
+
+        while True:
+            for priority in self._priority_order():
+                message = await self._fetch_from_priority(priority)
+                if message:
+                    # 가져간 작업의 신호도 소비 (남은 신호가 빈 확인을 반복시키지 않도록)
+                    await self.redis.lpop(self._ready_key)
+                    await self._record_wait(message)
+                    return [message]
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return []
+
+            # 시간 초과 시 회수할 작업이 있는지는 다음 fetch에서 확인 (timeout 0은 무한 대기이므로 최소 10ms)
+            if not await self.redis.blpop([self._ready_key], timeout=max(remaining, 0.01)):
+                return []
+
+    def _priority_order(self) -> List[str]:
+        """이번 차례의 우선순위를 먼저, 나머지는 가중치 순으로 (빈 클래스는 건너뜀)"""
+
+        first = self._sequence[self._position]
+        self._position = (self._position + 1) % len(self._sequence)
+
+        rest = sorted((p for p in self.weights if p != first), key=lambda p: -self.weights[p])
+        return [first] + rest
+
+    async def _fetch_from_priority(self, priority: str) -> Optional[QueueMessage]:
+        """같은 우선순위의 테넌트들을 순서대로 돌며 작업 하나를 가져옴"""
+
+        members = await self.redis.smembers(self._tenants_key(priority))
+        tenants = sorted(m.decode() if isinstance(m, bytes) else m for m in members)
+        if not tenants:
+            return None
+
+        start = self._tenant_cursor[priority] % len(tenants)
+        for offset in range(len(tenants)):
+            tenant = tenants[(start + offset) % len(tenants)]
+            queue = self._queue(priority, tenant)
+
+            messages = await queue.fetch(count=1, block_ms=None)
+            if messages:
+                # 다음에는 그 다음 테넌트부터 시작
+                self._tenant_cursor[priority] = start + offset + 1
+                return messages[0]
+
+            await self._release_idle_tenant(priority, tenant, queue)
+
+        return None
+
+    async def _release_idle_tenant(self, priority: str, tenant: str, queue: ReliableQueue):
+        """비어 있는 테넌트를 순회 대상에서 제거 (그 사이 추가된 작업이 있으면 다시 등록)"""
+
+        depth = await queue.depth()
+        if depth["queued"] or depth["in_progress"]:
+            return
+
+        await self.redis.srem(self._tenants_key(priority), tenant)
+        if await self.redis.xlen(queue.stream):
+            await self.redis.sadd(self._tenants_key(priority), tenant)
+
+    async def _record_wait(self, message: QueueMessage):
+        """첫 배달 시점의 대기 시간을 우선순위별로 누적"""
+
+        enqueued_at = message.payload.get("enqueued_at")
+        if message.attempts > 1 or enqueued_at is None:
+            return
+
+        wait = max(0.0, time.time() - enqueued_at)
+        key = self._wait_key(message.payload.get("priority", DEFAULT_PRIORITY))
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hincrby(key, "count", 1)
+            pipe.hincrbyfloat(key, "total_seconds", wait)
+            pipe.hset(key, "last_seconds", wait)
+            await pipe.execute()
+
+        current_max = await self.redis.hget(key, "max_seconds")
+        if current_max is None or float(current_max) < wait:
+            await self.redis.hset(key, "max_seconds", wait)
+
+    async def active_streams(self) -> List[str]:
+        """현재 작업이 남아 있는 서브 스트림 목록"""
+
+        streams = []
+        for priority in self.weights:
+            for member in await self.redis.smembers(self._tenants_key(priority)):
+                tenant = member.decode() if isinstance(member, bytes) else member
+                streams.append(self.sub_stream(priority, tenant))
+        return streams
+
+    async def ack(self, message: QueueMessage):
+        await self._queue_for(message).ack(message)
+
+    async def touch(self, message: QueueMessage):
+        await self._queue_for(message).touch(message)
+
+    def _queue_for(self, message: QueueMessage) -> ReliableQueue:
+        priority = message.payload.get("priority", DEFAULT_PRIORITY)
+        return self._queue(priority, message.payload.get("tenant", DEFAULT_TENANT))
+
+    async def stats(self) -> Dict[str, Any]:
+        """우선순위별 대기 중 작업 수와 대기 시간 통계"""
+
+        stats = {"dead_letter": await self.redis.xlen(self.dead_letter_stream)}
+        for priority in self.weights:
+            members = await self.redis.smembers(self._tenants_key(priority))
+            queued = in_progress = 0
+            for member in members:
+                tenant = member.decode() if isinstance(member, bytes) else member
+                depth = await self._queue(priority, tenant).depth()
+                queued += depth["queued"]
+                in_progress += depth["in_progress"]
+
+            wait = await self.redis.hgetall(self._wait_key(priority))
+            wait = {k.decode(): float(v) for k, v in wait.items()}
+            count = int(wait.get("count", 0))
+
+            stats[priority] = {
+                "queued": queued,
+                "in_progress": in_progress,
+                "tenants": len(members),
+                "dispatched": count,
+                "avg_wait_seconds": round(wait["total_seconds"] / count, 3) if count else 0.0,
+                "max_wait_seconds": round(wait.get("max_seconds", 0.0), 3),
+                "last_wait_seconds": round(wait.get("last_seconds", 0.0), 3)
+            }
+
+        return stats
@@ -0,0 +1,197 @@
+"""
+Redis Streams 기반 신뢰성 작업 큐
+- 컨슈머 그룹으로 작업을 가져오고 처리 완료 후 명시적으로 ack
+- 가시성 타임아웃이 지난 미완료 작업은 다른 워커가 회수
+- 최대 시도 횟수를 넘긴 작업은 dead-letter 스트림으로 이동
+"""
+import json
+import os
+import socket
+import time
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional
+
+from redis.exceptions import ResponseError
+
+
+# 실행자 유형별 작업 큐 (manager_service와 executor_service가 공유)
+EXECUTOR_QUEUES = {
+    "static": "static_analysis_queue",
+    "dynamic": "dynamic_testing_queue"
+}
+
+# 같은 테스트를 여러 AI가 수행하도록 제공업체별 스트림으로 작업을 복제
+EXECUTOR_PROVIDERS = ["openai", "claude", "gemini"]
+
+
+def executor_stream(executor_type: str, ai_provider: str) -> str:
+    """실행자 유형/제공업체별 스트림 이름"""
+    return f"{EXECUTOR_QUEUES[executor_type]}:{ai_provider}"
+
+
+@dataclass
+class QueueMessage:
+    """큐에서 가져온 작업"""
+    stream: str
+    message_id: str
+    payload: Dict[str, Any]
+    attempts: int = 1
+
+
+class ReliableQueue:
+    """ack/가시성 타임아웃/dead-letter를 지원하는 Redis Streams 작업 큐"""
+
+    def __init__(
+        self,
+        redis_client,
+        stream: str,
+        group: str = "workers",
+        consumer: Optional[str] = None,
+        visibility_timeout: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        dead_letter_stream: Optional[str] = None
+    ):
+        self.redis = redis_client
+        self.stream = stream
+        self.group = group
+        self.consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+        self.visibility_timeout = visibility_timeout or float(os.getenv("TASK_VISIBILITY_TIMEOUT", "120"))
+        self.max_attempts = max_attempts or int(os.getenv("TASK_MAX_ATTEMPTS", "3"))
+        self.dead_letter_stream = dead_letter_stream or f"{stream}:dead"
+        self._group_ready = False
+
+    @property
+    def _visibility_ms(self) -> int:
+        return int(self.visibility_timeout * 1000)
+
+    async def ensure_group(self):
+        """컨슈머 그룹 생성 (그룹 생성 전에 들어온 작업도 받도록 0부터 시작)"""
+
+        if self._group_ready:
+            return
+
+        try:
+            await self.redis.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+        self._group_ready = True
+
+    async def enqueue(self, payload: Dict[str, Any]) -> str:
+        """작업 추가"""
+
+        await self.ensure_group()
+        message_id = await self.redis.xadd(self.stream, {"payload": json.dumps(payload)})
+        return _decode(message_id)
+
+    async def fetch(self, count: int = 1, block_ms: Optional[int] = 5000) -> List[QueueMessage]:
+        """작업 가져오기 - 회수할 작업이 있으면 먼저 회수하고, 없으면 새 작업을 대기 (block_ms=None이면 대기 없음)"""
+
+        await self.ensure_group()
+
+        reclaimed = await self.reclaim(count)
+        if reclaimed:
+            return reclaimed
+
+        response = await self.redis.xreadgroup(
+            self.group, self.consumer, {self.stream: ">"}, count=count, block=block_ms
+        )
+
+        messages = []
+        for _, entries in response or []:
+            for message_id, fields in entries:
+                messages.append(self._to_message(message_id, fields, attempts=1))
+
+        return messages
+
+    async def ack(self, message: QueueMessage):
+        """처리 완료 - 대기 목록과 스트림에서 제거"""
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.xack(self.stream, self.group, message.message_id)
+            pipe.xdel(self.stream, message.message_id)
+            await pipe.execute()
+
+    async def touch(self, message: QueueMessage):
+        """처리 중임을 알려 가시성 타임아웃 연장 (시도 횟수는 증가하지 않음)"""
+
+        await self.redis.xclaim(
+            self.stream, self.group, self.consumer,
+            min_idle_time=0, message_ids=[message.message_id], justid=True
+        )
+
+    async def reclaim(self, count: int = 10) -> List[QueueMessage]:
+        """가시성 타임아웃이 지난 작업 회수, 최대 시도 횟수 초과 시 dead-letter 처리"""
+
+        pending = await self.redis.xpending_range(
+            self.stream, self.group, min="-", max="+", count=count, idle=self._visibility_ms
+        )
+
+        reclaimed = []
+        for entry in pending:
+            message_id = _decode(entry["message_id"])
+            attempts = entry["times_delivered"]
+
+            if attempts >= self.max_attempts:
+                await self.dead_letter(message_id, attempts, "최대 시도 횟수 초과")
+                continue
+
+            # 그 사이 다른 워커가 회수했다면 min_idle_time 조건으로 빈 결과가 반환됨
+            claimed = await self.redis.xclaim(
+                self.stream, self.group, self.consumer,
+                min_idle_time=self._visibility_ms, message_ids=[message_id]
+            )
+            for claimed_id, fields in claimed:
+                if fields:
+                    reclaimed.append(self._to_message(claimed_id, fields, attempts=attempts + 1))
+
+        return reclaimed
+
+    async def dead_letter(self, message_id: str, attempts: int, reason: str):
+        """작업을 dead-letter 스트림으로 이동"""
+
+        entries = await self.redis.xrange(self.stream, min=message_id, max=message_id)
+        payload = entries[0][1].get(b"payload", b"{}") if entries else b"{}"
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.xadd(self.dead_letter_stream, {
+                "payload": payload,
+                "source_stream": self.stream,
+                "source_id": message_id,
+                "attempts": attempts,
+                "reason": reason,
+                "failed_at": time.time()
+            })
+            pipe.xack(self.stream, self.group, message_id)
+            pipe.xdel(self.stream, message_id)
+            await pipe.execute()
+
+    async def depth(self) -> Dict[str, int]:
+        """큐 상태 (대기 중인 작업 수, 처리 중인 작업 수, dead-letter 수)
+
+        XLEN은 전달되었지만 ack되지 않은 메시지도 포함하므로 처리 중인 작업을 빼서 대기 수를 계산
+        """
+
+        await self.ensure_group()
+
+        pending = await self.redis.xpending(self.stream, self.group)
+        length = await self.redis.xlen(self.stream)
+
+        return {
+            "queued": max(0, length - pending["pending"]),
+            "in_progress": pending["pending"],
+            "dead_letter": await self.redis.xlen(self.dead_letter_stream)
+        }
+
+    def _to_message(self, message_id, fields: Dict[bytes, bytes], attempts: int) -> QueueMessage:
+        return QueueMessage(
+            stream=self.stream,
+            message_id=_decode(message_id),
+            payload=json.loads(fields[b"payload"]),
+            attempts=attempts
+        )
+
+
+def _decode(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
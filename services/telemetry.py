@@ -0,0 +1,284 @@
+"""
+큐 텔레메트리 및 오토스케일링 신호
+- 큐별 도착/완료 수를 분 단위 버킷으로 집계
+- 워커별 처리 중 작업 수를 하트비트로 보고
+- 큐 깊이, 가장 오래된 메시지 나이, 권장 레플리카 수 계산
+"""
+import json
+import math
+import os
+import time
+from typing import Dict, Any, List, Optional
+
+from services.task_queue import EXECUTOR_PROVIDERS, executor_stream
+
+
+EXECUTION_RESULTS_QUEUE = "execution_results"
+ANALYSIS_QUEUE = "analysis_queue"
+ANALYZER_PROVIDERS = ["claude", "gemini", "openai"]
+
+
+def analysis_stream(analyzer: str) -> str:
+    """분석가별 실행 결과 스트림 (모든 분석가가 같은 결과와 종료 표시를 받음)"""
+    return f"{ANALYSIS_QUEUE}:{analyzer}"
+
+
+# 서비스 유형별 큐와 docker-compose 서비스 매핑
+SERVICE_TYPES = {
+    "static_executor": {
+        "queues": {executor_stream("static", p): [f"static-executor-{p}"] for p in EXECUTOR_PROVIDERS},
+        "default_service_seconds": 60
+    },
+    "dynamic_executor": {
+        "queues": {executor_stream("dynamic", p): [f"dynamic-executor-{p}"] for p in EXECUTOR_PROVIDERS},
+        "default_service_seconds": 600
+    },
+    "aggregator": {
+        "queues": {EXECUTION_RESULTS_QUEUE: ["result-aggregator"]},
+        "default_service_seconds": 1
+    },
+    "analyzer": {
+        "queues": {analysis_stream(p): [f"analyzer-{p}"] for p in ANALYZER_PROVIDERS},
+        "default_service_seconds": 20
+    }
+}
+
+BUCKET_SECONDS = 60
+BUCKET_TTL = 3600
+WORKER_STALE_SECONDS = 60
+
+
+class QueueTelemetry:
+    """큐 하나에 대한 텔레메트리 기록/조회"""
+
+    def __init__(self, redis_client, queue_name: str):
+        self.redis = redis_client
+        self.queue_name = queue_name
+
+    def _bucket_key(self, metric: str, bucket: int) -> str:
+        return f"telemetry:{self.queue_name}:{metric}:{bucket}"
+
+    @property
+    def _workers_key(self) -> str:
+        return f"telemetry:{self.queue_name}:workers"
+
+    async def _incr(self, values: Dict[str, float]):
+        bucket = int(time.time() // BUCKET_SECONDS)
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for metric, value in values.items():
+                key = self._bucket_key(metric, bucket)
+                pipe.incrbyfloat(key, value)
+                pipe.expire(key, BUCKET_TTL)
+            await pipe.execute()
+
+    async def record_arrival(self, count: int = 1):
+        """작업 도착 기록"""
+        await self._incr({"arrivals": count})
+
+    async def record_completion(self, duration_seconds: float):
+        """작업 완료 및 처리 시간 기록"""
+        await self._incr({"completions": 1, "service_seconds": duration_seconds})
+
+    async def worker_heartbeat(self, worker_id: str, in_flight: int, concurrency: int):
+        """워커의 현재 처리 중 작업 수 보고"""
+
+        await self.redis.hset(self._workers_key, worker_id, json.dumps({
+            "in_flight": in_flight,
+            "concurrency": concurrency,
+            "updated_at": time.time()
+        }))
+
+    async def remove_worker(self, worker_id: str):
+        """종료된 워커 제거"""
+        await self.redis.hdel(self._workers_key, worker_id)
+
+    async def _window_totals(self, window_seconds: int) -> Dict[str, float]:
+        now = time.time()
+        current = int(now // BUCKET_SECONDS)
+        buckets = [current - i for i in range(math.ceil(window_seconds / BUCKET_SECONDS))]
+
+        totals = {}
+        for metric in ("arrivals", "completions", "service_seconds"):
+            values = await self.redis.mget([self._bucket_key(metric, b) for b in buckets])
+            totals[metric] = sum(float(v) for v in values if v is not None)
+
+        # 현재 버킷은 아직 진행 중이므로 실제 경과 시간만 반영
+        totals["elapsed"] = (len(buckets) - 1) * BUCKET_SECONDS + (now - current * BUCKET_SECONDS)
+        return totals
+
+    async def _workers(self) -> Dict[str, Dict[str, Any]]:
+        workers = {}
+        stale = []
+        now = time.time()
+
+        for worker_id, raw in (await self.redis.hgetall(self._workers_key)).items():
+            worker_id = worker_id.decode() if isinstance(worker_id, bytes) else worker_id
+            info = json.loads(raw)
+            if now - info["updated_at"] > WORKER_STALE_SECONDS:
+                stale.append(worker_id)
+            else:
+                workers[worker_id] = info
+
+        if stale:
+            await self.redis.hdel(self._workers_key, *stale)
+
+        return workers
+
+    async def _backlog(self, streams: List[str]) -> Dict[str, Any]:
+        """스트림 목록의 대기 작업 수와 가장 오래된 미완료 메시지 나이
+
+        ack 시 삭제되므로 남은 메시지 = 미완료 작업이며, 소비자 그룹에 전달되어 처리 중인 메시지는 대기 수에서 제외
+        """
+
+        depth = 0
+        oldest_ms: Optional[int] = None
+
+        for stream in streams:
+            length = await self.redis.xlen(stream)
+            if not length:
+                continue
+
+            in_progress = sum(group["pending"] for group in await self.redis.xinfo_groups(stream))
+            depth += max(0, length - in_progress)
+            first = await self.redis.xrange(stream, count=1)
+            if first:
+                message_id = first[0][0]
+                message_id = message_id.decode() if isinstance(message_id, bytes) else message_id
+                timestamp_ms = int(message_id.split("-")[0])
+                oldest_ms = timestamp_ms if oldest_ms is None else min(oldest_ms, timestamp_ms)
+
+        return {
+            "depth": depth,
+            "oldest_age_seconds": round(max(0.0, time.time() - oldest_ms / 1000), 1) if oldest_ms else 0.0
+        }
+
+    async def snapshot(self, streams: List[str], window_seconds: int = 300) -> Dict[str, Any]:
+        """큐 상태 스냅샷"""
+
+        totals = await self._window_totals(window_seconds)
+        workers = await self._workers()
+        backlog = await self._backlog(streams)
+
+        elapsed = max(totals["elapsed"], 1.0)
+        completions = totals["completions"]
+
+        return {
+            "queue": self.queue_name,
+            **backlog,
+            "arrival_rate_per_min": round(totals["arrivals"] / elapsed * 60, 3),
+            "completion_rate_per_min": round(completions / elapsed * 60, 3),
+            "avg_service_seconds": round(totals["service_seconds"] / completions, 1) if completions else None,
+            "workers": {worker_id: info["in_flight"] for worker_id, info in workers.items()},
+            "in_flight": sum(info["in_flight"] for info in workers.values()),
+            "worker_concurrency": max((info["concurrency"] for info in workers.values()), default=None)
+        }
+
+
+class RuntimeStats:
+    """테스트 유형별 실행 시간 통계 (관리자 AI의 계획 수립에 사용)
+
+    분할 실행된 샤드는 전체 테스트 기준 시간으로 환산하여 기록
+    """
+
+    TYPES_KEY = "runtime_stats:types"
+
+    def __init__(self, redis_client, alpha: float = 0.3):
+        self.redis = redis_client
+        self.alpha = alpha  # 지수 이동 평균 가중치 (최근 실행을 더 반영)
+
+    @staticmethod
+    def _key(test_type: str) -> str:
+        return f"runtime_stats:{test_type}"
+
+    async def record(self, test_type: str, seconds: float):
+        """테스트 실행 시간 기록 (동시 기록 시 평균이 약간 어긋날 수 있으나 추정용이므로 허용)"""
+
+        current = await self.redis.hget(self._key(test_type), "avg_seconds")
+        average = seconds if current is None else (1 - self.alpha) * float(current) + self.alpha * seconds
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.sadd(self.TYPES_KEY, test_type)
+            pipe.hincrby(self._key(test_type), "count", 1)
+            pipe.hset(self._key(test_type), "avg_seconds", average)
+            pipe.hset(self._key(test_type), "last_seconds", seconds)
+            await pipe.execute()
+
+    async def load(self) -> Dict[str, Dict[str, Any]]:
+        """기록된 모든 테스트 유형의 통계"""
+
+        stats = {}
+        for test_type in await self.redis.smembers(self.TYPES_KEY):
+            test_type = test_type.decode() if isinstance(test_type, bytes) else test_type
+            raw = await self.redis.hgetall(self._key(test_type))
+            values = {(k.decode() if isinstance(k, bytes) else k): float(v) for k, v in raw.items()}
+            if values:
+                stats[test_type] = {
+                    "count": int(values.get("count", 0)),
+                    "avg_seconds": round(values.get("avg_seconds", 0.0), 1),
+                    "last_seconds": round(values.get("last_seconds", 0.0), 1)
+                }
+        return stats
+
+
+def recommend_replicas(
+    snapshot: Dict[str, Any],
+    default_service_seconds: float,
+    default_concurrency: int = 4,
+    target_drain_seconds: Optional[float] = None,
+    min_replicas: Optional[int] = None,
+    max_replicas: Optional[int] = None
+) -> int:
+    """큐 상태로부터 필요한 레플리카 수 계산
+
+    - 유입 처리에 필요한 워커: 도착률 x 평균 처리 시간 / 워커당 동시 실행 수 (Little's law)
+    - 밀린 작업 해소에 필요한 워커: 대기 작업 x 평균 처리 시간 / (동시 실행 수 x 목표 해소 시간)
+    """
+
+    target_drain_seconds = target_drain_seconds or float(os.getenv("AUTOSCALE_TARGET_DRAIN_SECONDS", "600"))
+    min_replicas = min_replicas if min_replicas is not None else int(os.getenv("AUTOSCALE_MIN_REPLICAS", "1"))
+    max_replicas = max_replicas if max_replicas is not None else int(os.getenv("AUTOSCALE_MAX_REPLICAS", "5"))
+
+    service_seconds = snapshot["avg_service_seconds"] or default_service_seconds
+    concurrency = snapshot["worker_concurrency"] or default_concurrency
+    arrival_rate = snapshot["arrival_rate_per_min"] / 60
+
+    steady_state = arrival_rate * service_seconds / concurrency
+    backlog = snapshot["depth"] * service_seconds / (concurrency * target_drain_seconds)
+
+    return max(min_replicas, min(max_replicas, math.ceil(steady_state + backlog)))
+
+
+async def collect_telemetry(redis_client, stream_resolver, window_seconds: int = 300) -> Dict[str, Any]:
+    """모든 서비스 유형의 큐 텔레메트리와 권장 레플리카 수 수집
+
+    stream_resolver(queue_name)는 해당 큐에 속한 실제 스트림 목록을 반환하는 코루틴
+    """
+
+    report = {}
+
+    for service_type, config in SERVICE_TYPES.items():
+        queues = {}
+        services = {}
+
+        for queue_name, compose_services in config["queues"].items():
+            streams = await stream_resolver(queue_name)
+            snapshot = await QueueTelemetry(redis_client, queue_name).snapshot(streams, window_seconds)
+            snapshot["recommended_replicas"] = recommend_replicas(snapshot, config["default_service_seconds"])
+            queues[queue_name] = snapshot
+
+            # 큐 하나를 여러 서비스가 나눠 받으면 레플리카를 서비스별로 나눔
+            per_service = math.ceil(snapshot["recommended_replicas"] / len(compose_services))
+            for service in compose_services:
+                services[service] = per_service
+
+        report[service_type] = {
+            "depth": sum(q["depth"] for q in queues.values()),
+            "in_flight": sum(q["in_flight"] for q in queues.values()),
+            "oldest_age_seconds": max((q["oldest_age_seconds"] for q in queues.values()), default=0.0),
+            "recommended_replicas": sum(services.values()),
+            "services": services,
+            "queues": queues
+        }
+
+    return report
@@ -0,0 +1,24 @@
+"""
+오토스케일러 계획 테스트 (docker compose 호출 없이 관측값만 주입)
+"""
+from services.autoscaler import ComposeAutoscaler
+
+
+def test_plan_does_not_scale_services_with_unknown_replicas():
+    autoscaler = ComposeAutoscaler()
+
+    assert autoscaler.plan({"dynamic-executor-claude": 1, "analyzer-claude": 2}) == {}
+
+
+def test_plan_compares_against_observed_replicas():
+    autoscaler = ComposeAutoscaler()
+    autoscaler.scale_down_after = 2
+    autoscaler.current = {"dynamic-executor-claude": 1, "analyzer-claude": 3, "result-aggregator": 1}
+
+    # 이미 실행 중인 수와 같으면 변경 없음, 늘어나면 바로 확장
+    assert autoscaler.plan({"dynamic-executor-claude": 1, "analyzer-claude": 3, "result-aggregator": 2}) == {"result-aggregator": 2}
+
+    # 축소는 연속으로 낮게 나올 때만
+    autoscaler.current["result-aggregator"] = 2
+    assert autoscaler.plan({"analyzer-claude": 1}) == {}
+    assert autoscaler.plan({"analyzer-claude": 1}) == {"analyzer-claude": 1}
@@ -0,0 +1,97 @@
+"""
+스캔 종료 저장 테스트 (fakeredis 레지스트리 + 임시 SQLite 데이터베이스)
+"""
+import fakeredis.aioredis
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from services.scan_registry import ScanRegistry
+from web import repository
+from web.models import Base, Finding, FindingRollup, FindingTerm, SecurityTest
+from web.search import create_fulltext_index
+
+
+FINDINGS = {
+    "f1": {"test_type": "sql_injection", "type": "SQL Injection", "severity": "High", "parameter": "id"},
+    "f2": {"test_type": "xss_testing", "type": "Reflected XSS", "severity": "Medium", "parameter": "q"},
+    "f3": {"test_type": "xss_testing", "type": "Reflected XSS", "severity": "Medium", "parameter": "search"},
+}
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'scans.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(create_fulltext_index)
+
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    await engine.dispose()
+
+
+@pytest.fixture
+def registry():
+    return ScanRegistry(fakeredis.aioredis.FakeRedis())
+
+
+async def create_scan(session_factory, scan_id="S1"):
+    async with session_factory() as db:
+        test = SecurityTest(
+            target_url="http://target.example", target_type="web_application",
+            test_types="sql_injection,xss_testing", test_id=scan_id, status="running"
+        )
+        db.add(test)
+        repository.add_test_runs(db, test, ["sql_injection", "xss_testing"])
+        await db.commit()
+
+
+async def count(session_factory, statement):
+    async with session_factory() as db:
+        return await db.scalar(statement)
+
+
+@pytest.mark.asyncio
+async def test_final_state_saves_findings_missed_by_live_events(session_factory, registry):
+    await create_scan(session_factory)
+    await registry.record_findings("S1", FINDINGS, "dynamic:claude:sql_injection#0")
+
+    # 실시간 이벤트로는 하나만 저장됨 (나머지는 대시보드가 꺼져 있던 동안 발행)
+    async with session_factory() as db:
+        assert await repository.save_finding(db, {"scan_id": "S1", "fingerprint": "f1", "finding": FINDINGS["f1"]})
+
+    scan = {"scan_id": "S1", "status": "analyzed", "progress": 100, "missing_results": 0}
+    async with session_factory() as db:
+        assert await repository.save_final_state(db, scan, registry)
+
+    assert await count(session_factory, select(func.count()).select_from(Finding)) == 3
+    assert await count(session_factory, select(func.sum(FindingRollup.findings))) == 3
+    assert await count(session_factory, select(func.count(func.distinct(FindingTerm.finding_id)))) == 3
+
+    async with session_factory() as db:
+        test = (await db.scalars(select(SecurityTest).where(SecurityTest.test_id == "S1"))).one()
+    assert test.status == "completed"
+    assert test.results["findings"] == 3
+    assert test.results["severity_counts"]["high"] == 1
+    assert test.results["severity_counts"]["medium"] == 2
+    assert test.results["test_runs"] == {"sql_injection": "completed", "xss_testing": "completed"}
+
+    # 같은 종료 이벤트를 다시 받아도 중복 저장/집계 없음
+    async with session_factory() as db:
+        assert not await repository.save_final_state(db, scan, registry)
+    assert await count(session_factory, select(func.count()).select_from(Finding)) == 3
+    assert await count(session_factory, select(func.sum(FindingRollup.findings))) == 3
+
+
+@pytest.mark.asyncio
+async def test_registry_keeps_each_finding_once(registry):
+    await registry.record_findings("S1", {"f1": FINDINGS["f1"]}, "dynamic:claude:sql_injection#0")
+    await registry.record_findings("S1", {"f1": FINDINGS["f1"], "f2": FINDINGS["f2"]}, "dynamic:openai:xss_testing#0")
+
+    findings = await registry.findings("S1")
+
+    assert set(findings) == {"f1", "f2"}
+    assert findings["f1"]["source"] == "dynamic:claude:sql_injection#0"
+    assert findings["f2"]["finding"] == FINDINGS["f2"]
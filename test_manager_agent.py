@@ -0,0 +1,126 @@
+"""
+관리자 AI 실행 패키지 테스트 (LLM 응답은 미리 준비한 문자열 사용)
+"""
+import json
+
+import pytest
+
+from agents.dynamic_executor import DynamicTestExecutor
+from agents.manager_agent import ManagerAgent
+from tools.fingerprint import FingerprintStore
+
+
+TARGET_URL = "http://127.0.0.1:9"
+
+CUSTOM_CODE = "import json\nprint(json.dumps({'vulnerabilities': [{'type': 'Missing Header', 'severity': 'Low'}]}))\n"
+
+
+class ScriptedManager(ManagerAgent):
+    """호출 순서대로 준비한 응답을 돌려주는 관리자 AI"""
+
+    def __init__(self, responses):
+        super().__init__(
+            name="관리자 AI", model="manager", primary_provider="test",
+            fallback_providers=[], role_description="테스트"
+        )
+        self.responses = list(responses)
+
+    async def call_llm(self, messages, **kwargs):
+        return self.responses.pop(0)
+
+
+def make_executor(tmp_path):
+    executor = DynamicTestExecutor(
+        name="동적 실행자", model="executor", primary_provider="test",
+        fallback_providers=[], role_description="테스트"
+    )
+    executor._fingerprint_store = FingerprintStore(str(tmp_path / "fingerprints.db"))
+    return executor
+
+
+@pytest.mark.asyncio
+async def test_custom_test_type_runs_through_executor(tmp_path):
+    manager = ScriptedManager([
+        json.dumps({"header_check": {"execution_code": CUSTOM_CODE, "shell_commands": [], "expected_output": "JSON"}})
+    ])
+
+    plan = await manager.process({"target_info": {"target_url": TARGET_URL}, "test_scope": ["header_check"]})
+
+    assert plan["status"] == "success"
+    assert plan["skipped_tests"] == []
+    tasks = plan["schedule"]["tasks"]
+    assert [task["test_type"] for task in tasks] == ["header_check"]
+    assert tasks[0]["execution_package"]["execution_code"] == CUSTOM_CODE
+
+    result = await make_executor(tmp_path).process({
+        "type": "dynamic_testing",
+        "target_url": TARGET_URL,
+        "execution_package": tasks[0]["execution_package"]
+    })
+
+    assert result["status"] == "success"
+    execution = result["execution_result"]
+    assert execution["status"] == "completed"
+    assert execution["python_result"]["result"]["vulnerabilities"][0]["type"] == "Missing Header"
+
+
+@pytest.mark.asyncio
+async def test_custom_test_type_without_code_is_skipped():
+    manager = ScriptedManager([
+        "{}",
+        json.dumps({
+            "header_check": {"execution_code": CUSTOM_CODE},
+            "cookie_audit": {"execution_code": "", "shell_commands": []}
+        })
+    ])
+
+    plan = await manager.process({
+        "target_info": {"target_url": TARGET_URL},
+        "test_scope": ["ssl_tls_test", "header_check", "cookie_audit"]
+    })
+
+    assert plan["status"] == "success"
+    assert [item["test_type"] for item in plan["skipped_tests"]] == ["cookie_audit"]
+    assert "cookie_audit" not in plan["test_scope"]
+    assert "cookie_audit" not in plan["schedule"]["order"]
+
+    # 큐에 넣는 작업에는 모두 실행 패키지가 있음
+    tasks = plan["schedule"]["tasks"]
+    assert sorted(task["test_type"] for task in tasks) == ["header_check", "ssl_tls_test"]
+    assert all(task["execution_package"] for task in tasks)
+
+
+@pytest.mark.asyncio
+async def test_unparseable_custom_code_response_skips_custom_tests():
+    manager = ScriptedManager(["코드를 생성할 수 없습니다"])
+
+    plan = await manager.process({"target_info": {"target_url": TARGET_URL}, "test_scope": ["header_check"]})
+
+    assert plan["status"] == "success"
+    assert plan["skipped_tests"] == [{"test_type": "header_check", "reason": "실행 코드를 생성하지 못했습니다"}]
+    assert plan["schedule"]["tasks"] == []
+
+
+@pytest.mark.asyncio
+async def test_custom_endpoints_survive_sharding():
+    endpoints = ["/portal/login", "/api/auth", "/staff/signin", "/sso", "/legacy/login", "/partner/login"]
+    manager = ScriptedManager([json.dumps({"brute_force": {"endpoints": endpoints}})])
+
+    plan = await manager.process({"target_info": {"target_url": TARGET_URL}, "test_scope": ["brute_force"]})
+
+    tasks = plan["schedule"]["tasks"]
+    assert len(tasks) > 1
+    shards = [task["execution_package"]["parameters"]["endpoints"] for task in tasks]
+    assert sorted(path for shard in shards for path in shard) == sorted(endpoints)
+    assert [task["shard"]["values"] for task in tasks] == shards
+
+
+@pytest.mark.asyncio
+async def test_fewer_custom_values_than_planned_shards():
+    manager = ScriptedManager([json.dumps({"sql_injection": {"techniques": ["B", "T"]}})])
+
+    plan = await manager.process({"target_info": {"target_url": TARGET_URL}, "test_scope": ["sql_injection"]})
+
+    tasks = plan["schedule"]["tasks"]
+    assert [task["execution_package"]["parameters"]["techniques"] for task in tasks] == [["B"], ["T"]]
+    assert all(task["shard"]["count"] == 2 for task in tasks)
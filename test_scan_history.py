@@ -0,0 +1,128 @@
+"""
+스캔 이력 커서 페이지네이션 테스트 (임시 SQLite 데이터베이스 사용)
+"""
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from web import repository
+from web.app import app
+from web.database import get_db
+from web.models import Base, SecurityTest
+
+
+CREATED_AT = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'scans.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    await engine.dispose()
+
+
+async def add_scans(session_factory, count, created_at=None):
+    async with session_factory() as db:
+        scans = [
+            SecurityTest(
+                target_url=f"http://target-{index}.example",
+                target_type="web_application",
+                test_types="sql_injection",
+                created_at=created_at
+            )
+            for index in range(count)
+        ]
+        db.add_all(scans)
+        await db.commit()
+        return [scan.id for scan in scans]
+
+
+async def page_ids(session_factory, limit):
+    ids, cursors, cursor = [], set(), None
+
+    while True:
+        async with session_factory() as db:
+            page = await repository.list_scans(db, cursor=cursor, limit=limit)
+        ids.extend(scan["id"] for scan in page["scans"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            return ids
+        # 같은 커서가 다시 나오면 페이지가 반복되는 것
+        assert cursor not in cursors
+        cursors.add(cursor)
+
+
+@pytest.mark.asyncio
+async def test_pages_rows_with_identical_created_at(session_factory):
+    older = await add_scans(session_factory, 3, created_at=CREATED_AT - timedelta(hours=1))
+    same = await add_scans(session_factory, 20, created_at=CREATED_AT)
+
+    ids = await page_ids(session_factory, limit=4)
+
+    assert len(ids) == len(set(ids))
+    assert ids == sorted(same, reverse=True) + sorted(older, reverse=True)
+
+
+@pytest.mark.asyncio
+async def test_pages_rows_created_within_one_second(session_factory):
+    # SQLite의 now()는 초 단위이므로 같은 초에 생성된 행도 누락/중복 없이 넘겨야 함
+    created = []
+    for _ in range(4):
+        created.extend(await add_scans(session_factory, 3))
+
+    ids = await page_ids(session_factory, limit=2)
+
+    assert len(ids) == len(set(ids))
+    assert sorted(ids) == sorted(created)
+
+
+@pytest.mark.asyncio
+async def test_scan_list_api_pages_and_etag(session_factory):
+    await add_scans(session_factory, 7, created_at=CREATED_AT)
+
+    async def override_get_db():
+        async with session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            ids, params = [], {"limit": 3}
+            while True:
+                response = await client.get("/api/scans", params=params)
+                assert response.status_code == 200
+                page = response.json()
+                ids.extend(scan["id"] for scan in page["scans"])
+                if not page["next_cursor"]:
+                    break
+                assert page["next_cursor"] != params.get("cursor")
+                params["cursor"] = page["next_cursor"]
+
+            assert ids == list(range(7, 0, -1))
+
+            first = await client.get("/api/scans", params={"limit": 3})
+            etag = first.headers["ETag"]
+
+            cached = await client.get("/api/scans", params={"limit": 3}, headers={"If-None-Match": etag})
+            assert cached.status_code == 304
+            assert cached.content == b""
+            assert cached.headers["ETag"] == etag
+
+            # 새 스캔이 추가되면 첫 페이지 내용과 ETag가 바뀜
+            await add_scans(session_factory, 1, created_at=CREATED_AT)
+            changed = await client.get("/api/scans", params={"limit": 3}, headers={"If-None-Match": etag})
+            assert changed.status_code == 200
+            assert changed.headers["ETag"] != etag
+            assert changed.json()["scans"][0]["id"] == 8
+
+            invalid = await client.get("/api/scans", params={"cursor": "not-a-cursor"})
+            assert invalid.status_code == 400
+    finally:
+        app.dependency_overrides.pop(get_db, None)
@@ -0,0 +1,77 @@
+"""
+공정성 스케줄러 테스트 (fakeredis 사용, Redis 서버 불필요)
+"""
+import asyncio
+import time
+
+import fakeredis.aioredis
+import pytest
+
+from services.scheduler import FairScheduler
+
+
+class CountingRedis(fakeredis.aioredis.FakeRedis):
+    """서브 스트림 읽기 횟수를 세는 fakeredis"""
+
+    xreadgroup_calls = 0
+
+    async def xreadgroup(self, *args, **kwargs):
+        self.xreadgroup_calls += 1
+        return await super().xreadgroup(*args, **kwargs)
+
+
+@pytest.fixture
+def redis_client():
+    return CountingRedis()
+
+
+def make_scheduler(redis_client, consumer):
+    return FairScheduler(redis_client, base_stream="test_queue", consumer=consumer)
+
+
+@pytest.mark.asyncio
+async def test_idle_fetch_does_not_poll_tenant_streams(redis_client):
+    producer = make_scheduler(redis_client, "worker-1")
+    for index in range(10):
+        await producer.enqueue({"index": index}, tenant=f"tenant-{index}")
+    # 모든 테넌트에 처리 중인 작업만 남김 (대기 작업은 없지만 순회 대상에는 남아 있음)
+    for _ in range(10):
+        assert await producer.fetch(block_ms=10)
+
+    idle = make_scheduler(redis_client, "worker-2")
+    redis_client.xreadgroup_calls = 0
+    started = time.monotonic()
+
+    assert await idle.fetch(block_ms=1000) == []
+
+    assert time.monotonic() - started >= 0.9
+    # 한 바퀴만 확인하고 나머지 시간은 작업 추가 신호를 기다림
+    assert redis_client.xreadgroup_calls == 10
+
+
+@pytest.mark.asyncio
+async def test_waiting_fetch_wakes_up_on_enqueue(redis_client):
+    worker = make_scheduler(redis_client, "worker-1")
+    await redis_client.delete("test_queue:ready")
+
+    started = time.monotonic()
+    fetch = asyncio.create_task(worker.fetch(block_ms=5000))
+    await asyncio.sleep(0.2)
+    await make_scheduler(redis_client, "producer").enqueue({"type": "dynamic_testing"}, tenant="acme")
+
+    messages = await asyncio.wait_for(fetch, timeout=3)
+
+    assert [message.payload["type"] for message in messages] == ["dynamic_testing"]
+    assert time.monotonic() - started < 3
+
+
+@pytest.mark.asyncio
+async def test_priority_order_is_kept(redis_client):
+    scheduler = make_scheduler(redis_client, "worker-1")
+    for index in range(3):
+        await scheduler.enqueue({"index": index}, priority="batch", tenant="bulk")
+    await scheduler.enqueue({"index": "urgent"}, priority="urgent", tenant="acme")
+
+    first = await scheduler.fetch(block_ms=10)
+
+    assert first[0].payload["index"] == "urgent"
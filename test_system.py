@@ -1,61 +1,67 @@
 """
 시스템 테스트 스크립트
+- 실행 중인 관리자 AI(MANAGER_URL, 기본 http://localhost:8000)에 요청하며 연결할 수 없으면 건너뜀
 """
 import asyncio
-import httpx
-import json
+import os
 
+import pytest
 
+from services.manager_client import ManagerClient, ManagerError, TestRequest
+
+
+MANAGER_URL = os.getenv("MANAGER_URL", "http://localhost:8000")
+
+
+@pytest.mark.asyncio
 async def test_security_system():
     """보안 테스트 시스템 테스트"""
     
     print("🧪 멀티 AI 보안 테스트 시스템 테스트 시작")
     
     # 테스트 데이터
-    test_request = {
-        "target_info": {
+    test_request = TestRequest(
+        target_info={
             "project_name": "샘플 웹 애플리케이션",
             "project_type": "web_application",
             "language": "python",
             "framework": "fastapi",
             "source_path": "./sample_project"
         },
-        "test_scope": [
+        test_scope=[
             "static_code_analysis",
             "dependency_vulnerability_scan",
             "dynamic_security_testing",
             "authentication_testing",
             "authorization_testing"
         ]
-    }
+    )
     
-    try:
-        async with httpx.AsyncClient() as client:
-            # 헬스 체크
-            print("1. 헬스 체크...")
-            health_response = await client.get("http://localhost:8000/health")
-            print(f"   상태: {health_response.json()}")
-            
-            # 보안 테스트 시작
-            print("2. 보안 테스트 시작...")
-            test_response = await client.post(
-                "http://localhost:8000/start-security-test",
-                json=test_request
-            )
-            print(f"   응답: {test_response.json()}")
-            
-            # 상태 확인
-            print("3. 시스템 상태 확인...")
-            await asyncio.sleep(5)  # 5초 대기
-            
-            status_response = await client.get("http://localhost:8000/status")
-            print(f"   상태: {status_response.json()}")
-            
-            print("✅ 테스트 완료!")
-            
-    except Exception as e:
-        print(f"❌ 테스트 실패: {e}")
-        print("💡 시스템이 실행 중인지 확인하세요: docker-compose ps")
+    async with ManagerClient(MANAGER_URL, retries=0) as client:
+        # 헬스 체크
+        print("1. 헬스 체크...")
+        try:
+            health = await client.health()
+        except ManagerError as e:
+            pytest.skip(f"시스템이 실행 중이 아닙니다 ({e}) - docker-compose ps로 확인하세요")
+        print(f"   상태: {health}")
+        
+        # 보안 테스트 시작
+        print("2. 보안 테스트 시작...")
+        response = await client.start_security_test(test_request)
+        print(f"   응답: {response}")
+        assert response["status"] == "started"
+        assert response["test_id"]
+        
+        # 상태 확인
+        print("3. 시스템 상태 확인...")
+        await asyncio.sleep(5)  # 5초 대기
+        
+        status = await client.status()
+        print(f"   상태: {status}")
+        assert "queues" in status
+        
+        print("✅ 테스트 완료!")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,113 @@
+"""
+신뢰성 작업 큐 테스트 (fakeredis 사용, Redis 서버 불필요)
+"""
+import asyncio
+
+import fakeredis.aioredis
+import pytest
+
+from services.task_queue import ReliableQueue
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.aioredis.FakeRedis()
+
+
+def make_queue(redis_client, consumer="worker-1", **kwargs):
+    return ReliableQueue(
+        redis_client,
+        stream="test_queue",
+        group="executors",
+        consumer=consumer,
+        visibility_timeout=kwargs.pop("visibility_timeout", 0.05),
+        max_attempts=kwargs.pop("max_attempts", 3),
+        **kwargs
+    )
+
+
+@pytest.mark.asyncio
+async def test_enqueue_fetch_ack(redis_client):
+    queue = make_queue(redis_client)
+
+    await queue.enqueue({"type": "static_analysis"})
+    messages = await queue.fetch(block_ms=10)
+
+    assert len(messages) == 1
+    assert messages[0].payload == {"type": "static_analysis"}
+    assert messages[0].attempts == 1
+    depth = await queue.depth()
+    assert depth["queued"] == 0
+    assert depth["in_progress"] == 1
+
+    await queue.ack(messages[0])
+
+    depth = await queue.depth()
+    assert depth["queued"] == 0
+    assert depth["in_progress"] == 0
+
+
+@pytest.mark.asyncio
+async def test_enqueue_before_consumer_group_exists(redis_client):
+    producer = make_queue(redis_client, consumer="producer")
+    await producer.enqueue({"type": "dynamic_testing"})
+
+    consumer = make_queue(redis_client)
+    messages = await consumer.fetch(block_ms=10)
+
+    assert [m.payload["type"] for m in messages] == ["dynamic_testing"]
+
+
+@pytest.mark.asyncio
+async def test_unacked_message_is_reclaimed_after_visibility_timeout(redis_client):
+    crashed = make_queue(redis_client, consumer="crashed")
+    survivor = make_queue(redis_client, consumer="survivor")
+
+    await crashed.enqueue({"type": "static_analysis"})
+    assert len(await crashed.fetch(block_ms=10)) == 1
+
+    # 가시성 타임아웃 전에는 회수되지 않음
+    assert await survivor.reclaim() == []
+
+    await asyncio.sleep(0.1)
+    reclaimed = await survivor.fetch(block_ms=10)
+
+    assert len(reclaimed) == 1
+    assert reclaimed[0].payload == {"type": "static_analysis"}
+    assert reclaimed[0].attempts == 2
+
+
+@pytest.mark.asyncio
+async def test_touch_keeps_message_invisible(redis_client):
+    worker = make_queue(redis_client, consumer="worker", visibility_timeout=0.2)
+    other = make_queue(redis_client, consumer="other", visibility_timeout=0.2)
+
+    await worker.enqueue({"type": "dynamic_testing"})
+    message = (await worker.fetch(block_ms=10))[0]
+
+    for _ in range(3):
+        await asyncio.sleep(0.1)
+        await worker.touch(message)
+
+    assert await other.reclaim() == []
+
+
+@pytest.mark.asyncio
+async def test_message_moves_to_dead_letter_after_max_attempts(redis_client):
+    queue = make_queue(redis_client, max_attempts=2)
+
+    await queue.enqueue({"type": "static_analysis"})
+    assert (await queue.fetch(block_ms=10))[0].attempts == 1
+
+    await asyncio.sleep(0.1)
+    assert (await queue.fetch(block_ms=10))[0].attempts == 2
+
+    await asyncio.sleep(0.1)
+    assert await queue.fetch(block_ms=10) == []
+
+    depth = await queue.depth()
+    assert depth == {"queued": 0, "in_progress": 0, "dead_letter": 1}
+
+    dead = await redis_client.xrange(queue.dead_letter_stream)
+    assert dead[0][1][b"source_stream"] == b"test_queue"
+    assert dead[0][1][b"attempts"] == b"2"
@@ -0,0 +1,352 @@
+"""
+스캔 지문 저장소 - 증분 재스캔용
+대상별로 각 테스트의 입력(크롤링한 페이지 응답 해시, 열린 포트 집합, TLS 인증서 지문, 도구 버전)을 기록하고
+재스캔 시 입력이 바뀐 테스트만 다시 실행
+"""
+import asyncio
+import hashlib
+import json
+import os
+import re
+import socket
+import ssl
+import sqlite3
+import time
+from typing import Dict, Any, Awaitable, Callable, List, Optional
+from urllib.parse import urljoin, urlparse
+
+import requests
+from loguru import logger
+
+from core.checkpoint import content_hash
+from core.deadline import Deadline
+
+
+# 요청마다 바뀌는 값만 해시에서 제외 (숫자/버전 문자열은 배포로 바뀌는 값이므로 그대로 비교)
+# - CSRF 토큰/nonce 필드의 값, CSP nonce 속성
+# - 세션 ID/해시 같은 긴 16진수, 영문과 숫자가 섞인 긴 base64 토큰
+TOKEN_FIELDS = re.compile(r"csrf|xsrf|nonce|authenticity_token|requestverificationtoken|viewstate|eventvalidation|_token", re.I)
+TOKEN_TAG_PATTERN = re.compile(r"<(?:input|meta)\b[^>]*>", re.I)
+TOKEN_VALUE_PATTERN = re.compile(r"""\b(value|content)\s*=\s*("[^"]*"|'[^']*')""", re.I)
+NONCE_PATTERN = re.compile(r"""\bnonce\s*=\s*("[^"]*"|'[^']*')""", re.I)
+HEX_PATTERN = re.compile(r"\b[0-9a-fA-F]{32,}\b")
+BASE64_PATTERN = re.compile(r"[A-Za-z0-9+/_-]{40,}={0,2}")
+
+PROBE_TIMEOUT = 5
+TOOL_VERSION_COMMANDS = {
+    "sqlmap": ["sqlmap", "--version"],
+    "nmap": ["nmap", "--version"]
+}
+
+# 크롤링 (sqlmap --crawl처럼 같은 호스트의 링크와 폼을 따라감, 정적 파일 제외)
+MAX_CRAWL_PAGES = int(os.getenv("FINGERPRINT_MAX_PAGES", "50"))
+LINK_PATTERN = re.compile(r"""(?:href|action)\s*=\s*["']([^"'#]+)""", re.I)
+STATIC_EXTENSIONS = (".css", ".js", ".png", ".jpg", ".jpeg", ".gif", ".svg", ".ico", ".woff", ".woff2", ".ttf", ".pdf", ".zip")
+
+# 테스트별 (확인할 공격 표면, 입력) - 입력이 모두 그대로면 이전 결과를 재사용
+TEST_INPUTS = {
+    "sql_injection": (("crawled", "tools"), lambda surface: {"pages": surface["crawled"], "sqlmap": surface["tools"].get("sqlmap")}),
+    "xss_testing": (("crawled",), lambda surface: {"pages": surface["crawled"]}),
+    "brute_force": (("pages",), lambda surface: {"login_pages": {k: v for k, v in surface["pages"].items() if k != "/"}}),
+    "port_scan": (("ports", "tools"), lambda surface: {"ports": surface["ports"], "nmap": surface["tools"].get("nmap")}),
+    "ssl_tls_test": (("tls",), lambda surface: {"tls": surface["tls"]}),
+}
+SURFACE_PARTS = ("pages", "crawled", "ports", "tls", "tools")
+
+
+def _strip_token_values(match: re.Match) -> str:
+    tag = match.group(0)
+    return TOKEN_VALUE_PATTERN.sub(r'\1=""', tag) if TOKEN_FIELDS.search(tag) else tag
+
+
+def _strip_base64(match: re.Match) -> str:
+    token = match.group(0)
+    # 영문과 숫자가 섞인 경우만 토큰으로 봄 (긴 단어/경로는 유지)
+    return "" if any(c.isdigit() for c in token) and any(c.isalpha() for c in token) else token
+
+
+def normalize_body(body: str) -> str:
+    body = TOKEN_TAG_PATTERN.sub(_strip_token_values, body)
+    body = NONCE_PATTERN.sub('nonce=""', body)
+    body = HEX_PATTERN.sub("", body)
+    return BASE64_PATTERN.sub(_strip_base64, body)
+
+
+def extract_links(base_url: str, body: str) -> List[str]:
+    """같은 호스트의 링크/폼 주소 (정적 파일 제외)"""
+
+    host = urlparse(base_url).netloc
+    links = []
+    for href in LINK_PATTERN.findall(body):
+        url = urljoin(base_url, href.strip())
+        parsed = urlparse(url)
+        if parsed.scheme in ("http", "https") and parsed.netloc == host and not parsed.path.lower().endswith(STATIC_EXTENSIONS):
+            links.append(url)
+    return links
+
+
+_tool_versions: Dict[str, str] = {}
+
+
+class SurfaceProbe:
+    """공격 표면을 가볍게 확인하여 테스트 입력 수집 (수 초 이내)
+
+    parts로 필요한 항목만 확인 (pages: 지정한 엔드포인트, crawled: 크롤링한 페이지, ports, tls, tools)
+    """
+
+    def __init__(
+        self,
+        target_url: str,
+        ports: List[int],
+        endpoints: List[str],
+        deadline: Optional[Deadline] = None,
+        crawl_depth: int = 2,
+        tls_port: int = 443,
+        parts: tuple = SURFACE_PARTS
+    ):
+        self.target_url = target_url.rstrip('/')
+        self.ports = ports
+        self.endpoints = endpoints
+        self.deadline = deadline or Deadline()
+        self.crawl_depth = crawl_depth
+        self.tls_port = tls_port
+        self.parts = parts
+        self.domain = urlparse(target_url).hostname
+
+    async def collect(self) -> Dict[str, Any]:
+        """엔드포인트/크롤링 페이지 응답 해시, 열린 포트, TLS 인증서 지문, 도구 버전 (확인하지 않은 항목은 비어 있음)"""
+
+        collectors = {
+            "pages": self.page_hashes,
+            "crawled": self.crawl_hashes,
+            "ports": self.open_ports,
+            "tls": self.tls_fingerprint,
+            "tools": self.tool_versions
+        }
+        names = [name for name in SURFACE_PARTS if name in self.parts]
+        values = await asyncio.gather(*(collectors[name]() for name in names))
+
+        surface = {"pages": {}, "crawled": None, "ports": [], "tls": None, "tools": {}}
+        surface.update(zip(names, values))
+        return surface
+
+    async def page_hashes(self) -> Dict[str, Optional[str]]:
+        paths = ["/"] + self.endpoints
+        pages = await asyncio.gather(*(asyncio.to_thread(self._fetch, self._url(path)) for path in paths))
+        return {path: page and page["hash"] for path, page in zip(paths, pages)}
+
+    async def crawl_hashes(self) -> Optional[Dict[str, str]]:
+        """대상 URL에서 crawl_depth 단계까지 링크를 따라간 페이지별 응답 해시 (첫 페이지를 못 받으면 None)"""
+
+        hashes: Dict[str, str] = {}
+        seen = {self.target_url}
+        frontier = [self.target_url]
+
+        for depth in range(self.crawl_depth + 1):
+            pages = await asyncio.gather(*(asyncio.to_thread(self._fetch, url) for url in frontier))
+            if depth == 0 and pages[0] is None:
+                return None
+
+            next_frontier = []
+            for url, page in zip(frontier, pages):
+                if page is None:
+                    continue
+                hashes[self._path(url)] = page["hash"]
+                for link in page["links"]:
+                    if link not in seen and len(seen) < MAX_CRAWL_PAGES:
+                        seen.add(link)
+                        next_frontier.append(link)
+
+            if not next_frontier or self.deadline.expired:
+                break
+            frontier = next_frontier
+
+        return hashes
+
+    def _url(self, path: str) -> str:
+        return f"{self.target_url}{path}" if path != "/" else self.target_url
+
+    def _path(self, url: str) -> str:
+        parsed = urlparse(url)
+        return (parsed.path or "/") + (f"?{parsed.query}" if parsed.query else "")
+
+    def _fetch(self, url: str) -> Optional[Dict[str, Any]]:
+        try:
+            response = requests.get(url, timeout=self.deadline.timeout(PROBE_TIMEOUT), allow_redirects=True)
+        except requests.RequestException:
+            return None
+
+        digest = hashlib.sha256(normalize_body(response.text).encode("utf-8")).hexdigest()
+        return {"hash": f"{response.status_code}:{digest}", "links": extract_links(response.url, response.text)}
+
+    async def open_ports(self) -> List[int]:
+        """TCP 연결만 확인 (nmap 서비스 탐지 없이)"""
+
+        async def is_open(port: int) -> bool:
+            try:
+                _, writer = await asyncio.wait_for(
+                    asyncio.open_connection(self.domain, port), timeout=self.deadline.timeout(1.0)
+                )
+            except (OSError, asyncio.TimeoutError):
+                return False
+            writer.close()
+            return True
+
+        states = await asyncio.gather(*(is_open(port) for port in self.ports))
+        return sorted(port for port, state in zip(self.ports, states) if state)
+
+    async def tls_fingerprint(self) -> Optional[str]:
+        return await asyncio.to_thread(self._tls_fingerprint)
+
+    def _tls_fingerprint(self) -> Optional[str]:
+        # 인증서 교체 여부만 확인하므로 검증 없이 DER 인증서를 가져옴
+        context = ssl.create_default_context()
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+
+        try:
+            with socket.create_connection((self.domain, self.tls_port), timeout=self.deadline.timeout(PROBE_TIMEOUT)) as sock:
+                with context.wrap_socket(sock, server_hostname=self.domain) as ssock:
+                    der = ssock.getpeercert(binary_form=True)
+        except (OSError, ssl.SSLError):
+            return None
+
+        return hashlib.sha256(der).hexdigest() if der else None
+
+    async def tool_versions(self) -> Dict[str, str]:
+        """설치된 도구 버전 (프로세스당 한 번만 확인)"""
+
+        for tool, command in TOOL_VERSION_COMMANDS.items():
+            if tool in _tool_versions:
+                continue
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+                )
+                stdout, _ = await asyncio.wait_for(process.communicate(), timeout=10)
+                _tool_versions[tool] = stdout.decode("utf-8", "replace").strip().splitlines()[0]
+            except (OSError, IndexError, asyncio.TimeoutError):
+                _tool_versions[tool] = "missing"
+
+        return dict(_tool_versions)
+
+
+def fingerprint_tests(surface: Dict[str, Any], test_types: List[str]) -> Dict[str, Dict[str, Any]]:
+    """테스트별 입력과 지문 (확인하지 못한 입력이 있는 테스트는 비교 대상에서 제외)"""
+
+    fingerprints = {}
+    for test_type in test_types:
+        if test_type not in TEST_INPUTS:
+            continue
+        inputs = TEST_INPUTS[test_type][1](surface)
+        if any(value is None for value in inputs.values()):
+            continue
+        fingerprints[test_type] = {"inputs": inputs, "fingerprint": content_hash(inputs)}
+    return fingerprints
+
+
+class FingerprintStore:
+    """SQLite 기반 대상별 테스트 지문과 마지막 결과 저장소"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("FINGERPRINT_DB", "./scan_fingerprints.db")
+        self._init_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path)
+
+    def _init_schema(self):
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS fingerprints (
+                    target TEXT NOT NULL,
+                    test_type TEXT NOT NULL,
+                    fingerprint TEXT NOT NULL,
+                    inputs TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (target, test_type)
+                )
+            """)
+
+    async def load(self, target: str) -> Dict[str, Dict[str, Any]]:
+        """대상의 테스트별 지문과 마지막 결과"""
+        return await asyncio.to_thread(self._load, target)
+
+    def _load(self, target: str) -> Dict[str, Dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT test_type, fingerprint, inputs, result, updated_at FROM fingerprints WHERE target = ?", (target,)
+            ).fetchall()
+
+        return {
+            test_type: {
+                "fingerprint": fingerprint,
+                "inputs": json.loads(inputs),
+                "result": json.loads(result),
+                "updated_at": updated_at
+            }
+            for test_type, fingerprint, inputs, result, updated_at in rows
+        }
+
+    async def save(self, target: str, test_type: str, fingerprint: Dict[str, Any], result: Dict[str, Any]):
+        """테스트 지문과 결과 저장"""
+        await asyncio.to_thread(self._save, target, test_type, fingerprint, result)
+
+    def _save(self, target: str, test_type: str, fingerprint: Dict[str, Any], result: Dict[str, Any]):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO fingerprints VALUES (?, ?, ?, ?, ?, ?)",
+                (target, test_type, fingerprint["fingerprint"],
+                 json.dumps(fingerprint["inputs"], ensure_ascii=False, default=str),
+                 json.dumps(result, ensure_ascii=False, default=str), time.time())
+            )
+
+
+def package_key(package: Dict[str, Any]) -> str:
+    """실행 패키지의 저장 키 (같은 테스트라도 파라미터/샤드 값이 다르면 따로 저장)"""
+    return f"{package['test_type']}:{content_hash(package.get('parameters') or {})[:16]}"
+
+
+async def run_package(
+    store: FingerprintStore,
+    target_url: str,
+    package: Dict[str, Any],
+    run: Callable[[], Awaitable[Dict[str, Any]]],
+    rescan: bool = False,
+    deadline: Optional[Deadline] = None
+) -> Dict[str, Any]:
+    """실행 패키지 하나를 지문과 함께 실행
+
+    패키지에 필요한 공격 표면만 확인하여 지문을 만들고, rescan이면 지문이 그대로인 이전 결과를 이어받음
+    정상 완료된 결과는 다음 재스캔의 기준으로 저장
+    """
+
+    test_type = package.get("test_type")
+    if test_type not in TEST_INPUTS:
+        return await run()
+
+    params = package.get("parameters") or {}
+    surface = await SurfaceProbe(
+        target_url,
+        ports=params.get("ports", []),
+        endpoints=params.get("endpoints", []),
+        deadline=deadline,
+        crawl_depth=params.get("crawl_depth", 1),
+        tls_port=params.get("port", 443),
+        parts=TEST_INPUTS[test_type][0]
+    ).collect()
+    fingerprint = fingerprint_tests(surface, [test_type]).get(test_type)
+    key = package_key(package)
+
+    if rescan and fingerprint:
+        stored = (await store.load(target_url)).get(key)
+        if stored and stored["fingerprint"] == fingerprint["fingerprint"]:
+            logger.info(f"변경 없음, 이전 결과 재사용: {key}")
+            return {**stored["result"], "carried_forward": True, "previous_scan_at": stored["updated_at"]}
+
+    result = await run()
+
+    if fingerprint and result.get("status") == "completed":
+        await store.save(target_url, key, fingerprint, result)
+    return result
@@ -7,21 +7,33 @@ import asyncio
 import json
 import requests
 import socket
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from urllib.parse import urlparse
 import ssl
 import nmap
 from loguru import logger
 
+from core.deadline import Deadline
+from .fingerprint import FingerprintStore, run_package
+
+HTTP_TIMEOUT = 10
+PROBE_TIMEOUT = 5
+PORT_SCAN_TIMEOUT = 180  # 3분
+
+SCAN_PORTS = [22, 80, 443, 21, 25, 53, 110, 143, 993, 995, 3306, 5432, 6379, 27017]
+LOGIN_ENDPOINTS = ['/login', '/admin', '/wp-admin', '/signin', '/auth']
+SQLMAP_TIMEOUT = 300  # 5분
+
 
 class SecurityScanner:
     """실제 보안 스캐닝을 수행하는 도구 클래스"""
     
-    def __init__(self, target_url: str):
+    def __init__(self, target_url: str, deadline: Optional[Deadline] = None):
         self.target_url = target_url
         self.parsed_url = urlparse(target_url)
         self.host = self.parsed_url.netloc
         self.domain = self.parsed_url.hostname
+        self.deadline = deadline or Deadline()
         
     async def run_port_scan(self) -> Dict[str, Any]:
         """포트 스캔 실행 (nmap 사용)"""
@@ -30,7 +42,12 @@ class SecurityScanner:
             
             # nmap을 사용한 포트 스캔
             nm = nmap.PortScanner()
-            scan_result = nm.scan(self.domain, '22,80,443,21,25,53,110,143,993,995,3306,5432,6379,27017')
+            host_timeout = int(self.deadline.timeout(PORT_SCAN_TIMEOUT))
+            scan_result = nm.scan(
+                self.domain,
+                ','.join(str(port) for port in SCAN_PORTS),
+                arguments=f'-sV --host-timeout {host_timeout}s'
+            )
             
             open_ports = []
             for host in scan_result['scan']:
@@ -66,7 +83,7 @@ class SecurityScanner:
             
             # SSL 인증서 정보 가져오기
             context = ssl.create_default_context()
-            with socket.create_connection((self.domain, 443), timeout=10) as sock:
+            with socket.create_connection((self.domain, 443), timeout=self.deadline.timeout(HTTP_TIMEOUT)) as sock:
                 with context.wrap_socket(sock, server_hostname=self.domain) as ssock:
                     cert = ssock.getpeercert()
                     cipher = ssock.cipher()
@@ -98,7 +115,7 @@ class SecurityScanner:
         try:
             logger.info(f"보안 헤더 검사 시작: {self.target_url}")
             
-            response = requests.get(self.target_url, timeout=10, allow_redirects=True)
+            response = requests.get(self.target_url, timeout=self.deadline.timeout(HTTP_TIMEOUT), allow_redirects=True)
             headers = response.headers
             
             security_headers = {
@@ -132,6 +149,9 @@ class SecurityScanner:
         try:
             logger.info(f"SQL 인젝션 테스트 시작: {self.target_url}")
             
+            # 남은 예산 안에서 실행 (요청당 타임아웃도 예산에 맞춤)
+            timeout = self.deadline.timeout(SQLMAP_TIMEOUT)
+            
             # sqlmap 명령어 실행 (안전한 옵션만 사용)
             cmd = [
                 'sqlmap',
@@ -140,7 +160,7 @@ class SecurityScanner:
                 '--crawl=2',  # 2단계까지만 크롤링
                 '--level=1',  # 기본 레벨
                 '--risk=1',   # 낮은 위험도
-                '--timeout=10',
+                f'--timeout={int(self.deadline.timeout(HTTP_TIMEOUT))}',
                 '--retries=1',
                 '--technique=B',  # Boolean-based blind만
                 '--no-cast',
@@ -155,7 +175,12 @@ class SecurityScanner:
                 stderr=asyncio.subprocess.PIPE
             )
             
-            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=300)  # 5분 제한
+            try:
+                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                raise
             
             if process.returncode == 0:
                 # sqlmap 결과 파싱
@@ -187,8 +212,8 @@ class SecurityScanner:
             logger.warning("SQL 인젝션 테스트 시간 초과")
             return {
                 'status': 'timeout',
-                'error': '테스트 시간이 초과되었습니다 (5분 제한)',
-                'scan_time': '5분+'
+                'error': f'테스트 시간이 초과되었습니다 ({int(timeout)}초 제한)',
+                'scan_time': f'{int(timeout)}초+'
             }
         except Exception as e:
             logger.error(f"SQL 인젝션 테스트 실패: {e}")
@@ -203,13 +228,14 @@ class SecurityScanner:
             logger.info(f"브루트포스 테스트 시작: {self.target_url}")
             
             # 매우 제한적인 브루트포스 테스트 (실제로는 로그인 페이지 존재 여부만 확인)
-            login_endpoints = ['/login', '/admin', '/wp-admin', '/signin', '/auth']
             found_endpoints = []
             
-            for endpoint in login_endpoints:
+            for endpoint in LOGIN_ENDPOINTS:
+                if self.deadline.expired:
+                    break
                 try:
                     test_url = f"{self.target_url.rstrip('/')}{endpoint}"
-                    response = requests.get(test_url, timeout=5)
+                    response = requests.get(test_url, timeout=self.deadline.timeout(PROBE_TIMEOUT))
                     
                     if response.status_code == 200:
                         # 로그인 폼이 있는지 간단히 확인
@@ -265,9 +291,11 @@ class SecurityScanner:
             
             # GET 파라미터 테스트
             for payload in test_payloads:
+                if self.deadline.expired:
+                    break
                 try:
                     test_url = f"{self.target_url}?test={payload}"
-                    response = requests.get(test_url, timeout=10)
+                    response = requests.get(test_url, timeout=self.deadline.timeout(HTTP_TIMEOUT))
                     
                     # 페이로드가 그대로 반영되는지 확인 (실제 실행은 안함)
                     if payload in response.text:
@@ -299,14 +327,24 @@ class SecurityScanner:
 class SecurityToolOrchestrator:
     """보안 도구들을 조율하는 클래스"""
     
-    def __init__(self, target_url: str):
+    def __init__(self, target_url: str, deadline: Optional[Deadline] = None, fingerprint_store: Optional[FingerprintStore] = None):
         self.target_url = target_url
-        self.scanner = SecurityScanner(target_url)
+        self.deadline = deadline or Deadline()
+        self.fingerprint_store = fingerprint_store
+        self.scanner = SecurityScanner(target_url, self.deadline)
     
-    async def run_test_suite(self, test_types: List[str]) -> Dict[str, Any]:
-        """선택된 테스트들을 실행"""
+    async def run_test_suite(self, test_types: List[str], rescan: bool = False) -> Dict[str, Any]:
+        """선택된 테스트들을 실행 (시간 예산이 부족하면 우선순위가 낮은 테스트는 건너뜀)
+        
+        fingerprint_store가 있으면 실행자와 같은 패키지 키로 지문/결과를 저장하고, rescan이면 입력이 바뀐 테스트만 다시 실행
+        """
         results = {}
         
+        test_types, skipped = self.deadline.select_tests(test_types)
+        for item in skipped:
+            logger.warning(f"건너뜀: {item['test_type']} - {item['reason']}")
+            results[item['test_type']] = {'status': 'skipped', 'reason': item['reason']}
+        
         test_mapping = {
             'port_scan': self.scanner.run_port_scan,
             'ssl_tls_test': self.scanner.check_ssl_tls,
@@ -317,13 +355,26 @@ class SecurityToolOrchestrator:
         }
         
         for test_type in test_types:
-            if test_type in test_mapping:
+            if self.deadline.expired:
+                results[test_type] = {'status': 'skipped', 'reason': '스캔 마감 시각 초과'}
+            elif test_type in test_mapping:
                 logger.info(f"실행 중: {test_type}")
-                results[test_type] = await test_mapping[test_type]()
+                if self.fingerprint_store:
+                    results[test_type] = await run_package(
+                        self.fingerprint_store, self.target_url, self.package(test_type),
+                        test_mapping[test_type], rescan=rescan, deadline=self.deadline
+                    )
+                else:
+                    results[test_type] = await test_mapping[test_type]()
             else:
                 results[test_type] = {
                     'status': 'not_implemented',
                     'message': f'{test_type} 테스트는 아직 구현되지 않았습니다.'
                 }
         
-        return results
\ No newline at end of file
+        return results
+    
+    @staticmethod
+    def package(test_type: str) -> Dict[str, Any]:
+        """스캐너가 실제로 사용하는 입력을 파라미터로 가진 실행 패키지 (지문 수집 범위와 저장 키 결정)"""
+        return {'test_type': test_type, 'parameters': {'ports': SCAN_PORTS, 'endpoints': LOGIN_ENDPOINTS}}
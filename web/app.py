@@ -1,54 +1,109 @@
 """
 보안 테스트 웹 대시보드
 """
-from fastapi import FastAPI, Request, Form, Depends
+from fastapi import FastAPI, Request, Form, Depends, Query
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, RedirectResponse
-from sqlalchemy.orm import Session
-import httpx
-from typing import Optional
+from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse, JSONResponse, Response, FileResponse
+from fastapi.encoders import jsonable_encoder
+from contextlib import asynccontextmanager
+from datetime import datetime
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
+import hashlib
+import json
+import os
+import re
+import redis.asyncio as redis
+from typing import Optional, Dict, Any
 
-from .database import get_db, init_db
-from .models import APIKey, SecurityTest
-from .schemas import TestResult
+from core.artifacts import artifact_store
+from services.manager_client import ManagerClient, TestRequest, BatchTestRequest
+from services.scan_registry import ScanRegistry, new_scan_id
 
-app = FastAPI(title="AI 보안 테스트 대시보드", version="1.0.0")
+from . import exports, repository, stats
+from .database import engine, get_db, init_db, SessionLocal
+from .live import ProgressHub, sse_format
+from .models import APIKey, SecurityTest, SEVERITIES
+from .schemas import TestResult, BulkScanRequest
+
+
+dashboard_cache = stats.ViewModelCache(ttl_seconds=float(os.getenv("DASHBOARD_CACHE_TTL", "10")))
+
+MAX_BULK_TARGETS = int(os.getenv("MAX_BULK_TARGETS", "500"))
+
+
+async def on_scan_finished(scan: Dict[str, Any], registry: ScanRegistry):
+    """스캔이 끝났을 때만 테스트 기록과 집계 갱신 (진행 중 상태는 DB에 쓰지 않고 실시간 이벤트로만 전달)
+    
+    발견 사항은 레지스트리에 기록된 원본으로 다시 맞춤 (대시보드가 꺼져 있던 동안의 이벤트 포함)
+    """
+    
+    async with SessionLocal() as db:
+        if await repository.save_final_state(db, scan, registry):
+            dashboard_cache.invalidate()
+
+
+async def on_finding(event: Dict[str, Any]):
+    """새 발견 사항 저장"""
+    
+    async with SessionLocal() as db:
+        await repository.save_finding(db, event)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """시작 시 데이터베이스 초기화와 진행 이벤트 구독, 종료 시 정리"""
+    
+    await init_db()
+    
+    redis_client = redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379"))
+    app.state.progress = ProgressHub(redis_client, on_terminal=on_scan_finished, on_finding=on_finding)
+    app.state.artifacts = artifact_store()
+    app.state.exports = exports.ExportCache()
+    # 관리자 AI 호출은 앱 전체에서 하나의 연결 풀 공유
+    app.state.manager = ManagerClient()
+    await app.state.progress.start()
+    
+    yield
+    
+    await app.state.progress.stop()
+    await app.state.manager.aclose()
+    await redis_client.close()
+    await engine.dispose()
+
+
+app = FastAPI(title="AI 보안 테스트 대시보드", version="1.0.0", lifespan=lifespan)
 
 # 정적 파일 및 템플릿 설정
 app.mount("/static", StaticFiles(directory="web/static"), name="static")
 templates = Jinja2Templates(directory="web/templates")
 
-# 데이터베이스 초기화
-init_db()
-
 @app.get("/", response_class=HTMLResponse)
-async def dashboard(request: Request, db: Session = Depends(get_db)):
+async def dashboard(request: Request, db: AsyncSession = Depends(get_db)):
     """메인 대시보드"""
     
-    # 최근 테스트 결과 조회
-    recent_tests = db.query(SecurityTest).order_by(SecurityTest.created_at.desc()).limit(5).all()
+    async def load():
+        return {
+            # 최근 테스트 결과 (results 제외한 필드만)
+            "recent_tests": (await repository.list_scans(db, limit=5))["scans"],
+            # API 키 설정 상태
+            "api_status": await stats.api_status(db),
+            # 최근 30일 집계
+            "trends": await stats.trends(db)
+        }
     
-    # API 키 설정 상태 확인
-    api_keys = db.query(APIKey).all()
-    api_status = {
-        "openai": any(key.provider == "openai" and key.is_active for key in api_keys),
-        "claude": any(key.provider == "claude" and key.is_active for key in api_keys),
-        "gemini": any(key.provider == "gemini" and key.is_active for key in api_keys)
-    }
+    view_model = await dashboard_cache.get(load)
     
-    return templates.TemplateResponse("dashboard.html", {
-        "request": request,
-        "recent_tests": recent_tests,
-        "api_status": api_status
-    })
+    return templates.TemplateResponse("dashboard.html", {"request": request, **view_model})
 
 
 @app.get("/settings", response_class=HTMLResponse)
-async def settings_page(request: Request, db: Session = Depends(get_db)):
+async def settings_page(request: Request, db: AsyncSession = Depends(get_db)):
     """설정 페이지"""
     
-    api_keys = db.query(APIKey).all()
+    api_keys = (await db.scalars(select(APIKey))).all()
     
     return templates.TemplateResponse("settings.html", {
         "request": request,
@@ -70,12 +125,12 @@ async def save_api_keys(
     gemini_key: str = Form(""),
     gemini_type: str = Form("direct"),
     gcp_project: str = Form(""),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """API 키 저장"""
     
     # 기존 키 삭제
-    db.query(APIKey).delete()
+    await db.execute(delete(APIKey))
     
     # OpenAI 설정 저장
     if openai_key:
@@ -128,7 +183,8 @@ async def save_api_keys(
             is_active=True
         ))
     
-    db.commit()
+    await db.commit()
+    dashboard_cache.invalidate()
     
     return RedirectResponse(url="/settings?saved=true", status_code=303)
 
@@ -148,7 +204,10 @@ async def start_security_test(
     target_url: str = Form(...),
     target_type: str = Form("web_application"),
     test_types: list = Form([]),
-    db: Session = Depends(get_db)
+    priority: str = Form("normal"),
+    time_budget: int = Form(0),
+    rescan: bool = Form(False),
+    db: AsyncSession = Depends(get_db)
 ):
     """보안 테스트 시작"""
     
@@ -160,47 +219,106 @@ async def start_security_test(
         status="running"
     )
     db.add(test_record)
-    db.commit()
+    repository.add_test_runs(db, test_record, test_types)
+    await db.commit()
+    dashboard_cache.invalidate()
     
     # 관리자 AI 서비스에 테스트 요청
-    test_request = {
-        "target_info": {
+    test_request = TestRequest(
+        target_info={
             "target_url": target_url,
             "target_type": target_type,
             "test_id": test_record.id
         },
-        "test_scope": test_types
-    }
+        test_scope=test_types,
+        priority=priority,
+        time_budget_seconds=time_budget or None,
+        rescan=rescan
+    )
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "http://manager-ai:8000/start-security-test",
-                json=test_request,
-                timeout=30.0
-            )
-            
-        if response.status_code == 200:
-            test_record.status = "started"
-            test_record.test_id = response.json().get("test_id")
-        else:
-            test_record.status = "failed"
-            test_record.error_message = f"API 호출 실패: {response.status_code}"
+        result = await request.app.state.manager.start_security_test(test_request)
+        test_record.status = "running"
+        test_record.test_id = result.get("test_id")
             
     except Exception as e:
         test_record.status = "failed"
         test_record.error_message = str(e)
     
-    db.commit()
+    await db.commit()
     
     return RedirectResponse(url=f"/test-result/{test_record.id}", status_code=303)
 
 
+@app.post("/api/scans/bulk")
+async def start_bulk_scans(request: Request, body: BulkScanRequest, db: AsyncSession = Depends(get_db)):
+    """여러 대상의 보안 테스트를 한 번에 시작 (INSERT 한 번, 관리자 AI 요청 한 번)"""
+    
+    if len(body.targets) > MAX_BULK_TARGETS:
+        return JSONResponse({"error": f"대상은 최대 {MAX_BULK_TARGETS}개까지 요청할 수 있습니다."}, status_code=400)
+    
+    batch_id = new_scan_id()
+    targets = [
+        {
+            "target_url": target.target_url,
+            "target_type": target.target_type,
+            "test_types": target.test_types if target.test_types is not None else body.test_types
+        }
+        for target in body.targets
+    ]
+    
+    ids = await repository.create_scans(db, batch_id, targets)
+    await db.commit()
+    dashboard_cache.invalidate()
+    
+    # 관리자 AI 서비스에 배치 요청
+    batch_request = BatchTestRequest(
+        batch_id=batch_id,
+        scans=[
+            TestRequest(
+                target_info={
+                    "target_url": target["target_url"],
+                    "target_type": target["target_type"],
+                    "test_id": scan_id
+                },
+                test_scope=target["test_types"],
+                priority=body.priority,
+                time_budget_seconds=body.time_budget or None,
+                rescan=body.rescan
+            )
+            for scan_id, target in zip(ids, targets)
+        ]
+    )
+    
+    try:
+        result = await request.app.state.manager.start_security_tests_batch(batch_request)
+        await repository.assign_scan_ids(db, ids, [scan["test_id"] for scan in result["scans"]])
+            
+    except Exception as e:
+        await repository.fail_batch(db, batch_id, str(e))
+    
+    await db.commit()
+    
+    return await batch_status(request, batch_id, db)
+
+
+@app.get("/api/batches/{batch_id}")
+async def batch_status(request: Request, batch_id: str, db: AsyncSession = Depends(get_db)):
+    """배치 진행 상황 API (상태별 개수, 전체 진행률, 스캔별 상태)"""
+    
+    summary = await repository.batch_summary(db, batch_id, request.app.state.progress.registry)
+    
+    if summary is None:
+        return JSONResponse({"error": "배치를 찾을 수 없습니다."}, status_code=404)
+    
+    return summary
+
+
 @app.get("/test-result/{test_id}", response_class=HTMLResponse)
-async def test_result_page(request: Request, test_id: int, db: Session = Depends(get_db)):
+async def test_result_page(request: Request, test_id: int, db: AsyncSession = Depends(get_db)):
     """테스트 결과 페이지"""
     
-    test = db.query(SecurityTest).filter(SecurityTest.id == test_id).first()
+    test = await db.get(SecurityTest, test_id)
     
     if not test:
         return templates.TemplateResponse("error.html", {
@@ -208,6 +326,11 @@ async def test_result_page(request: Request, test_id: int, db: Session = Depends
             "error": "테스트를 찾을 수 없습니다."
         })
     
+    # 종료 이벤트를 놓쳐 진행 중으로 남은 기록은 레지스트리 상태로 바로 저장
+    if test.status not in repository.FINAL_STATUSES and test.test_id:
+        if await request.app.state.progress.sync_terminal(test.test_id):
+            await db.refresh(test)
+    
     return templates.TemplateResponse("test_result.html", {
         "request": request,
         "test": test
@@ -215,10 +338,10 @@ async def test_result_page(request: Request, test_id: int, db: Session = Depends
 
 
 @app.get("/api/test-status/{test_id}")
-async def get_test_status(test_id: int, db: Session = Depends(get_db)):
+async def get_test_status(test_id: int, db: AsyncSession = Depends(get_db)):
     """테스트 상태 API"""
     
-    test = db.query(SecurityTest).filter(SecurityTest.id == test_id).first()
+    test = await db.get(SecurityTest, test_id)
     
     if not test:
         return {"error": "테스트를 찾을 수 없습니다."}
@@ -232,6 +355,194 @@ async def get_test_status(test_id: int, db: Session = Depends(get_db)):
     }
 
 
+@app.get("/api/scans")
+async def list_scans(
+    request: Request,
+    status: Optional[str] = None,
+    target_url: Optional[str] = None,
+    severity: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """스캔 이력 API (커서 페이지네이션, 필터, 필드 선택, ETag)"""
+    
+    try:
+        page = await repository.list_scans(
+            db, status=status, target_url=target_url, severity=severity,
+            created_from=created_from, created_to=created_to,
+            cursor=cursor, limit=limit, fields=fields
+        )
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    
+    body = json.dumps(jsonable_encoder(page), ensure_ascii=False, separators=(",", ":")).encode()
+    etag = f'W/"{hashlib.sha1(body).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    
+    return Response(body, media_type="application/json", headers=headers)
+
+
+@app.get("/api/findings/search")
+async def search_findings(
+    q: Optional[str] = None,
+    finding_type: Optional[str] = Query(None, alias="type"),
+    target: Optional[str] = None,
+    port: Optional[str] = None,
+    parameter: Optional[str] = None,
+    payload: Optional[str] = None,
+    endpoint: Optional[str] = None,
+    severity: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    group_by: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    db: AsyncSession = Depends(get_db)
+):
+    """스캔 전체 발견 사항 검색 (유형/대상/포트/파라미터/페이로드/엔드포인트 역색인 + 설명 전문 검색)"""
+    
+    terms = {
+        "type": finding_type, "target": target, "port": port,
+        "parameter": parameter, "payload": payload, "endpoint": endpoint
+    }
+    
+    try:
+        return await repository.search_findings(
+            db, q=q, terms=terms, severity=severity,
+            created_from=created_from, created_to=created_to,
+            group_by=group_by, cursor=cursor, limit=limit
+        )
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+
+@app.get("/api/scans/{scan_id}/events")
+async def scan_events(request: Request, scan_id: str):
+    """스캔 진행 이벤트 스트림 (SSE) - 상태 변화와 새 발견 사항을 DB 조회 없이 전달"""
+    
+    async def stream():
+        async for event in request.app.state.progress.subscribe(scan_id):
+            if await request.is_disconnected():
+                break
+            yield sse_format(event)
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+DIGEST_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+@app.get("/api/scans/{scan_id}/export")
+async def export_scan(
+    request: Request,
+    scan_id: str,
+    format: str = "json",
+    fail_on: str = "high",
+    db: AsyncSession = Depends(get_db)
+):
+    """스캔 리포트 내보내기 (json, sarif, junit, html, pdf - 스트리밍 렌더링, 같은 내용은 캐시에서 전달)"""
+    
+    if format not in exports.EXPORT_FORMATS:
+        return JSONResponse({"error": f"지원하지 않는 형식: {format}"}, status_code=400)
+    if fail_on not in SEVERITIES:
+        return JSONResponse({"error": f"알 수 없는 심각도: {fail_on}"}, status_code=400)
+    
+    summary = await exports.scan_summary(db, scan_id)
+    if summary is None:
+        return JSONResponse({"error": "스캔을 찾을 수 없습니다."}, status_code=404)
+    
+    media_type, extension = exports.EXPORT_FORMATS[format]
+    options = {"fail_on": fail_on} if format == "junit" else {}
+    key = exports.content_key(summary, format, **options)
+    headers = {
+        "ETag": f'"{key}"',
+        "Content-Disposition": f'attachment; filename="scan-{scan_id}.{extension}"'
+    }
+    
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    
+    cache = request.app.state.exports
+    cached = cache.lookup(scan_id, key, extension)
+    if cached:
+        return FileResponse(cached, media_type=media_type, headers=headers)
+    
+    return StreamingResponse(
+        cache.tee(exports.render(summary, format, **options), scan_id, key, extension),
+        media_type=media_type,
+        headers=headers
+    )
+
+
+def parse_range(header: Optional[str], size: int):
+    """Range 헤더(단일 구간)를 (start, end)로 변환 - 헤더가 없으면 None, 만족할 수 없으면 ValueError"""
+    
+    if not header:
+        return None
+    
+    match = RANGE_PATTERN.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        raise ValueError(header)
+    
+    start, end = match.groups()
+    if start == "":
+        # bytes=-N: 마지막 N바이트
+        start, end = max(0, size - int(end)), size - 1
+    else:
+        start, end = int(start), min(int(end), size - 1) if end else size - 1
+    
+    if start > end or start >= size:
+        raise ValueError(header)
+    return start, end
+
+
+@app.get("/api/artifacts/{digest}")
+async def get_artifact(request: Request, digest: str):
+    """도구 원본 출력 조회 (압축 해제하여 전달, Range 요청 지원)"""
+    
+    store = request.app.state.artifacts
+    meta = await asyncio.to_thread(store.metadata, digest) if DIGEST_PATTERN.match(digest) else None
+    if meta is None:
+        return JSONResponse({"error": "출력을 찾을 수 없습니다."}, status_code=404)
+    
+    size = meta["size"]
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": f'"{digest}"',
+        # 내용 주소 지정이므로 같은 주소의 내용은 바뀌지 않음
+        "Cache-Control": "public, max-age=31536000, immutable"
+    }
+    
+    try:
+        byte_range = parse_range(request.headers.get("range"), size)
+    except ValueError:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+    
+    if byte_range is None:
+        return StreamingResponse(
+            store.iter_range(digest), media_type=meta["content_type"],
+            headers={**headers, "Content-Length": str(size)}
+        )
+    
+    start, end = byte_range
+    return StreamingResponse(
+        store.iter_range(digest, start, end), status_code=206, media_type=meta["content_type"],
+        headers={**headers, "Content-Length": str(end - start + 1), "Content-Range": f"bytes {start}-{end}/{size}"}
+    )
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=3000)
\ No newline at end of file
@@ -1,29 +1,60 @@
 """
-데이터베이스 설정
+데이터베이스 설정 (비동기 엔진 - 쿼리가 이벤트 루프를 막지 않음)
 """
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 import os
 
 from .models import Base
+from .search import create_fulltext_index
 
-# 데이터베이스 URL
+# 데이터베이스 URL (동기 드라이버 URL도 비동기 드라이버로 변환)
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./security_dashboard.db")
 
+ASYNC_DRIVERS = {
+    "postgresql://": "postgresql+asyncpg://",
+    "postgresql+psycopg2://": "postgresql+asyncpg://",
+    "sqlite://": "sqlite+aiosqlite://"
+}
+
+
+def async_url(url: str) -> str:
+    """동기 드라이버 URL을 비동기 드라이버 URL로 변환"""
+
+    for prefix, async_prefix in ASYNC_DRIVERS.items():
+        if url.startswith(prefix):
+            return async_prefix + url[len(prefix):]
+    return url
+
+
+def engine_options(url: str) -> dict:
+    """커넥션 풀 설정 (SQLite는 파일 잠금으로 직렬화되므로 풀 크기 설정 제외)"""
+
+    if url.startswith("sqlite"):
+        return {}
+
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+        # 끊어진 연결을 사용 전에 확인하고, DB/프록시 유휴 연결 종료 전에 재생성
+        "pool_pre_ping": True,
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    }
+
+
 # 엔진 생성
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+engine = create_async_engine(async_url(DATABASE_URL), **engine_options(DATABASE_URL))
+SessionLocal = async_sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 
 
-def init_db():
+async def init_db():
     """데이터베이스 초기화"""
-    Base.metadata.create_all(bind=engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(create_fulltext_index)
 
 
-def get_db():
+async def get_db():
     """데이터베이스 세션 의존성"""
-    db = SessionLocal()
-    try:
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
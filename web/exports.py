@@ -0,0 +1,326 @@
+"""
+스캔 리포트 내보내기 (JSON, SARIF, JUnit, HTML, PDF)
+- 발견 사항을 심각도 순으로 일정 개수씩 읽어 바로 출력하므로 발견 사항 수와 관계없이 메모리 사용량이 일정
+- 렌더링 결과는 스캔 ID와 내용 해시(발견 사항 수/마지막 id/상태)로 디스크에 캐시하고, 내용이 같으면 파일을 그대로 전달
+"""
+import hashlib
+import json
+import os
+import tempfile
+from typing import Dict, Any, AsyncIterator, List, Optional
+from xml.sax.saxutils import escape as xml_escape, quoteattr
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .database import SessionLocal
+from .models import SecurityTest, Finding, SEVERITIES
+
+# 렌더링 방식이 바뀌면 올려서 이전 캐시를 무효화
+RENDERER_VERSION = "1"
+BATCH_SIZE = 1000
+CHUNK_SIZE = 64 * 1024
+
+# 형식 -> (Content-Type, 파일 확장자)
+EXPORT_FORMATS = {
+    "json": ("application/json", "json"),
+    "sarif": ("application/sarif+json", "sarif"),
+    "junit": ("application/xml", "xml"),
+    "html": ("text/html; charset=utf-8", "html"),
+    "pdf": ("application/pdf", "pdf")
+}
+
+SARIF_LEVELS = {"critical": "error", "high": "error", "medium": "warning", "low": "note", "info": "note"}
+SARIF_LEVEL_RANK = {"error": 0, "warning": 1, "note": 2}
+
+FINDING_COLUMNS = (
+    Finding.id, Finding.fingerprint, Finding.severity, Finding.finding_type, Finding.title,
+    Finding.location, Finding.test_type, Finding.source, Finding.details, Finding.created_at
+)
+
+report_templates = Environment(
+    loader=FileSystemLoader("web/templates"),
+    autoescape=select_autoescape(["html"]),
+    enable_async=True
+)
+
+
+async def scan_summary(db: AsyncSession, scan_id: str) -> Optional[Dict[str, Any]]:
+    """스캔 정보와 심각도별 발견 사항 수 (없는 스캔이면 None)"""
+
+    test = (await db.scalars(select(SecurityTest).where(SecurityTest.test_id == scan_id))).first()
+    if test is None:
+        return None
+
+    counts = (await db.execute(
+        select(Finding.severity, func.count(), func.max(Finding.id))
+        .where(Finding.security_test_id == test.id)
+        .group_by(Finding.severity)
+    )).all()
+    by_severity = {severity: 0 for severity in SEVERITIES}
+    by_severity.update({severity: count for severity, count, _ in counts})
+
+    return {
+        "id": test.id,
+        "scan_id": scan_id,
+        "target_url": test.target_url,
+        "target_type": test.target_type,
+        "test_types": [t for t in test.test_types.split(",") if t],
+        "status": test.status,
+        "created_at": test.created_at.isoformat() if test.created_at else None,
+        "updated_at": test.updated_at.isoformat() if test.updated_at else None,
+        "total": sum(count for _, count, _ in counts),
+        "max_finding_id": max((max_id for _, _, max_id in counts), default=0),
+        "by_severity": by_severity
+    }
+
+
+def content_key(summary: Dict[str, Any], export_format: str, **options) -> str:
+    """렌더링 결과를 결정하는 값의 해시 (발견 사항은 추가만 되므로 수와 마지막 id로 내용을 식별)"""
+
+    basis = [RENDERER_VERSION, export_format, summary["status"], summary["updated_at"],
+             summary["total"], summary["max_finding_id"], sorted(options.items())]
+    return hashlib.sha256(json.dumps(basis, default=str).encode()).hexdigest()[:32]
+
+
+async def iter_findings(security_test_id: int, batch_size: int = BATCH_SIZE) -> AsyncIterator[Dict[str, Any]]:
+    """발견 사항을 심각도 순(같은 심각도는 id 순)으로 batch_size개씩 조회 - (스캔, 심각도) 인덱스 범위 조회"""
+
+    async with SessionLocal() as db:
+        for severity in SEVERITIES:
+            last_id = 0
+            while True:
+                rows = (await db.execute(
+                    select(*FINDING_COLUMNS)
+                    .where(Finding.security_test_id == security_test_id, Finding.severity == severity, Finding.id > last_id)
+                    .order_by(Finding.id)
+                    .limit(batch_size)
+                )).all()
+                for row in rows:
+                    yield row._asdict()
+                if len(rows) < batch_size:
+                    break
+                last_id = rows[-1].id
+
+
+def finding_document(finding: Dict[str, Any]) -> Dict[str, Any]:
+    return {**finding, "created_at": finding["created_at"].isoformat() if finding["created_at"] else None}
+
+
+async def render_json(summary: Dict[str, Any], findings: AsyncIterator[Dict[str, Any]], **options) -> AsyncIterator[str]:
+    scan = {name: value for name, value in summary.items() if name != "max_finding_id"}
+    yield '{"scan": ' + json.dumps(scan, ensure_ascii=False) + ', "findings": ['
+
+    separator = ""
+    async for finding in findings:
+        yield separator + json.dumps(finding_document(finding), ensure_ascii=False, default=str)
+        separator = ", "
+
+    yield "]}"
+
+
+async def render_sarif(summary: Dict[str, Any], findings: AsyncIterator[Dict[str, Any]], **options) -> AsyncIterator[str]:
+    """SARIF 2.1.0 - 규칙 목록은 결과를 내보내면서 모아 run 객체의 마지막에 기록"""
+
+    yield '{"$schema": "https://json.schemastore.org/sarif-2.1.0.json", "version": "2.1.0", "runs": [{"results": ['
+
+    rules: Dict[str, Dict[str, Any]] = {}
+    separator = ""
+    async for finding in findings:
+        rule_id = finding["finding_type"]
+        level = SARIF_LEVELS.get(finding["severity"], "note")
+        rule = rules.setdefault(rule_id, {
+            "id": rule_id,
+            "name": rule_id,
+            "shortDescription": {"text": rule_id},
+            "defaultConfiguration": {"level": level}
+        })
+        # 같은 규칙의 결과 중 가장 높은 수준을 기본값으로
+        if SARIF_LEVEL_RANK[level] < SARIF_LEVEL_RANK[rule["defaultConfiguration"]["level"]]:
+            rule["defaultConfiguration"]["level"] = level
+
+        details = finding["details"] or {}
+        result = {
+            "ruleId": rule_id,
+            "level": level,
+            "message": {"text": finding["title"] or rule_id},
+            "locations": [{
+                "physicalLocation": {"artifactLocation": {"uri": details.get("url") or summary["target_url"]}},
+                **({"logicalLocations": [{"name": finding["location"]}]} if finding["location"] else {})
+            }],
+            "partialFingerprints": {"tico/v1": finding["fingerprint"]},
+            "properties": {"severity": finding["severity"], "test_type": finding["test_type"], "source": finding["source"]}
+        }
+        yield separator + json.dumps(result, ensure_ascii=False, default=str)
+        separator = ", "
+
+    tool = {"driver": {"name": "TICO", "rules": list(rules.values())}}
+    properties = {"scan_id": summary["scan_id"], "target_url": summary["target_url"], "status": summary["status"]}
+    yield '], "tool": ' + json.dumps(tool, ensure_ascii=False) + ', "properties": ' + json.dumps(properties, ensure_ascii=False) + "}]}"
+
+
+async def render_junit(summary: Dict[str, Any], findings: AsyncIterator[Dict[str, Any]], fail_on: str = "high", **options) -> AsyncIterator[str]:
+    """JUnit XML - 발견 사항 하나가 테스트 케이스 하나, fail_on 이상 심각도는 실패 (CI 게이트용)"""
+
+    failing = set(SEVERITIES[:SEVERITIES.index(fail_on) + 1])
+    failures = sum(summary["by_severity"][severity] for severity in failing)
+    suite = f"security-scan {summary['target_url']}"
+
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield f'<testsuites name={quoteattr(suite)} tests="{summary["total"]}" failures="{failures}">\n'
+    yield f'<testsuite name={quoteattr(suite)} tests="{summary["total"]}" failures="{failures}" errors="0" skipped="0">\n'
+
+    async for finding in findings:
+        name = f"[{finding['severity']}] {finding['title'] or finding['finding_type']}"
+        classname = f"{finding['test_type']}.{finding['finding_type']}"
+        yield f'<testcase name={quoteattr(name)} classname={quoteattr(classname)}>'
+        if finding["severity"] in failing:
+            body = json.dumps(finding["details"] or {}, ensure_ascii=False, default=str)
+            yield f'<failure message={quoteattr(finding["location"] or name)} type={quoteattr(finding["severity"])}>{xml_escape(body)}</failure>'
+        yield "</testcase>\n"
+
+    yield "</testsuite>\n</testsuites>\n"
+
+
+async def render_html(summary: Dict[str, Any], findings: AsyncIterator[Dict[str, Any]], **options) -> AsyncIterator[str]:
+    template = report_templates.get_template("report.html")
+    async for chunk in template.generate_async(scan=summary, findings=findings, severities=SEVERITIES):
+        yield chunk
+
+
+# PDF 레이아웃 (A4, 포인트 단위)
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842
+MARGIN = 40
+FONT_SIZE, LEADING = 9, 12
+LINES_PER_PAGE = (PAGE_HEIGHT - 2 * MARGIN) // LEADING
+LINE_CHARS = 110
+
+
+def pdf_string(text: str) -> bytes:
+    """PDF 문자열 리터럴 (기본 Helvetica 글꼴이 표현할 수 없는 문자는 ?로 대체)"""
+
+    text = text[:LINE_CHARS].encode("cp1252", "replace")
+    return b"(" + text.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+async def report_lines(summary: Dict[str, Any], findings: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    yield f"Security scan report - {summary['target_url']}"
+    yield f"Scan {summary['scan_id']}  status: {summary['status']}  created: {summary['created_at']}"
+    yield "Findings: " + ", ".join(f"{severity} {summary['by_severity'][severity]}" for severity in SEVERITIES)
+    yield ""
+
+    async for finding in findings:
+        yield f"[{finding['severity'].upper()}] {finding['title'] or finding['finding_type']}"
+        yield f"    {finding['finding_type']} | {finding['test_type']} | {finding['location'] or '-'}"
+
+
+async def render_pdf(summary: Dict[str, Any], findings: AsyncIterator[Dict[str, Any]], **options) -> AsyncIterator[bytes]:
+    """PDF 1.4 - 페이지를 채우는 대로 내보내고 페이지 목록(2번 객체)과 xref는 마지막에 기록"""
+
+    offsets: Dict[int, int] = {}
+    position = 0
+
+    def emit(obj_id: int, body: bytes) -> bytes:
+        nonlocal position
+        offsets[obj_id] = position
+        data = b"%d 0 obj\n%s\nendobj\n" % (obj_id, body)
+        position += len(data)
+        return data
+
+    def page(lines: List[str], first_id: int) -> bytes:
+        text = b"\n".join(pdf_string(line) + b" Tj T*" for line in lines)
+        content = b"BT /F1 %d Tf %d TL %d %d Td\n%s\nET" % (FONT_SIZE, LEADING, MARGIN, PAGE_HEIGHT - MARGIN, text)
+        return emit(first_id, b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content)) + emit(
+            first_id + 1,
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>"
+            % (PAGE_WIDTH, PAGE_HEIGHT, first_id)
+        )
+
+    header = b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"
+    position = len(header)
+    yield header
+    yield emit(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+    yield emit(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+
+    page_ids: List[int] = []
+    next_id = 4
+    lines: List[str] = []
+    async for line in report_lines(summary, findings):
+        lines.append(line)
+        if len(lines) == LINES_PER_PAGE:
+            yield page(lines, next_id)
+            page_ids.append(next_id + 1)
+            next_id += 2
+            lines = []
+    if lines or not page_ids:
+        yield page(lines, next_id)
+        page_ids.append(next_id + 1)
+        next_id += 2
+
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    yield emit(2, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids)))
+
+    xref = [b"xref\n0 %d\n" % next_id, b"0000000000 65535 f \n"]
+    xref += [b"%010d 00000 n \n" % offsets[obj_id] for obj_id in range(1, next_id)]
+    yield b"".join(xref) + b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (next_id, position)
+
+
+RENDERERS = {
+    "json": render_json,
+    "sarif": render_sarif,
+    "junit": render_junit,
+    "html": render_html,
+    "pdf": render_pdf
+}
+
+
+async def render(summary: Dict[str, Any], export_format: str, **options) -> AsyncIterator[bytes]:
+    """렌더링 결과를 CHUNK_SIZE 단위로 모아서 전달"""
+
+    buffer = bytearray()
+    async for chunk in RENDERERS[export_format](summary, iter_findings(summary["id"]), **options):
+        buffer += chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+        if len(buffer) >= CHUNK_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+class ExportCache:
+    """렌더링된 리포트 파일 캐시 (root/<scan_id>/<content key>.<확장자>)"""
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or os.getenv("EXPORT_CACHE_DIR") or os.path.join(os.getenv("ARTIFACT_ROOT", "./artifacts"), "exports")
+
+    def path(self, scan_id: str, key: str, extension: str) -> str:
+        return os.path.join(self.root, scan_id, f"{key}.{extension}")
+
+    def lookup(self, scan_id: str, key: str, extension: str) -> Optional[str]:
+        path = self.path(scan_id, key, extension)
+        return path if os.path.exists(path) else None
+
+    async def tee(self, stream: AsyncIterator[bytes], scan_id: str, key: str, extension: str) -> AsyncIterator[bytes]:
+        """스트림을 그대로 전달하면서 임시 파일에 기록하고, 끝까지 전달된 경우에만 캐시로 등록"""
+
+        directory = os.path.join(self.root, scan_id)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".partial")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                async for chunk in stream:
+                    f.write(chunk)
+                    yield chunk
+            os.replace(temp_path, self.path(scan_id, key, extension))
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+        # 같은 형식의 이전 내용 리포트 정리
+        for name in os.listdir(directory):
+            if name.endswith(f".{extension}") and name != f"{key}.{extension}":
+                try:
+                    os.remove(os.path.join(directory, name))
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,165 @@
+"""
+실시간 스캔 진행 상황 전달
+- Redis scan_progress:* 채널을 대시보드 프로세스당 한 번만 구독하여 브라우저(SSE)로 전달
+- 스캔별 마지막 상태와 최근 발견 사항을 메모리에 보관하여 늦게 접속한 브라우저에 먼저 전달
+"""
+import asyncio
+import json
+from collections import OrderedDict, deque
+from typing import Dict, Any, AsyncIterator, Awaitable, Callable, Optional, Set
+
+from services.scan_registry import PROGRESS_CHANNEL, TERMINAL_STATUSES, ScanRegistry
+
+MAX_CACHED_SCANS = 1000
+MAX_CACHED_FINDINGS = 200
+SUBSCRIBER_BUFFER = 100
+HEARTBEAT_SECONDS = 15
+
+
+class ProgressHub:
+    """진행 이벤트 구독 및 브라우저 연결별 전달"""
+
+    def __init__(
+        self,
+        redis_client,
+        on_terminal: Optional[Callable[[Dict[str, Any], ScanRegistry], Awaitable[None]]] = None,
+        on_finding: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None
+    ):
+        self.redis = redis_client
+        self.registry = ScanRegistry(redis_client)
+        self.on_terminal = on_terminal
+        self.on_finding = on_finding
+        self.last_state: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.findings: Dict[str, deque] = {}
+        self.subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._task = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+
+    async def _listen(self):
+        """모든 스캔의 진행 이벤트 수신 (연결이 끊기면 재연결)"""
+
+        while True:
+            try:
+                pubsub = self.redis.pubsub()
+                await pubsub.psubscribe(f"{PROGRESS_CHANNEL}:*")
+                async for message in pubsub.listen():
+                    if message["type"] == "pmessage":
+                        await self.dispatch(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"진행 이벤트 구독 오류: {e}")
+                await asyncio.sleep(5)
+
+    async def dispatch(self, event: Dict[str, Any]):
+        """이벤트를 캐시에 반영하고 해당 스캔을 보고 있는 브라우저들에게 전달
+
+        종료 상태는 DB에 먼저 저장한 뒤 전달하여 브라우저가 새로고침했을 때 저장된 결과를 보게 함
+        """
+
+        scan_id = event["scan_id"]
+        scan = event.get("scan") or {}
+
+        if event["type"] == "state" and scan:
+            self.last_state[scan_id] = event
+            self.last_state.move_to_end(scan_id)
+            while len(self.last_state) > MAX_CACHED_SCANS:
+                evicted, _ = self.last_state.popitem(last=False)
+                self.findings.pop(evicted, None)
+        elif event["type"] == "finding":
+            self.findings.setdefault(scan_id, deque(maxlen=MAX_CACHED_FINDINGS)).append(event)
+
+        if event["type"] == "state" and scan.get("status") in TERMINAL_STATUSES:
+            await self.persist_terminal(scan)
+        elif event["type"] == "finding" and self.on_finding:
+            # 저장 실패가 구독 루프를 끊지 않도록 여기서 처리
+            try:
+                await self.on_finding(event)
+            except Exception as e:
+                print(f"진행 이벤트 저장 오류 ({scan_id}): {e}")
+
+        for queue in self.subscribers.get(scan_id, ()):
+            if queue.full():
+                # 느린 브라우저 때문에 다른 연결이 밀리지 않도록 가장 오래된 이벤트를 버림
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    async def persist_terminal(self, scan: Dict[str, Any]):
+        """종료 상태 저장 (이미 저장된 스캔은 on_terminal 쪽에서 무시, 실패해도 예외를 밖으로 내보내지 않음)
+
+        on_terminal은 레지스트리도 함께 받아 실시간 이벤트로 받지 못한 발견 사항을 다시 읽음
+        """
+
+        if not self.on_terminal:
+            return
+        try:
+            await self.on_terminal(scan, self.registry)
+        except Exception as e:
+            print(f"종료 상태 저장 오류 ({scan.get('scan_id')}): {e}")
+
+    async def sync_terminal(self, scan_id: str) -> bool:
+        """레지스트리에서 이미 끝난 스캔이면 종료 상태 저장 (종료 이벤트를 놓친 경우 - 페이지 조회 시 호출)"""
+
+        scan = await self.registry.get(scan_id)
+        if not scan or scan.get("status") not in TERMINAL_STATUSES:
+            return False
+
+        await self.persist_terminal(scan)
+        return True
+
+    async def snapshot(self, scan_id: str) -> list:
+        """늦게 접속한 브라우저에 먼저 보낼 이벤트 (캐시에 없으면 레지스트리에서 한 번 조회)
+
+        종료 상태를 보내기 전에 DB에도 저장하여 브라우저가 새로고침한 페이지가 다시 진행 중으로 보이지 않게 함
+        """
+
+        state = self.last_state.get(scan_id)
+        if state is None:
+            scan = await self.registry.get(scan_id)
+            state = {"type": "state", "scan_id": scan_id, "scan": scan} if scan else None
+
+        if state and state["scan"].get("status") in TERMINAL_STATUSES:
+            await self.persist_terminal(state["scan"])
+
+        return list(self.findings.get(scan_id, ())) + ([state] if state else [])
+
+    async def subscribe(self, scan_id: str) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """스캔 이벤트 스트림 (HEARTBEAT_SECONDS 동안 이벤트가 없으면 None, 종료 상태 이후 끝남)"""
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_BUFFER)
+        self.subscribers.setdefault(scan_id, set()).add(queue)
+
+        try:
+            for event in await self.snapshot(scan_id):
+                yield event
+                if event["type"] == "state" and (event.get("scan") or {}).get("status") in TERMINAL_STATUSES:
+                    return
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+
+                yield event
+                if event["type"] == "state" and (event.get("scan") or {}).get("status") in TERMINAL_STATUSES:
+                    return
+        finally:
+            self.subscribers[scan_id].discard(queue)
+            if not self.subscribers[scan_id]:
+                del self.subscribers[scan_id]
+
+
+def sse_format(event: Optional[Dict[str, Any]]) -> str:
+    """SSE 메시지 (None이면 연결 유지용 주석)"""
+
+    if event is None:
+        return ": keepalive\n\n"
+    return f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False, default=str)}\n\n"
@@ -1,8 +1,11 @@
 """
 데이터베이스 모델
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, JSON
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, Integer, String, Text, DateTime, Date, Float, Boolean, JSON, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 Base = declarative_base()
@@ -20,18 +23,128 @@ class APIKey(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
 
+# 발견 사항 심각도 (정규화된 값, 높은 순)
+SEVERITIES = ["critical", "high", "medium", "low", "info"]
+
+
+def normalize_severity(value) -> str:
+    """실행자마다 다른 심각도 표기(High, HIGH, 위험 등)를 정규화"""
+    
+    value = str(value or "").strip().lower()
+    aliases = {"위험": "high", "심각": "critical", "주의": "medium", "경고": "medium", "낮음": "low", "정보": "info"}
+    value = aliases.get(value, value)
+    return value if value in SEVERITIES else "info"
+
+
 class SecurityTest(Base):
-    """보안 테스트 기록"""
+    """보안 테스트 기록 (스캔 하나)"""
     __tablename__ = "security_tests"
+    __table_args__ = (
+        # 대시보드 목록(최신순), 상태별 목록, 대상별 이력 - id까지 포함하여 (created_at, id) 커서 조회를 인덱스로 처리
+        Index("ix_security_tests_created_at_id", "created_at", "id"),
+        Index("ix_security_tests_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_security_tests_target_created_at_id", "target_url", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     target_url = Column(String(500), nullable=False)
     target_type = Column(String(100), nullable=False)  # web_application, api, mobile_app
     test_types = Column(Text, nullable=False)  # 쉼표로 구분된 테스트 유형
-    test_id = Column(String(100))  # 관리자 AI에서 생성한 테스트 ID
+    test_id = Column(String(100), index=True)  # 관리자 AI에서 생성한 스캔 ID (ULID)
+    batch_id = Column(String(26), index=True)  # 일괄 등록 배치 ID (ULID, 개별 등록은 없음)
     status = Column(String(50), default="pending")  # pending, running, completed, failed
     progress = Column(Integer, default=0)  # 진행률 (0-100)
     results = Column(JSON)  # 테스트 결과
     error_message = Column(Text)
+    # 목록 커서가 (created_at, id)를 비교하므로 애플리케이션에서 마이크로초까지 기록 (SQLite의 now()는 초 단위)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    test_runs = relationship("TestRun", back_populates="security_test", cascade="all, delete-orphan")
+    findings = relationship("Finding", back_populates="security_test", cascade="all, delete-orphan")
+
+
+class TestRun(Base):
+    """스캔에 포함된 테스트 유형별 실행 기록"""
+    __tablename__ = "test_runs"
+    __test__ = False  # pytest 수집 대상 아님
+    __table_args__ = (
+        UniqueConstraint("security_test_id", "test_type", name="uq_test_runs_test_type"),
+        Index("ix_test_runs_test_type_status", "test_type", "status"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    security_test_id = Column(Integer, ForeignKey("security_tests.id", ondelete="CASCADE"), nullable=False)
+    test_type = Column(String(100), nullable=False)  # sql_injection, xss_testing, ...
+    status = Column(String(50), default="pending")  # pending, running, completed, skipped, failed
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
\ No newline at end of file
+    finished_at = Column(DateTime(timezone=True))
+    
+    security_test = relationship("SecurityTest", back_populates="test_runs")
+    findings = relationship("Finding", back_populates="test_run")
+
+
+class Finding(Base):
+    """발견 사항 (대상/심각도/유형으로 바로 조회할 수 있도록 스캔 정보 일부를 함께 저장)"""
+    __tablename__ = "findings"
+    __table_args__ = (
+        # 같은 취약점을 여러 실행자가 보고해도 스캔당 한 행
+        UniqueConstraint("security_test_id", "fingerprint", name="uq_findings_fingerprint"),
+        # "대상 X의 최근 30일 High 발견 사항", 스캔별 심각도 집계, 유형별 추이
+        Index("ix_findings_target_severity_created_at", "target_url", "severity", "created_at"),
+        Index("ix_findings_test_severity", "security_test_id", "severity"),
+        Index("ix_findings_type_created_at", "finding_type", "created_at"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    security_test_id = Column(Integer, ForeignKey("security_tests.id", ondelete="CASCADE"), nullable=False)
+    test_run_id = Column(Integer, ForeignKey("test_runs.id", ondelete="SET NULL"))
+    fingerprint = Column(String(64), nullable=False)  # 발견 사항 지문 (analyzer_agent.finding_key)
+    target_url = Column(String(500), nullable=False)
+    test_type = Column(String(100), nullable=False)
+    finding_type = Column(String(200), nullable=False)  # Reflected XSS, Weak Credentials, ...
+    severity = Column(String(20), nullable=False)  # critical, high, medium, low, info
+    title = Column(String(500))
+    location = Column(String(1000))  # 엔드포인트/파라미터/포트
+    details = Column(JSON)  # 실행자가 보고한 원본 항목
+    source = Column(String(200))  # 처음 보고한 실행자 (dynamic:claude:sql_injection#0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    security_test = relationship("SecurityTest", back_populates="findings")
+    test_run = relationship("TestRun", back_populates="findings")
+
+
+class FindingTerm(Base):
+    """발견 사항 검색용 역색인 (필드/정규화된 값 -> 발견 사항, 스캔 종료 시 기록)"""
+    __tablename__ = "finding_terms"
+    __table_args__ = (
+        Index("ix_finding_terms_finding_id", "finding_id"),
+    )
+    
+    # 기본 키 (field, value, finding_id) 인덱스를 역순으로 읽으면 값이 같은 발견 사항을 최신순으로 조회
+    field = Column(String(20), primary_key=True)  # type, target, port, parameter, payload, endpoint
+    value = Column(String(200), primary_key=True)  # 소문자로 정규화한 값
+    finding_id = Column(Integer, ForeignKey("findings.id", ondelete="CASCADE"), primary_key=True)
+
+
+class ScanRollup(Base):
+    """일별 스캔 통계 (스캔 종료 시 누적)"""
+    __tablename__ = "scan_rollups"
+    
+    day = Column(Date, primary_key=True)
+    completed = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    total_duration_seconds = Column(Float, nullable=False, default=0.0)  # 완료된 스캔의 소요 시간 합계
+
+
+class FindingRollup(Base):
+    """일별/대상별/심각도별 발견 사항 수 (스캔 종료 시 누적)"""
+    __tablename__ = "finding_rollups"
+    __table_args__ = (
+        Index("ix_finding_rollups_target_day", "target_url", "day"),
+    )
+    
+    day = Column(Date, primary_key=True)
+    target_url = Column(String(500), primary_key=True)
+    severity = Column(String(20), primary_key=True)
+    findings = Column(Integer, nullable=False, default=0)
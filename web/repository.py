@@ -0,0 +1,455 @@
+"""
+스캔/테스트 실행/발견 사항 저장 및 조회
+"""
+import base64
+import json
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Tuple
+
+from sqlalchemy import select, insert, update, func, and_, or_, exists
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only, aliased
+
+from .models import SecurityTest, TestRun, Finding, FindingTerm, SEVERITIES, normalize_severity
+from .search import SEARCH_FIELDS, index_scan, fulltext_condition, normalize_term, target_host
+from .stats import apply_scan_rollups
+
+FINAL_STATUSES = ("completed", "failed")
+
+LOCATION_FIELDS = ("endpoint", "url", "parameter", "port", "protocol")
+
+
+def add_test_runs(db: AsyncSession, test: SecurityTest, test_types: List[str]):
+    """스캔에 포함된 테스트 유형별 실행 기록 추가"""
+
+    for test_type in dict.fromkeys(test_types):
+        db.add(TestRun(security_test=test, test_type=test_type, status="running"))
+
+
+def finding_fields(finding: Dict[str, Any]) -> Dict[str, Any]:
+    """실행자가 보고한 발견 사항 항목을 발견 사항 행의 열 값으로 변환"""
+
+    finding_type = str(finding.get("type") or finding.get("name") or "unknown")[:200]
+    location = " ".join(f"{name}={finding[name]}" for name in LOCATION_FIELDS if finding.get(name) is not None)
+
+    return {
+        "test_type": finding.get("test_type") or "unknown",
+        "finding_type": finding_type,
+        "severity": normalize_severity(finding.get("severity")),
+        "title": str(finding.get("title") or finding.get("description") or finding_type)[:500],
+        "location": location[:1000] or None,
+        "details": finding
+    }
+
+
+def finding_row(test: SecurityTest, test_run_id: Optional[int], fingerprint: str, finding: Dict[str, Any],
+                source: Optional[str]) -> Finding:
+    """발견 사항 행 생성"""
+
+    return Finding(
+        security_test_id=test.id,
+        test_run_id=test_run_id,
+        fingerprint=fingerprint,
+        target_url=test.target_url,
+        source=source,
+        **finding_fields(finding)
+    )
+
+
+async def save_finding(db: AsyncSession, event: Dict[str, Any]) -> bool:
+    """발견 사항 저장 (이미 저장된 지문이면 무시)"""
+
+    test = (await db.scalars(select(SecurityTest).where(SecurityTest.test_id == event["scan_id"]))).first()
+    if test is None:
+        return False
+
+    test_run_id = await db.scalar(
+        select(TestRun.id).where(
+            TestRun.security_test_id == test.id,
+            TestRun.test_type == event["finding"].get("test_type")
+        )
+    )
+
+    db.add(finding_row(test, test_run_id, event["fingerprint"], event["finding"], event.get("source")))
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        return False
+    return True
+
+
+async def save_missing_findings(db: AsyncSession, test: SecurityTest, findings: Dict[str, Dict[str, Any]]) -> int:
+    """레지스트리에 기록된 발견 사항 중 아직 저장되지 않은 것을 저장 (실시간 이벤트를 놓친 경우)
+
+    findings: 지문 -> {"finding", "source"}, 저장한 개수 반환
+    """
+
+    if not findings:
+        return 0
+
+    saved = set((await db.scalars(select(Finding.fingerprint).where(Finding.security_test_id == test.id))).all())
+    test_runs = dict((await db.execute(
+        select(TestRun.test_type, TestRun.id).where(TestRun.security_test_id == test.id)
+    )).all())
+
+    added = 0
+    for fingerprint, record in findings.items():
+        if fingerprint in saved:
+            continue
+        finding = record["finding"]
+        try:
+            async with db.begin_nested():
+                db.add(finding_row(test, test_runs.get(finding.get("test_type")), fingerprint, finding, record.get("source")))
+        except IntegrityError:
+            # 실시간 이벤트로 같은 항목이 먼저 저장된 경우
+            continue
+        added += 1
+    return added
+
+
+async def scan_summary(db: AsyncSession, test: SecurityTest, scan: Dict[str, Any]) -> Dict[str, Any]:
+    """스캔 결과 요약 (테스트 상태 API의 results)"""
+
+    counts = dict((await db.execute(
+        select(Finding.severity, func.count())
+        .where(Finding.security_test_id == test.id)
+        .group_by(Finding.severity)
+    )).all())
+    test_runs = dict((await db.execute(
+        select(TestRun.test_type, TestRun.status).where(TestRun.security_test_id == test.id)
+    )).all())
+
+    return {
+        "findings": sum(counts.values()),
+        "severity_counts": {severity: counts.get(severity, 0) for severity in SEVERITIES},
+        "test_runs": test_runs,
+        "skipped_tests": scan.get("skipped_tests") or [],
+        "missing_results": scan.get("missing_results", 0)
+    }
+
+
+async def save_final_state(db: AsyncSession, scan: Dict[str, Any], registry=None) -> bool:
+    """스캔 종료 시 테스트 기록, 발견 사항, 테스트 유형별 실행 기록, 일별 집계, 검색 색인 갱신
+
+    종료 상태로 처음 바뀐 경우에만 반영하므로 같은 이벤트를 여러 번 받아도 집계가 중복되지 않음
+    발견 사항은 registry에 기록된 원본으로 다시 맞춘 뒤 집계/색인에 반영
+    """
+
+    test = (await db.scalars(select(SecurityTest).where(SecurityTest.test_id == scan["scan_id"]))).first()
+    if test is None:
+        return False
+
+    failed = scan["status"] != "analyzed"
+    now = datetime.now(timezone.utc)
+
+    result = await db.execute(
+        update(SecurityTest)
+        .where(SecurityTest.id == test.id, SecurityTest.status.notin_(FINAL_STATUSES))
+        .values(
+            status="failed" if failed else "completed",
+            progress=scan.get("progress", 0),
+            error_message=scan.get("error")
+        )
+    )
+    if not result.rowcount:
+        await db.rollback()
+        return False
+
+    if registry is not None:
+        await save_missing_findings(db, test, await registry.findings(scan["scan_id"]))
+
+    skipped = {item.get("test_type") for item in scan.get("skipped_tests") or []}
+
+    await db.execute(
+        update(TestRun)
+        .where(TestRun.security_test_id == test.id, TestRun.status == "running")
+        .values(status="failed" if failed else "completed", finished_at=now)
+    )
+    if skipped:
+        await db.execute(
+            update(TestRun)
+            .where(TestRun.security_test_id == test.id, TestRun.test_type.in_(skipped))
+            .values(status="skipped", finished_at=now)
+        )
+
+    await db.execute(
+        update(SecurityTest).where(SecurityTest.id == test.id).values(results=await scan_summary(db, test, scan))
+    )
+    await apply_scan_rollups(db, test, now, failed)
+    await index_scan(db, test.id)
+    await db.commit()
+    return True
+
+
+async def create_scans(db: AsyncSession, batch_id: str, targets: List[Dict[str, Any]]) -> List[int]:
+    """여러 스캔 기록과 테스트 유형별 실행 기록을 다중 행 INSERT로 추가하고 요청 순서대로 id 반환
+
+    targets 항목: target_url, target_type, test_types(목록)
+    """
+
+    ids = (await db.scalars(
+        insert(SecurityTest).returning(SecurityTest.id, sort_by_parameter_order=True),
+        [
+            {
+                "target_url": target["target_url"],
+                "target_type": target["target_type"],
+                "test_types": ",".join(target["test_types"]),
+                "batch_id": batch_id,
+                "status": "running"
+            }
+            for target in targets
+        ]
+    )).all()
+
+    test_runs = [
+        {"security_test_id": scan_id, "test_type": test_type, "status": "running"}
+        for scan_id, target in zip(ids, targets)
+        for test_type in dict.fromkeys(target["test_types"])
+    ]
+    if test_runs:
+        await db.execute(insert(TestRun), test_runs)
+
+    return list(ids)
+
+
+async def assign_scan_ids(db: AsyncSession, ids: List[int], test_ids: List[str]):
+    """관리자 AI가 발급한 스캔 ID를 기본 키 기준 일괄 UPDATE로 기록"""
+
+    await db.execute(update(SecurityTest), [
+        {"id": scan_id, "test_id": test_id} for scan_id, test_id in zip(ids, test_ids)
+    ])
+
+
+async def fail_batch(db: AsyncSession, batch_id: str, error: str):
+    """배치의 모든 스캔을 실패로 기록"""
+
+    await db.execute(
+        update(SecurityTest)
+        .where(SecurityTest.batch_id == batch_id)
+        .values(status="failed", error_message=error)
+    )
+
+
+async def batch_summary(db: AsyncSession, batch_id: str, registry) -> Optional[Dict[str, Any]]:
+    """배치 진행 상황 (진행 중인 스캔은 스캔 레지스트리의 실시간 상태를 한 번에 조회, 없는 배치면 None)"""
+
+    rows = (await db.execute(
+        select(SecurityTest.id, SecurityTest.test_id, SecurityTest.target_url, SecurityTest.status, SecurityTest.error_message)
+        .where(SecurityTest.batch_id == batch_id)
+        .order_by(SecurityTest.id)
+    )).all()
+    if not rows:
+        return None
+
+    running = [row.test_id for row in rows if row.status not in FINAL_STATUSES and row.test_id]
+    live = await registry.get_many(running) if running else {}
+
+    scans = []
+    for row in rows:
+        state = live.get(row.test_id) or {}
+        scans.append({
+            "id": row.id,
+            "test_id": row.test_id,
+            "target_url": row.target_url,
+            "status": row.status,
+            "stage": state.get("status"),
+            "progress": 100 if row.status in FINAL_STATUSES else state.get("progress", 0),
+            "error_message": row.error_message
+        })
+
+    status_counts: Dict[str, int] = {}
+    for scan in scans:
+        status_counts[scan["status"]] = status_counts.get(scan["status"], 0) + 1
+
+    return {
+        "batch_id": batch_id,
+        "total": len(scans),
+        "finished": sum(status_counts.get(status, 0) for status in FINAL_STATUSES),
+        "status_counts": status_counts,
+        "progress": round(sum(scan["progress"] for scan in scans) / len(scans)),
+        "scans": scans
+    }
+
+
+# 스캔 목록에서 선택할 수 있는 필드 (기본값은 results 제외)
+SCAN_FIELDS = {
+    "id", "test_id", "target_url", "target_type", "test_types", "status",
+    "progress", "error_message", "created_at", "updated_at", "results"
+}
+DEFAULT_SCAN_FIELDS = ["id", "test_id", "target_url", "target_type", "test_types", "status", "progress", "created_at"]
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(created_at: datetime, scan_id: int) -> str:
+    """마지막 행의 (created_at, id)를 불투명한 커서 문자열로 변환"""
+
+    raw = json.dumps([created_at.isoformat(), scan_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """커서 문자열을 (created_at, id)로 복원 (형식이 잘못되면 ValueError)"""
+
+    try:
+        created_at, scan_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(created_at), int(scan_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError("잘못된 커서입니다.") from e
+
+
+def scan_fields(fields: Optional[str]) -> List[str]:
+    """fields 파라미터(쉼표 구분)를 검증 (id/created_at은 커서에 필요하므로 항상 포함)"""
+
+    if not fields:
+        return DEFAULT_SCAN_FIELDS
+
+    selected = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = set(selected) - SCAN_FIELDS
+    if unknown:
+        raise ValueError(f"알 수 없는 필드: {', '.join(sorted(unknown))}")
+    return list(dict.fromkeys(["id", "created_at", *selected]))
+
+
+async def list_scans(
+    db: AsyncSession,
+    status: Optional[str] = None,
+    target_url: Optional[str] = None,
+    severity: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    fields: Optional[str] = None
+) -> Dict[str, Any]:
+    """스캔 목록 (최신순 keyset 페이지네이션 - 페이지 깊이와 관계없이 인덱스 범위 조회)
+
+    severity는 해당 심각도 이상의 발견 사항이 있는 스캔만 반환
+    """
+
+    columns = scan_fields(fields)
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    query = select(SecurityTest).options(load_only(*(getattr(SecurityTest, name) for name in columns)))
+
+    if status:
+        query = query.where(SecurityTest.status == status)
+    if target_url:
+        query = query.where(SecurityTest.target_url == target_url)
+    if created_from:
+        query = query.where(SecurityTest.created_at >= created_from)
+    if created_to:
+        query = query.where(SecurityTest.created_at < created_to)
+    if severity:
+        severity = normalize_severity(severity)
+        query = query.where(exists().where(
+            Finding.security_test_id == SecurityTest.id,
+            Finding.severity.in_(SEVERITIES[:SEVERITIES.index(severity) + 1])
+        ))
+    if cursor:
+        created_at, scan_id = decode_cursor(cursor)
+        query = query.where(or_(
+            SecurityTest.created_at < created_at,
+            and_(SecurityTest.created_at == created_at, SecurityTest.id < scan_id)
+        ))
+
+    # 한 행 더 가져와서 다음 페이지 여부 확인
+    rows = (await db.scalars(
+        query.order_by(SecurityTest.created_at.desc(), SecurityTest.id.desc()).limit(limit + 1)
+    )).all()
+
+    page = rows[:limit]
+    next_cursor = encode_cursor(page[-1].created_at, page[-1].id) if len(rows) > limit else None
+
+    return {
+        "scans": [{name: getattr(row, name) for name in columns} for row in page],
+        "next_cursor": next_cursor,
+        "limit": limit
+    }
+
+
+async def search_findings(
+    db: AsyncSession,
+    q: Optional[str] = None,
+    terms: Optional[Dict[str, str]] = None,
+    severity: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    group_by: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50
+) -> Dict[str, Any]:
+    """발견 사항 검색 (terms: 필드 -> 값, 여러 필드는 AND, 최신순 커서 페이지네이션)
+
+    group_by="target"이면 조건에 맞는 대상별 발견 사항 수와 마지막 발견 시각을 반환
+    """
+
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    terms = {field: normalize_term(value) for field, value in (terms or {}).items() if value}
+    unknown = set(terms) - set(SEARCH_FIELDS)
+    if unknown:
+        raise ValueError(f"알 수 없는 검색 필드: {', '.join(sorted(unknown))}")
+    if not terms and not q:
+        raise ValueError("검색어(q) 또는 검색 필드가 필요합니다.")
+    if "target" in terms:
+        terms["target"] = target_host(terms["target"])
+
+    conditions = []
+    query_from = Finding.__table__
+    order_key = Finding.id
+    # 역색인 조인 - 가장 구체적인 필드의 (필드, 값, 발견 사항 id) 인덱스를 역순으로 읽으면서 나머지 조건을 확인
+    for field in sorted(terms, key=SEARCH_FIELDS.index):
+        term = aliased(FindingTerm)
+        query_from = query_from.join(term, and_(
+            term.finding_id == Finding.id, term.field == field, term.value == terms[field]
+        ))
+        if order_key is Finding.id:
+            order_key = term.finding_id
+
+    if q:
+        conditions.append(fulltext_condition(db.get_bind().dialect.name, q, per_row=bool(terms)))
+    if severity:
+        severity = normalize_severity(severity)
+        conditions.append(Finding.severity.in_(SEVERITIES[:SEVERITIES.index(severity) + 1]))
+    if created_from:
+        conditions.append(Finding.created_at >= created_from)
+    if created_to:
+        conditions.append(Finding.created_at < created_to)
+
+    if group_by == "target":
+        rows = (await db.execute(
+            select(Finding.target_url, func.count(), func.max(Finding.created_at))
+            .select_from(query_from)
+            .where(*conditions)
+            .group_by(Finding.target_url)
+            .order_by(func.max(Finding.created_at).desc())
+            .limit(limit)
+        )).all()
+        return {"targets": [
+            {"target_url": target_url, "findings": count, "last_seen": last_seen}
+            for target_url, count, last_seen in rows
+        ]}
+    if group_by:
+        raise ValueError(f"지원하지 않는 group_by: {group_by}")
+
+    # 발견 사항 id는 저장 순서대로 증가하므로 id 역순이 최신순 (커서도 id만 비교)
+    if cursor:
+        _, finding_id = decode_cursor(cursor)
+        conditions.append(order_key < finding_id)
+
+    rows = (await db.execute(
+        select(
+            Finding.id, Finding.severity, Finding.finding_type, Finding.title, Finding.location,
+            Finding.test_type, Finding.target_url, Finding.created_at, SecurityTest.test_id.label("scan_id")
+        )
+        .select_from(query_from.join(SecurityTest.__table__, SecurityTest.id == Finding.security_test_id))
+        .where(*conditions)
+        .order_by(order_key.desc())
+        .limit(limit + 1)
+    )).all()
+
+    page = rows[:limit]
+    next_cursor = encode_cursor(page[-1].created_at, page[-1].id) if len(rows) > limit else None
+
+    return {"findings": [row._asdict() for row in page], "next_cursor": next_cursor, "limit": limit}
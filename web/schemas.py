@@ -1,8 +1,8 @@
 """
 Pydantic 스키마
 """
-from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, List, Literal
 from datetime import datetime
 
 
@@ -18,4 +18,20 @@ class TestResult(BaseModel):
     created_at: datetime
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class BulkScanTarget(BaseModel):
+    """일괄 등록 대상 하나 (test_types 미지정 시 요청의 기본값)"""
+    target_url: str = Field(..., max_length=500)
+    target_type: str = "web_application"
+    test_types: Optional[List[str]] = None
+
+
+class BulkScanRequest(BaseModel):
+    """스캔 일괄 등록 요청"""
+    targets: List[BulkScanTarget] = Field(..., min_length=1)
+    test_types: List[str] = []
+    priority: Literal["urgent", "normal", "batch"] = "batch"
+    time_budget: int = 0
+    rescan: bool = False
@@ -0,0 +1,133 @@
+"""
+발견 사항 검색
+- 스캔이 끝나면 발견 사항의 유형/대상 호스트/포트/파라미터/페이로드/엔드포인트를 finding_terms 역색인에 기록
+- 설명 전문 검색은 SQLite에서는 FTS5 가상 테이블(findings_fts), PostgreSQL에서는 tsvector 생성 열(search_vector)과 GIN 인덱스
+- 조회는 repository.search_findings
+"""
+from typing import Dict, Any, List
+from urllib.parse import urlparse
+
+from sqlalchemy import select, insert, text, exists
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import Finding, FindingTerm
+
+# 검색 필드 -> 발견 사항 원본 항목(details)에서 값을 읽는 키
+TERM_KEYS = {
+    "port": ("port", "ports"),
+    "parameter": ("parameter", "param", "parameters"),
+    "payload": ("payload", "payloads"),
+    "endpoint": ("endpoint", "path", "url")
+}
+# 검색 필드 (값 하나에 해당하는 발견 사항이 적은 순 - 여러 필드를 함께 검색할 때 앞쪽 필드부터 조회)
+SEARCH_FIELDS = ("payload", "parameter", "endpoint", "port", "target", "type")
+
+# 전문 검색 대상 (원본 항목의 설명 필드)
+TEXT_KEYS = ("description", "detail", "evidence", "recommendation")
+
+MAX_TERM_LENGTH = 200
+INDEX_BATCH_SIZE = 1000
+
+FULLTEXT_TABLE = "findings_fts"
+FULLTEXT_COLUMN = "search_vector"
+
+
+def normalize_term(value) -> str:
+    return str(value).strip().lower()[:MAX_TERM_LENGTH]
+
+
+def target_host(target_url: str) -> str:
+    """대상 URL의 호스트 (스킴/경로가 달라도 같은 대상으로 검색)"""
+
+    parsed = urlparse(target_url if "://" in target_url else f"//{target_url}")
+    return normalize_term(parsed.hostname or target_url)
+
+
+def finding_terms(finding: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """발견 사항 하나의 역색인 행 (finding: id, finding_type, target_url, details)"""
+
+    details = finding.get("details") or {}
+    terms = {("type", normalize_term(finding["finding_type"])), ("target", target_host(finding["target_url"]))}
+
+    for field, keys in TERM_KEYS.items():
+        for key in keys:
+            values = details.get(key)
+            for value in values if isinstance(values, list) else [values]:
+                if value is not None and not isinstance(value, (dict, list)) and str(value).strip():
+                    terms.add((field, normalize_term(value)))
+
+    return [
+        {"field": field, "value": value, "finding_id": finding["id"]}
+        for field, value in terms
+    ]
+
+
+def finding_text(finding: Dict[str, Any]) -> str:
+    details = finding.get("details") or {}
+    return " ".join(str(details[key]) for key in TEXT_KEYS if isinstance(details.get(key), (str, int, float)))
+
+
+def create_fulltext_index(connection):
+    """전문 검색 색인 생성 (동기 연결 - init_db와 마이그레이션에서 사용, 이미 있으면 무시)"""
+
+    if connection.dialect.name == "sqlite":
+        connection.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FULLTEXT_TABLE} USING fts5(title, body, tokenize='unicode61')"
+        ))
+    elif connection.dialect.name == "postgresql":
+        connection.execute(text(
+            f"ALTER TABLE findings ADD COLUMN IF NOT EXISTS {FULLTEXT_COLUMN} tsvector GENERATED ALWAYS AS ("
+            "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(details->>'description', '') || ' ' "
+            "|| coalesce(details->>'detail', '') || ' ' || coalesce(details->>'evidence', '') || ' ' "
+            "|| coalesce(details->>'recommendation', ''))) STORED"
+        ))
+        connection.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_findings_{FULLTEXT_COLUMN} ON findings USING gin ({FULLTEXT_COLUMN})"
+        ))
+
+
+def fulltext_rows(findings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """FTS5 테이블 행 (PostgreSQL은 생성 열이 자동으로 채워지므로 사용하지 않음)"""
+    return [{"rowid": f["id"], "title": f["title"] or f["finding_type"], "body": finding_text(f)} for f in findings]
+
+
+FULLTEXT_INSERT = text(f"INSERT INTO {FULLTEXT_TABLE} (rowid, title, body) VALUES (:rowid, :title, :body)")
+
+INDEX_COLUMNS = (Finding.id, Finding.finding_type, Finding.target_url, Finding.title, Finding.details)
+
+
+async def index_scan(db: AsyncSession, security_test_id: int):
+    """스캔의 발견 사항을 검색 색인에 추가 (스캔 종료 트랜잭션 안에서 한 번 호출)"""
+
+    sqlite = db.get_bind().dialect.name == "sqlite"
+    last_id = 0
+    while True:
+        rows = [row._asdict() for row in (await db.execute(
+            select(*INDEX_COLUMNS)
+            .where(Finding.security_test_id == security_test_id, Finding.id > last_id)
+            .order_by(Finding.id)
+            .limit(INDEX_BATCH_SIZE)
+        )).all()]
+        if not rows:
+            return
+
+        await db.execute(insert(FindingTerm), [term for row in rows for term in finding_terms(row)])
+        if sqlite:
+            await db.execute(FULLTEXT_INSERT, fulltext_rows(rows))
+        last_id = rows[-1]["id"]
+
+
+def fulltext_condition(dialect: str, query: str, per_row: bool = False):
+    """전문 검색 조건 (사용자 입력은 단어별 구문으로 감싸서 검색 문법으로 해석되지 않게 함)
+
+    per_row=True는 역색인으로 후보를 읽으면서 행마다 확인 (검색어에 맞는 발견 사항 전체를 먼저 모으지 않음)
+    """
+
+    if dialect == "postgresql":
+        return text(f"findings.{FULLTEXT_COLUMN} @@ plainto_tsquery('simple', :fulltext_query)").bindparams(fulltext_query=query)
+
+    phrases = " ".join('"' + word.replace('"', '""') + '"' for word in query.split())
+    match = text(f"{FULLTEXT_TABLE} MATCH :fulltext_query").bindparams(fulltext_query=phrases)
+    if per_row:
+        return exists(select(text("1")).select_from(text(FULLTEXT_TABLE)).where(match, text(f"{FULLTEXT_TABLE}.rowid = findings.id")))
+    return Finding.id.in_(select(text("rowid")).select_from(text(FULLTEXT_TABLE)).where(match))
@@ -0,0 +1,134 @@
+"""
+대시보드 통계
+- 스캔이 끝날 때 일별/대상별/심각도별 집계를 증분 갱신 (조회 시 원본 테이블을 집계하지 않음)
+- 대시보드 화면 데이터는 짧은 TTL로 프로세스 메모리에 캐시하고 스캔 종료/설정 변경 시 무효화
+"""
+import asyncio
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Any, Awaitable, Callable, Optional
+
+from sqlalchemy import select, update, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import APIKey, Finding, ScanRollup, FindingRollup, SEVERITIES
+
+TREND_DAYS = 30
+PROVIDERS = ["openai", "claude", "gemini"]
+
+
+async def increment(db: AsyncSession, model, key: Dict[str, Any], values: Dict[str, float]):
+    """집계 행에 값을 더함 (행이 없으면 생성)"""
+
+    conditions = [getattr(model, name) == value for name, value in key.items()]
+    increments = {name: getattr(model, name) + amount for name, amount in values.items()}
+
+    result = await db.execute(update(model).where(*conditions).values(**increments))
+    if result.rowcount:
+        return
+
+    try:
+        async with db.begin_nested():
+            db.add(model(**key, **values))
+    except IntegrityError:
+        # 다른 요청이 먼저 행을 만든 경우
+        await db.execute(update(model).where(*conditions).values(**increments))
+
+
+async def apply_scan_rollups(db: AsyncSession, test, finished_at: datetime, failed: bool):
+    """스캔 하나의 결과를 일별 집계에 반영 (스캔 상태가 종료로 바뀐 요청에서 한 번만 호출)"""
+
+    day = finished_at.date()
+
+    created_at = test.created_at
+    if created_at is not None and created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    duration = (finished_at - created_at).total_seconds() if created_at and not failed else 0.0
+
+    await increment(db, ScanRollup, {"day": day}, {
+        "completed": 0 if failed else 1,
+        "failed": 1 if failed else 0,
+        "total_duration_seconds": max(0.0, duration)
+    })
+
+    counts = (await db.execute(
+        select(Finding.severity, func.count())
+        .where(Finding.security_test_id == test.id)
+        .group_by(Finding.severity)
+    )).all()
+    for severity, count in counts:
+        await increment(db, FindingRollup, {"day": day, "target_url": test.target_url, "severity": severity}, {"findings": count})
+
+
+async def trends(db: AsyncSession, days: int = TREND_DAYS) -> Dict[str, Any]:
+    """최근 기간의 집계 (집계 테이블만 조회하므로 이력이 늘어도 일정한 비용)"""
+
+    since = date.today() - timedelta(days=days - 1)
+
+    scans = (await db.execute(
+        select(
+            func.coalesce(func.sum(ScanRollup.completed), 0),
+            func.coalesce(func.sum(ScanRollup.failed), 0),
+            func.coalesce(func.sum(ScanRollup.total_duration_seconds), 0.0)
+        ).where(ScanRollup.day >= since)
+    )).one()
+
+    by_severity = dict((await db.execute(
+        select(FindingRollup.severity, func.sum(FindingRollup.findings))
+        .where(FindingRollup.day >= since)
+        .group_by(FindingRollup.severity)
+    )).all())
+
+    by_day = (await db.execute(
+        select(FindingRollup.day, FindingRollup.severity, func.sum(FindingRollup.findings))
+        .where(FindingRollup.day >= since)
+        .group_by(FindingRollup.day, FindingRollup.severity)
+        .order_by(FindingRollup.day)
+    )).all()
+
+    completed, failed, total_duration = scans
+    findings_by_day: Dict[str, Dict[str, int]] = {}
+    for day, severity, count in by_day:
+        findings_by_day.setdefault(day.isoformat(), {s: 0 for s in SEVERITIES})[severity] = int(count)
+
+    return {
+        "days": days,
+        "scans_completed": int(completed),
+        "scans_failed": int(failed),
+        "mean_duration_seconds": round(total_duration / completed, 1) if completed else None,
+        "findings_by_severity": {s: int(by_severity.get(s, 0)) for s in SEVERITIES},
+        "findings_by_day": findings_by_day
+    }
+
+
+async def api_status(db: AsyncSession) -> Dict[str, bool]:
+    """제공업체별 활성 API 키 존재 여부 (한 번의 조회)"""
+
+    active = set((await db.scalars(
+        select(APIKey.provider).where(APIKey.is_active.is_(True)).distinct()
+    )).all())
+    return {provider: provider in active for provider in PROVIDERS}
+
+
+class ViewModelCache:
+    """짧은 TTL의 프로세스 메모리 캐시 (동시에 만료되어도 한 요청만 다시 계산)"""
+
+    def __init__(self, ttl_seconds: float = 10.0):
+        self.ttl = ttl_seconds
+        self._value: Optional[Dict[str, Any]] = None
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get(self, loader: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        if self._value is not None and time.monotonic() < self._expires_at:
+            return self._value
+
+        async with self._lock:
+            if self._value is None or time.monotonic() >= self._expires_at:
+                self._value = await loader()
+                self._expires_at = time.monotonic() + self.ttl
+            return self._value
+
+    def invalidate(self):
+        self._value = None